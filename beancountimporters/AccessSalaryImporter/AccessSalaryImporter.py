@@ -1,36 +1,120 @@
 import datetime
+from importlib.metadata import version
+from typing import NamedTuple, Optional, Sequence
 
-from pypdf import PdfReader
 from beancount.ingest import importer, cache
 from beancount.core import data
 from beancount.core import flags
-from beancount.core.amount import Amount
-from beancount.core.number import D
+
+from ..Common.Categorise import Categoriser
+from ..Common.Dates import parse_dd_mon_yy
+from ..Common.Dedup import mark_duplicates
+from ..Common.FileContext import file_context
+from ..Common.Instrumentation import count, instrumented
+from ..Common.Money import parse_pence, pence_amount, scale_pence
+from ..Common.ParseCache import ParseCache
+from ..Common.PdfText import PageText, iter_pdf_pages, pdf_pages_to_text
+from ..Common.Sniffing import first_pdf_page_text
+from ..Common.Watermarks import WatermarkFilter, account_watermark
 
 
 def pdf_to_text(filename: str):
     """Convert pdf file to text."""
-    reader = PdfReader(filename)
-    text = ""
-    for page in reader.pages:
-        text += page.extract_text()
-    return text
-
-
-tri_to_month = {
-    "JAN": "01",
-    "FEB": "02",
-    "MAR": "03",
-    "APR": "04",
-    "MAY": "05",
-    "JUN": "06",
-    "JUL": "07",
-    "AUG": "08",
-    "SEP": "09",
-    "OCT": "10",
-    "NOV": "11",
-    "DEC": "12",
-}
+    return pdf_pages_to_text(filename)
+
+
+# Bump when pdf_to_text changes its output, so stale parse cache entries are ignored.
+PDF_TO_TEXT_VERSION = f'1/pypdf-{version("pypdf")}'
+
+
+class PayslipField(NamedTuple):
+    """Where a value sits in the payslip text: the token-th word of the occurrence-th line starting with label."""
+    label: str
+    token: int
+    occurrence: int = 0
+    required: bool = True
+
+
+class PayslipPosting(NamedTuple):
+    """A posting of field's value, times multiplier, to account."""
+    account: str
+    field: PayslipField
+    multiplier: int = 1
+
+
+NET_PAY = PayslipField("Net Pay", 3)
+BASIC_SALARY = PayslipField("Basic Salary", 2)
+PENSION = PayslipField("Scottish Widows EE SS", 4)
+PAYE = PayslipField("PAYE", 1)
+# The first "Employee NI" line holds the NI category, the second the deduction.
+NATIONAL_INSURANCE = PayslipField("Employee NI", 2, occurrence=1)
+STUDENT_LOAN = PayslipField("Student Loan Plan 2", 4)
+PAYSLIP_DATE = PayslipField("Payslip Date:", 2)
+
+
+class PayslipIndex:
+    """Label-to-lines index of payslip text, fed a page at a time.
+
+    Labels are bucketed by their first word, so each line is only compared against the labels it
+    could match. A page's unterminated last line is held back and joined to the next page's text,
+    so the lines seen are exactly those of the concatenated text.
+    """
+
+    def __init__(self, fields: Sequence[PayslipField]):
+        self.fields = tuple(fields)
+        self.lines: dict[str, list[str]] = {field.label: [] for field in self.fields}
+        self.needed: dict[str, int] = {}
+        self.byFirstWord: dict[str, list[str]] = {}
+        for field in self.fields:
+            self.needed[field.label] = max(self.needed.get(field.label, 0), field.occurrence + 1)
+        for label in self.lines:
+            self.byFirstWord.setdefault(label.split(' ', 1)[0], []).append(label)
+        self.partial = ''
+
+    def feed(self, text: str):
+        lines = (self.partial + text).splitlines(keepends=True)
+        self.partial = lines.pop() if lines and lines[-1].splitlines()[0] == lines[-1] else ''
+        for line in lines:
+            self.add_line(line.splitlines()[0])
+
+    def close(self):
+        if self.partial:
+            self.add_line(self.partial)
+            self.partial = ''
+
+    def add_line(self, line: str):
+        for label in self.byFirstWord.get(line.split(' ', 1)[0], ()):
+            if line.startswith(label):
+                self.lines[label].append(line)
+
+    def complete(self) -> bool:
+        """Whether every field, optional ones included, has been seen."""
+        return all(len(self.lines[label]) >= needed for label, needed in self.needed.items())
+
+    def values(self) -> dict[PayslipField, Optional[str]]:
+        """Value of each field; missing optional fields map to None, a missing required field raises ValueError."""
+        self.close()
+        values: dict[PayslipField, Optional[str]] = {}
+        for field in self.fields:
+            lines = self.lines[field.label]
+            if field.occurrence >= len(lines):
+                if field.required:
+                    raise ValueError(f'Payslip has {len(lines)} line(s) starting "{field.label}", '
+                                     f'expected at least {field.occurrence + 1}.')
+                values[field] = None
+                continue
+            tokens = lines[field.occurrence].split(' ')
+            if field.token >= len(tokens):
+                raise ValueError(f'Payslip line "{lines[field.occurrence]}" has no word {field.token}.')
+            values[field] = tokens[field.token]
+        return values
+
+
+def read_payslip_fields(text: str, fields: Sequence[PayslipField]) -> dict[PayslipField, Optional[str]]:
+    """Read every field from text with one pass over its lines."""
+    index = PayslipIndex(fields)
+    index.feed(text)
+    return index.values()
 
 
 class Importer(importer.ImporterProtocol):
@@ -46,7 +130,12 @@ class Importer(importer.ImporterProtocol):
             pensionassetaccount: str,
             studentloanaccount: str,
             y2kfix: str,
-            flag: str = ''):
+            flag: str = '',
+            parsecache: Optional[ParseCache] = None,
+            extrapostings: Sequence[PayslipPosting] = (),
+            pdfworkers: int = 1,
+            incremental: bool = False,
+            categoriser: Optional[Categoriser] = None):
         """
         Initialise and importer for Access UK Payslips
         :param studentloanaccount:
@@ -59,6 +148,11 @@ class Importer(importer.ImporterProtocol):
         :param studentloanaccount: Account for student loan balance.
 
         :param y2kfix: First 2 digits of year for date (Payslip has y2k bug).
+        :param parsecache: Optional on-disk cache for extracted PDF text.
+        :param extrapostings: Further payslip lines to post, e.g. bonuses or salary sacrifice.
+        :param pdfworkers: Processes used to decode the pages of long PDFs in parallel.
+        :param incremental: Skip payslips already in existing_entries, by the salary account's watermark.
+        :param categoriser: Accepted like every importer's, though payslips already balance so it adds nothing.
         """
         self.salaryAccount = salaryaccount
         self.currentAccount = currentaccount
@@ -68,109 +162,66 @@ class Importer(importer.ImporterProtocol):
         self.PensionAccount = pensionassetaccount
         self.StudentLoanAccount = studentloanaccount
         self.currency = "GBP"
-        self.cachedPDF: str = None
         self.y2kFix = y2kfix
         self.FLAG = flags.FLAG_WARNING if flag == '' else flags.FLAG_OKAY
+        self.parseCache = parsecache
+        self.pdfWorkers = pdfworkers
+        self.incremental = incremental
+        self.categoriser = categoriser
+        self.postings: tuple[PayslipPosting, ...] = (
+            PayslipPosting(self.currentAccount, NET_PAY),
+            PayslipPosting(self.StudentLoanAccount, STUDENT_LOAN),
+            PayslipPosting(self.PAYE, PAYE),
+            PayslipPosting(self.NIAccount, NATIONAL_INSURANCE),
+            PayslipPosting(self.PensionAccount, PENSION, -2),
+            PayslipPosting(self.pensionMatch, PENSION),
+            PayslipPosting(self.salaryAccount, BASIC_SALARY, -1),
+            *extrapostings
+        )
+        self.fields: tuple[PayslipField, ...] = tuple(
+            dict.fromkeys([PAYSLIP_DATE] + [posting.field for posting in self.postings]))
 
+    @instrumented('identify')
     def identify(self, file: cache._FileMemo) -> bool:
-        """Check that is a PDF containing the text "Pay" and "ACCESS UK" """
+        """Check that is a PDF whose first page contains the text "PAY" and "ACCESS UK" """
         if file.mimetype() != 'application/pdf':
             return False
 
-        self.cachedPDF = file.convert(pdf_to_text)
-        if self.cachedPDF:
-            return "PAY" in self.cachedPDF and "ACCESS UK" in self.cachedPDF
+        # Only the first page is decoded here; the full text is extracted by the importer that matches.
+        if self.parseCache is None:
+            text = file.convert(first_pdf_page_text)
+        else:
+            text = self.parseCache.convert(file, first_pdf_page_text, PDF_TO_TEXT_VERSION)
+        if text:
+            return "PAY" in text and "ACCESS UK" in text
 
         return False
 
+    @instrumented('extract')
     def extract(self, file: cache._FileMemo, existing_entries=None):
-        # Check for text of pdf
-        if self.cachedPDF is None:
-            self.cachedPDF = file.convert(pdf_to_text)
-        # Split into lines.
-        lines = self.cachedPDF.splitlines()
-
-        # Determine values for each posting.
-        netpay = list(
-            filter(
-                lambda line: line.startswith("Net Pay"),
-                lines
-            )
-        )[0].split(' ')[3]
-        salary = list(
-            filter(
-                lambda line: line.startswith("Basic Salary"),
-                lines
-            )
-        )[0].split(' ')[2]
-        pension_single = list(
-            filter(
-                lambda line: line.startswith("Scottish Widows EE SS"),
-                lines
-            )
-        )[0].split(' ')[4]
-        paye_tax = list(
-            filter(
-                lambda line: line.startswith("PAYE"),
-                lines
-            )
-        )[0].split(' ')[1]
-        national_insurance = list(
-            filter(
-                lambda line: line.startswith("Employee NI"),
-                lines
-            )
-        )[1].split(' ')[2]
-        student_loan = list(
-            filter(
-                lambda line: line.startswith("Student Loan Plan 2"),
-                lines
-            )
-        )[0].split(' ')[4]
+        values = self.payslip_values(file)
 
         meta = data.new_metadata(file.name, 0)
         meta['date']: datetime.date = self.file_date(file)
 
-        postings = [
-            data.Posting(
-                account=self.currentAccount,
-                units=Amount(D(netpay), self.currency),
-                cost=None, price=None, flag=None, meta=None
-            ),
-            data.Posting(
-                account=self.StudentLoanAccount,
-                units=Amount(D(student_loan), self.currency),
-                cost=None, price=None, flag=None, meta=None
-            ),
-            data.Posting(
-                account=self.PAYE,
-                units=Amount(D(paye_tax), self.currency),
-                cost=None, price=None, flag=None, meta=None
-            ),
-            data.Posting(
-                account=self.NIAccount,
-                units=Amount(D(national_insurance), self.currency),
-                cost=None, price=None, flag=None, meta=None
-            ),
-            data.Posting(
-                account=self.PensionAccount,
-                units=Amount(-D(pension_single) * 2, self.currency),
+        postings = []
+        for posting in self.postings:
+            value = values[posting.field]
+            if value is None:
+                continue
+            try:
+                pence = scale_pence(parse_pence(value), posting.multiplier)
+            except ValueError:
+                raise ValueError(f'{file.name}: "{posting.field.label}": invalid amount {value!r}') from None
+            postings.append(data.Posting(
+                account=posting.account,
+                units=pence_amount(pence, self.currency),
                 cost=None, price=None, flag=None, meta=None
-            ),
-            data.Posting(
-                account=self.pensionMatch,
-                units=Amount(D(pension_single), self.currency),
-                cost=None, price=None, flag=None, meta=None
-            ),
-            data.Posting(
-                account=self.salaryAccount,
-                units=Amount(-D(salary), self.currency),
-                cost=None, price=None, flag=None, meta=None
-            )
-        ]
+            ))
+
         txn = data.Transaction(
             meta=meta,
-            date=self.file_date(file),
+            date=meta['date'],
             flag=self.FLAG,
             payee="SELF",
             narration=f"Paycheck {meta['date'].day} {meta['date'].month} {meta['date'].year}",
@@ -179,19 +230,50 @@ class Importer(importer.ImporterProtocol):
             links=data.EMPTY_SET
         )
 
-        return [txn]
+        if self.incremental:
+            account = self.file_account(file)
+            if not WatermarkFilter(account, account_watermark(account, existing_entries, anyPosting=True)).is_new(txn):
+                return []
+        if self.categoriser is not None:
+            txn = self.categoriser.categorise(txn, existing_entries)
+        return mark_duplicates([txn], existing_entries)
+
+    def pdf_text(self, file: cache._FileMemo) -> str:
+        """Text of the PDF, held in the file's context rather than on the importer."""
+        if self.parseCache is None:
+            return file_context(file).get(pdf_to_text, lambda: file.convert(pdf_to_text))
+        return file_context(file).get(
+            pdf_to_text, lambda: self.parseCache.convert(file, pdf_to_text, PDF_TO_TEXT_VERSION))
+
+    def payslip_values(self, file: cache._FileMemo) -> dict[PayslipField, Optional[str]]:
+        """Every field this importer needs, read in one pass and kept in the file's context."""
+        return file_context(file).get(('payslip_values', self.fields), lambda: self.read_payslip(file))
+
+    @instrumented('parse')
+    def read_payslip(self, file: cache._FileMemo) -> dict[PayslipField, Optional[str]]:
+        if self.parseCache is not None:
+            # The cache holds the whole text, so it stays valid whichever fields are configured.
+            return read_payslip_fields(self.pdf_text(file), self.fields)
+
+        # Decode pages only until every field has been found.
+        index = PayslipIndex(self.fields)
+        pages = self.page_timings(file)
+        for page in iter_pdf_pages(file.name, workers=self.pdfWorkers):
+            pages.append(page)
+            index.feed(page.text)
+            if index.complete():
+                break
+        count('pages', len(pages))
+        return index.values()
+
+    @staticmethod
+    def page_timings(file: cache._FileMemo) -> list[PageText]:
+        """Pages decoded so far for file, with the time each took."""
+        return file_context(file).get('pdf_pages', list)
 
     def file_account(self, file: cache._FileMemo) -> str:
         return self.salaryAccount
 
     def file_date(self, file: cache._FileMemo):
         """Date is of format DD-MON-YY"""
-        # Ensure that there is cached version of the file.
-        if self.cachedPDF is None:
-            self.cachedPDF = file.convert(pdf_to_text)
-
-        datelines = self.cachedPDF.splitlines()
-        dateparts = list(filter(lambda line: line.startswith("Payslip Date:"), datelines))[0].split(' ')[2].split('-')
-        year = self.y2kFix + dateparts[2]
-        month = tri_to_month[dateparts[1]]
-        return datetime.date(int(year), int(month), int(dateparts[0]))
+        return parse_dd_mon_yy(self.payslip_values(file)[PAYSLIP_DATE], self.y2kFix)
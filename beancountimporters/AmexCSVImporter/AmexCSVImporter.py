@@ -1,70 +1,55 @@
-import csv
 import datetime
+from typing import Optional
 
 from beancount.core import flags, data
-from beancount.core.amount import Amount
-from beancount.core.number import D
-from beancount.ingest import importer, cache
+from beancount.ingest import cache
 
+from ..Common.Categorise import Categoriser
+from ..Common.CsvEngine import CsvImporter, csv_to_list
+from ..Common.Instrumentation import instrumented
+from ..Common.Sniffing import first_line
 
-def csv_to_list(filename: str):
-    with open(filename, 'r') as infile:
-        rows: [str] = infile.readlines()
-    return rows
 
-
-class Importer(importer.ImporterProtocol):
+class Importer(CsvImporter):
     """Imports Amex CSVs"""
 
-    def __init__(self, creditcardaccount: str, flag: str = ''):
+    negateAmount = True
+    textColumns = ('Description', 'Reference')
+
+    def __init__(self, creditcardaccount: str, flag: str = '', vectorized: bool = False, incremental: bool = False,
+                 categoriser: Optional[Categoriser] = None):
         self.creditCardAccount = creditcardaccount
         self.currency = "GBP"
         self.FLAG = flags.FLAG_WARNING if flag == '' else flags.FLAG_OKAY
-        self.cachedRows = None
+        self.vectorized = vectorized
+        self.incremental = incremental
+        self.categoriser = categoriser
 
+    @instrumented('identify')
     def identify(self, file: cache._FileMemo) -> bool:
         if file.mimetype() != 'text/csv':
             return False
 
-        self.cachedRows = file.convert(csv_to_list)
-        if self.cachedRows:
-            return self.cachedRows[0].startswith("Date,Description,Amount,Extended Details,Appears On Your Statement "
-                                                 "As,Address,Town/City,Postcode,Country,Reference,Category")
-
-        return False
-
-    def extract(self, file, existing_entries=None):
-        if self.cachedRows is None:
-            self.cachedRows = file.convert(csv_to_list)
-
-        rows = csv.DictReader(self.cachedRows)
-        txns = []
-
-        for idx, row in enumerate(rows):
-            meta = data.new_metadata(file.name, idx + 1, kvlist={'reference': row['Reference']})
-            postings = [data.Posting(
-                account=self.creditCardAccount,
-                units=Amount(-D(row['Amount']), self.currency),
-                cost=None, price=None, flag=None, meta=None
-            )]
-            splitdate = row['Date'].split('/')
-            d = splitdate[0]
-            m = splitdate[1]
-            y = splitdate[2]
-            newdate = datetime.date(int(y), int(m), int(d))
-            txn = data.Transaction(
-                meta=meta,
-                date=newdate,
-                flag=self.FLAG,
-                payee=None,
-                narration=row['Description'],
-                postings=postings,
-                tags=data.EMPTY_SET,
-                links=data.EMPTY_SET
-            )
-            txns.append(txn)
-
-        return txns
+        return file.convert(first_line).startswith("Date,Description,Amount,Extended Details,Appears On Your "
+                                                   "Statement As,Address,Town/City,Postcode,Country,Reference,Category")
+
+    def make_transaction(self, file, lineno, row, date, units):
+        meta = data.new_metadata(file.name, lineno, kvlist={'reference': row['Reference']})
+        postings = [data.Posting(
+            account=self.creditCardAccount,
+            units=units,
+            cost=None, price=None, flag=None, meta=None
+        )]
+        return data.Transaction(
+            meta=meta,
+            date=date,
+            flag=self.FLAG,
+            payee=None,
+            narration=row['Description'],
+            postings=postings,
+            tags=data.EMPTY_SET,
+            links=data.EMPTY_SET
+        )
 
     def file_account(self, file):
         return self.creditCardAccount
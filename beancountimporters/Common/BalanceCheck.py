@@ -0,0 +1,56 @@
+from typing import Iterable, NamedTuple, Optional
+
+from .MappedFile import iter_csv_fields
+from .Money import Pence, from_pence, parse_pence
+
+
+class BalanceMismatch(NamedTuple):
+    """The first row of a statement whose running balance does not add up, and why."""
+    lineno: int
+    reason: str
+
+
+def follows(previousBalance: Pence, amount: Pence, balance: Pence) -> bool:
+    """Whether balance is previousBalance plus amount, in integer pence whenever all three allow it."""
+    if type(previousBalance) is int and type(amount) is int and type(balance) is int:
+        return previousBalance + amount == balance
+    return from_pence(previousBalance) + from_pence(amount) == from_pence(balance)
+
+
+def first_balance_mismatch(rows: Iterable[Optional[tuple[str, str]]], descending: bool) -> Optional[BalanceMismatch]:
+    """First inconsistency in rows of (amount, balance) text, given in file order, or None.
+
+    Each row's balance should be the balance of the row before it in time plus its own amount; rows
+    are numbered from 1 and checking stops at the first one that is not. A row of None is one that
+    was cut short.
+    """
+    previousLine = previousAmount = previousText = previousBalance = None
+    for lineno, row in enumerate(rows, 1):
+        if row is None:
+            return BalanceMismatch(lineno, 'row is incomplete')
+        amountText, balanceText = row
+        try:
+            amount, balance = parse_pence(amountText), parse_pence(balanceText)
+        except ValueError:
+            return BalanceMismatch(lineno, f'invalid amount {amountText!r} or balance {balanceText!r}')
+        if previousLine is not None:
+            if descending:
+                consistent = follows(balance, previousAmount, previousBalance)
+            else:
+                consistent = follows(previousBalance, amount, balance)
+            if not consistent:
+                if descending:
+                    return BalanceMismatch(previousLine, f'balance {previousText} is not {balanceText} plus '
+                                                         f'{from_pence(previousAmount)}')
+                return BalanceMismatch(lineno, f'balance {balanceText} is not {previousText} plus {from_pence(amount)}')
+        previousLine, previousAmount, previousText, previousBalance = lineno, amount, balanceText, balance
+    return None
+
+
+def csv_balance_mismatch(filename: str, descending: bool, amountColumn: str = 'Amount',
+                         balanceColumn: str = 'Balance') -> Optional[BalanceMismatch]:
+    """first_balance_mismatch over a CSV with a header row, decoding only its amount and balance columns."""
+    # A truncated download ends mid-row, leaving the balance missing.
+    return first_balance_mismatch((None if balance is None else (amount, balance)
+                                   for amount, balance in iter_csv_fields(filename, (amountColumn, balanceColumn))),
+                                  descending)
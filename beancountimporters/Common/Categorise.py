@@ -0,0 +1,152 @@
+import re
+from decimal import Decimal
+from typing import Iterable, NamedTuple, Optional, Protocol, Sequence
+
+from beancount.core import data
+
+# Distinct texts whose candidate rules are remembered; statements repeat a few hundred payees many times over.
+TEXT_CACHE_SIZE = 65536
+
+_END = ''
+
+
+class Rule(NamedTuple):
+    """Post transactions whose text and amount match to account.
+
+    pattern is a regular expression searched for in the text, prefix a string it must start with;
+    either, both or neither may be given. minAmount and maxAmount bound the amount posted to the
+    importer's own account, inclusively, so spending on a card is negative. field is the text
+    matched: 'narration' or 'payee'.
+    """
+    account: str
+    pattern: Optional[str] = None
+    prefix: Optional[str] = None
+    minAmount: Optional[Decimal] = None
+    maxAmount: Optional[Decimal] = None
+    field: str = 'narration'
+
+
+class Classifier(Protocol):
+    """Predicts a counter-account for a single-posting transaction, such as Classifier.LedgerClassifier."""
+
+    def classify(self, entry: data.Transaction, existing_entries) -> Optional[str]:
+        ...
+
+
+class _TextMatcher:
+    """Every rule's pattern and prefix for one field, compiled once for matching texts against all of them.
+
+    Prefixes go in a trie, walked once along the text. Each pattern is compiled on its own, so its
+    flags, group references and meaning of . are as written.
+    """
+
+    def __init__(self, rules: Sequence[tuple[int, Rule]], ignoreCase: bool):
+        self.ignoreCase = ignoreCase
+        self.trie: dict = {}
+        self.patterns: list[tuple[int, re.Pattern]] = []
+        flags = re.IGNORECASE if ignoreCase else 0
+        for index, rule in rules:
+            if rule.prefix is not None:
+                node = self.trie
+                for character in self.fold(rule.prefix):
+                    node = node.setdefault(character, {})
+                node.setdefault(_END, []).append(index)
+            if rule.pattern is not None:
+                try:
+                    self.patterns.append((index, re.compile(rule.pattern, flags)))
+                except re.error as exc:
+                    raise ValueError(f'Rule for {rule.account}: invalid pattern {rule.pattern!r}: {exc}') from None
+
+    def fold(self, text: str) -> str:
+        return text.casefold() if self.ignoreCase else text
+
+    def prefix_hits(self, text: str) -> set[int]:
+        hits = set()
+        node = self.trie
+        for character in self.fold(text):
+            hits.update(node.get(_END, ()))
+            node = node.get(character)
+            if node is None:
+                return hits
+        hits.update(node.get(_END, ()))
+        return hits
+
+    def pattern_hits(self, text: str) -> set[int]:
+        return {index for index, pattern in self.patterns if pattern.search(text)}
+
+
+class Categoriser:
+    """Adds a counter-posting to single-posting transactions, to the account of the first rule they match.
+
+    Rules are tried in order. Each field's prefixes share a trie and its patterns are compiled once, and
+    the rules a text can match are remembered, so a statement costs one match per distinct payee
+    or narration plus an amount check per row. Transactions no rule matches are given to classifier,
+    if there is one, with the existing entries to learn from.
+    """
+
+    def __init__(self, rules: Iterable[Rule] = (), ignorecase: bool = True, classifier: Optional[Classifier] = None):
+        self.rules = tuple(rules)
+        self.classifier = classifier
+        for rule in self.rules:
+            if rule.field not in ('narration', 'payee'):
+                raise ValueError(f"Rule for {rule.account}: field must be 'narration' or 'payee', not {rule.field!r}")
+        self.matchers: dict[str, _TextMatcher] = {}
+        for field in ('narration', 'payee'):
+            fieldRules = [(index, rule) for index, rule in enumerate(self.rules)
+                          if rule.field == field and (rule.pattern is not None or rule.prefix is not None)]
+            if fieldRules:
+                self.matchers[field] = _TextMatcher(fieldRules, ignorecase)
+        # Rules with no text condition are candidates for every transaction.
+        self.anyText = [index for index, rule in enumerate(self.rules) if rule.pattern is None and rule.prefix is None]
+        self._candidates: dict[tuple[str, str], tuple[int, ...]] = {}
+
+    def candidates(self, field: str, text: str) -> tuple[int, ...]:
+        """Indexes of the rules for field whose pattern and prefix both hold for text, in order."""
+        key = (field, text)
+        try:
+            return self._candidates[key]
+        except KeyError:
+            pass
+        matcher = self.matchers[field]
+        prefixHits, patternHits = matcher.prefix_hits(text), matcher.pattern_hits(text)
+        found = tuple(sorted(index for index in prefixHits | patternHits
+                             if (self.rules[index].prefix is None or index in prefixHits)
+                             and (self.rules[index].pattern is None or index in patternHits)))
+        if len(self._candidates) >= TEXT_CACHE_SIZE:
+            self._candidates.clear()
+        self._candidates[key] = found
+        return found
+
+    def match(self, narration: Optional[str], payee: Optional[str], number: Optional[Decimal]) -> Optional[Rule]:
+        """The first rule matching the texts and amount, or None."""
+        indexes: Sequence[int] = self.candidates('narration', narration) \
+            if narration and 'narration' in self.matchers else ()
+        if payee and 'payee' in self.matchers:
+            indexes = sorted((*indexes, *self.candidates('payee', payee)))
+        if self.anyText:
+            indexes = sorted((*indexes, *self.anyText))
+        for index in indexes:
+            rule = self.rules[index]
+            if rule.minAmount is not None and (number is None or number < rule.minAmount):
+                continue
+            if rule.maxAmount is not None and (number is None or number > rule.maxAmount):
+                continue
+            return rule
+        return None
+
+    def categorise(self, entry: data.Directive, existing_entries=None) -> data.Directive:
+        """entry with a posting to the matching rule's account, left to balance it; others are returned as they are."""
+        if not isinstance(entry, data.Transaction) or len(entry.postings) != 1:
+            return entry
+        units = entry.postings[0].units
+        rule = self.match(entry.narration, entry.payee, units.number if units is not None else None)
+        account = rule.account if rule is not None else None
+        if account is None and self.classifier is not None and existing_entries:
+            account = self.classifier.classify(entry, existing_entries)
+        if account is None:
+            return entry
+        posting = data.Posting(account, None, None, None, None, None)
+        return entry._replace(postings=entry.postings + [posting])
+
+    def categorise_all(self, entries: Iterable[data.Directive], existing_entries=None) -> list[data.Directive]:
+        return [self.categorise(entry, existing_entries) for entry in entries]
@@ -0,0 +1,234 @@
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+import zipfile
+import zlib
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+import numpy as np
+from beancount.core import data
+
+from .LedgerCache import ledger_cached
+from .ParseCache import default_cache_dir
+
+# Bump when training or the saved arrays change, so models trained by older code are retrained.
+MODEL_VERSION = '1'
+
+# Words of two or more letters; card numbers, store numbers and dates say nothing about the account.
+_token = re.compile(r"[A-Z][A-Z&']+")
+
+
+def normalise_tokens(text: str) -> list[str]:
+    return _token.findall(text.upper())
+
+
+def transaction_text(entry: data.Transaction) -> str:
+    """The text a transaction is classified by: its payee and narration."""
+    return ' '.join(text for text in (entry.payee, entry.narration) if text)
+
+
+def training_examples(entries: Iterable[data.Directive], account: str) -> list[tuple[str, str]]:
+    """(text, counter-account) for every two-posting transaction between account and one other."""
+    examples = []
+    for entry in entries:
+        if not isinstance(entry, data.Transaction) or len(entry.postings) != 2:
+            continue
+        first, second = entry.postings
+        if first.account == account and second.account != account:
+            examples.append((transaction_text(entry), second.account))
+        elif second.account == account and first.account != account:
+            examples.append((transaction_text(entry), first.account))
+    return examples
+
+
+class TokenModel:
+    """Multinomial naive Bayes from hashed narration tokens to counter-accounts.
+
+    Tokens are hashed into features buckets with crc32, so the model is a fixed size however many
+    payees the ledger has, and is the same whichever process trained it.
+    """
+
+    def __init__(self, accounts: Sequence[str], logPrior: np.ndarray, logLikelihood: np.ndarray, seen: np.ndarray):
+        self.accounts = tuple(accounts)
+        self.logPrior = logPrior
+        self.logLikelihood = logLikelihood
+        self.seen = seen
+        self.features = seen.shape[0]
+
+    @staticmethod
+    def hashed(tokens: Iterable[str], features: int, buckets: dict[str, int]) -> list[int]:
+        """Feature index of each token, hashing each distinct token once across calls sharing buckets."""
+        indexes = []
+        for token in tokens:
+            index = buckets.get(token)
+            if index is None:
+                index = buckets[token] = zlib.crc32(token.encode('utf-8')) % features
+            indexes.append(index)
+        return indexes
+
+    @classmethod
+    def train(cls, examples: Sequence[tuple[str, str]], features: int = 1 << 14, alpha: float = 0.1
+              ) -> Optional['TokenModel']:
+        """Fit to examples of (text, account); None if they name fewer than two accounts."""
+        accounts = sorted({account for _, account in examples})
+        if len(accounts) < 2:
+            return None
+        accountIndex = {account: index for index, account in enumerate(accounts)}
+        buckets: dict[str, int] = {}
+        labels, columns = [], []
+        for text, account in examples:
+            indexes = cls.hashed(normalise_tokens(text), features, buckets)
+            columns.extend(indexes)
+            labels.extend([accountIndex[account]] * len(indexes))
+
+        labelArray = np.asarray(labels, dtype=np.int64)
+        columnArray = np.asarray(columns, dtype=np.int64)
+        counts = np.bincount(labelArray * features + columnArray,
+                             minlength=len(accounts) * features).reshape(len(accounts), features)
+        examplesPerAccount = np.bincount([accountIndex[account] for _, account in examples], minlength=len(accounts))
+
+        logLikelihood = np.log((counts + alpha) / (counts.sum(axis=1, keepdims=True) + alpha * features))
+        logPrior = np.log(examplesPerAccount / examplesPerAccount.sum())
+        return cls(accounts, logPrior.astype(np.float32), logLikelihood.astype(np.float32), counts.sum(axis=0) > 0)
+
+    def predict(self, texts: Sequence[str], minConfidence: float = 0.0) -> list[Optional[str]]:
+        """Most likely account for each text, or None where it has no known token or the best is below minConfidence."""
+        buckets: dict[str, int] = {}
+        columns, offsets, known = [], [], []
+        for position, text in enumerate(texts):
+            indexes = [index for index in self.hashed(normalise_tokens(text), self.features, buckets)
+                       if self.seen[index]]
+            if indexes:
+                offsets.append(len(columns))
+                columns.extend(indexes)
+                known.append(position)
+
+        predictions: list[Optional[str]] = [None] * len(texts)
+        if not known:
+            return predictions
+        # Summed log likelihoods of each text's tokens, for every account at once: (accounts, texts).
+        scores = np.add.reduceat(self.logLikelihood[:, columns], offsets, axis=1) + self.logPrior[:, None]
+        scores -= scores.max(axis=0)
+        probabilities = np.exp(scores)
+        probabilities /= probabilities.sum(axis=0)
+        best = probabilities.argmax(axis=0)
+        confidence = probabilities[best, np.arange(len(known))]
+        for position, account, probability in zip(known, best, confidence):
+            if probability >= minConfidence:
+                predictions[position] = self.accounts[account]
+        return predictions
+
+    def save(self, path: Path):
+        np.savez(path, accounts=np.array(self.accounts), logPrior=self.logPrior, logLikelihood=self.logLikelihood,
+                 seen=self.seen)
+
+    @classmethod
+    def load(cls, path: Path) -> 'TokenModel':
+        with np.load(path) as arrays:
+            return cls([str(account) for account in arrays['accounts']], arrays['logPrior'],
+                       arrays['logLikelihood'], arrays['seen'])
+
+
+class LedgerClassifier:
+    """Predicts counter-accounts from existing_entries, for a Categoriser to fall back on when no rule matches.
+
+    A model is trained per importer account, from that account's two-posting transactions, and
+    saved under a hash of those transactions, so it is only retrained once they change. Within a
+    run each ledger's models and every prediction are kept in memory too.
+    """
+
+    def __init__(self, directory: Optional[str] = None, features: int = 1 << 14, minconfidence: float = 0.6):
+        self.directory = Path(directory) if directory else default_cache_dir() / 'models'
+        self.features = features
+        self.minConfidence = minconfidence
+        self.trained = 0
+        self.loaded = 0
+        self._reset()
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        # Per ledger: account to (model, predictions by text).
+        self._models = ledger_cached(lambda entries: {})
+
+    def __getstate__(self):
+        # The in-memory caches hold a closure and a lock; workers start their own.
+        state = self.__dict__.copy()
+        del state['_lock'], state['_models']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._reset()
+
+    def key(self, account: str, examples: Sequence[tuple[str, str]]) -> str:
+        digest = hashlib.sha256(f'{MODEL_VERSION}:{self.features}:{account}'.encode('utf-8'))
+        for text, counterAccount in examples:
+            digest.update(f'\0{text}\0{counterAccount}'.encode('utf-8'))
+        return digest.hexdigest()
+
+    def model(self, existing_entries, account: str) -> tuple[Optional[TokenModel], dict[str, Optional[str]]]:
+        """The model for account trained on existing_entries, loading or training it on first use, and its predictions."""
+        models = self._models(existing_entries)
+        if models is None:
+            return None, {}
+        with self._lock:
+            if account not in models:
+                models[account] = (self.load_or_train(existing_entries, account), {})
+            return models[account]
+
+    def load_or_train(self, existing_entries, account: str) -> Optional[TokenModel]:
+        examples = training_examples(existing_entries, account)
+        path = self.directory / f'{self.key(account, examples)}.npz'
+        try:
+            model = TokenModel.load(path)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            # Corrupt entry; drop it and train afresh.
+            path.unlink(missing_ok=True)
+        else:
+            self.loaded += 1
+            return model
+
+        model = TokenModel.train(examples, self.features)
+        if model is None:
+            return None
+        self.trained += 1
+        self.save(model, path)
+        return model
+
+    def save(self, model: TokenModel, path: Path):
+        # Logged rather than printed: stdout carries the extracted entries.
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Not .npz until it is complete, so a model is never loaded half written.
+            fd, tmpname = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        except OSError as e:
+            logging.warning("Could not save classifier model %s: %s", path, e)
+            return
+        try:
+            with os.fdopen(fd, 'wb') as outfile:
+                model.save(outfile)
+            os.replace(tmpname, path)
+        except OSError as e:
+            Path(tmpname).unlink(missing_ok=True)
+            logging.warning("Could not save classifier model %s: %s", path, e)
+        except BaseException:
+            Path(tmpname).unlink(missing_ok=True)
+            raise
+
+    def classify(self, entry: data.Transaction, existing_entries) -> Optional[str]:
+        """Counter-account for a single-posting entry, or None if the ledger gives no confident answer."""
+        model, predictions = self.model(existing_entries, entry.postings[0].account)
+        if model is None:
+            return None
+        text = transaction_text(entry)
+        try:
+            return predictions[text]
+        except KeyError:
+            prediction = predictions[text] = model.predict([text], self.minConfidence)[0]
+            return prediction
@@ -0,0 +1,138 @@
+import csv
+import datetime
+from typing import Iterator, Optional, Union
+
+from beancount.core import data
+from beancount.core.amount import Amount
+from beancount.ingest import importer, cache
+
+from .Categorise import Categoriser
+from .Dates import parse_dmy
+from .Dedup import mark_duplicates
+from .Instrumentation import count, instrumented
+from .MappedFile import iter_csv_fields, iter_lines
+from .Money import pence_amount, parse_row_pence
+from .RowRecords import RowRecord, RowTable
+from .Watermarks import WatermarkFilter, account_watermark
+
+
+def csv_to_list(filename: str):
+    rows: [str] = [line.decode('utf-8') for line in iter_lines(filename)]
+    return rows
+
+
+def iter_csv_rows(filename: str, header: bool = True) -> Iterator[Union[dict, list]]:
+    """Lazily read a CSV file, one row at a time.
+
+    Rows are dicts keyed by the header when header is True, otherwise plain lists.
+    """
+    with open(filename, 'r', encoding='utf-8-sig', newline='') as infile:
+        reader = csv.DictReader(infile) if header else csv.reader(infile)
+        yield from reader
+
+
+class CsvImporter(importer.ImporterProtocol):
+    """Base for importers of CSVs where each row becomes one directive.
+
+    Rows are streamed from disk and reduced to a RowRecord (date, amount in pence and the textColumns
+    make_transaction reads), so iter_extract only ever holds the current row, and directives are
+    only built for rows that are kept. Subclasses name their DD/MM/YYYY date, amount and text
+    columns and implement make_transaction.
+    Setting vectorized parses the date and amount columns in bulk with NumPy instead, which is faster
+    on very large exports; the whole file is then held, as a compact RowTable.
+    Setting incremental skips rows already in existing_entries, up to the account's watermark.
+    A categoriser adds the counter-posting of each transaction its rules match.
+    """
+
+    hasHeader: bool = True
+    dateColumn: Union[str, int] = 'Date'
+    amountColumn: Union[str, int] = 'Amount'
+    textColumns: tuple[Union[str, int], ...] = ()
+    negateAmount: bool = False
+    currency: str = 'GBP'
+    vectorized: bool = False
+    incremental: bool = False
+    categoriser: Optional[Categoriser] = None
+
+    def iter_fields(self, file: cache._FileMemo) -> Iterator[tuple[str, ...]]:
+        """The date, amount and textColumns of each row, read from a memory map and decoded only for those columns."""
+        return iter_csv_fields(file.name, (self.dateColumn, self.amountColumn, *self.textColumns), self.hasHeader)
+
+    def make_transaction(self, file: cache._FileMemo, lineno: int, row: dict,
+                         date: datetime.date, units: Amount) -> data.Transaction:
+        """Directive for a row; row maps each of textColumns to its value, and units is its amount in currency."""
+        raise NotImplementedError
+
+    def iter_records(self, file: cache._FileMemo) -> Iterator[RowRecord]:
+        """Yield a RowRecord for every row of file."""
+        if self.vectorized:
+            yield from self.read_table(file)
+            return
+
+        name, negate = file.name, self.negateAmount
+        lineno = 0
+        for lineno, fields in enumerate(self.iter_fields(file), 1):
+            yield RowRecord(lineno, parse_dmy(fields[0]).toordinal(), parse_row_pence(fields[1], name, lineno, negate),
+                            fields[2:])
+        count('rows', lineno)
+
+    @instrumented('parse')
+    def read_table(self, file: cache._FileMemo) -> RowTable:
+        """Every row of file, with the date and amount columns parsed in bulk when vectorized."""
+        table = RowTable(len(self.textColumns))
+        if not self.vectorized:
+            for record in self.iter_records(file):
+                table.add_text(record.text)
+                table.add_number(record.ordinal, record.amount)
+            return table
+
+        # NumPy is only imported once a vectorized importer reads a file.
+        from .VectorParse import parse_amounts, parse_dmy_dates
+        dates, amounts = [], []
+        for fields in self.iter_fields(file):
+            dates.append(fields[0])
+            amounts.append(fields[1])
+            table.add_text(fields[2:])
+        try:
+            parsedDates = parse_dmy_dates(dates)
+            parsedAmounts = parse_amounts(amounts, self.negateAmount)
+        except ValueError as e:
+            raise ValueError(f'{file.name}: {e}') from e
+        for date, amount in zip(parsedDates, parsedAmounts):
+            table.add_number(date.toordinal(), amount)
+        count('rows', len(table))
+        return table
+
+    def record_to_entry(self, file: cache._FileMemo, record: RowRecord) -> tuple[dict, data.Directive]:
+        row = dict(zip(self.textColumns, record.text))
+        return row, self.make_transaction(file, record.lineno, row, record.date,
+                                          pence_amount(record.amount, self.currency))
+
+    def iter_row_entries(self, file: cache._FileMemo, since: Optional[datetime.date] = None
+                         ) -> Iterator[tuple[int, dict, data.Directive]]:
+        """Yield (lineno, row, directive) for every row of file, skipping rows dated before since."""
+        sinceOrdinal = since.toordinal() if since is not None else None
+        for record in self.iter_records(file):
+            if sinceOrdinal is not None and record.ordinal < sinceOrdinal:
+                continue
+            row, entry = self.record_to_entry(file, record)
+            yield record.lineno, row, entry
+
+    def iter_extract(self, file: cache._FileMemo, existing_entries=None) -> Iterator[data.Directive]:
+        """Yield directives one at a time without materialising the whole file."""
+        watermark = self.watermark_filter(file, existing_entries)
+        for _, _, entry in self.iter_row_entries(file, watermark.since):
+            if watermark.is_new(entry):
+                yield self.categorise(entry, existing_entries)
+
+    def categorise(self, entry: data.Directive, existing_entries=None) -> data.Directive:
+        return entry if self.categoriser is None else self.categoriser.categorise(entry, existing_entries)
+
+    def watermark_filter(self, file: cache._FileMemo, existing_entries=None) -> WatermarkFilter:
+        """Filter for rows already imported into the file's account; passes everything unless incremental."""
+        account = self.file_account(file)
+        return WatermarkFilter(account, account_watermark(account, existing_entries) if self.incremental else None)
+
+    @instrumented('extract')
+    def extract(self, file: cache._FileMemo, existing_entries=None) -> list[data.Directive]:
+        return mark_duplicates(list(self.iter_extract(file, existing_entries)), existing_entries)
@@ -0,0 +1,72 @@
+import datetime
+import functools
+import re
+
+# Distinct dates in a statement are few, so a modest cache covers years of history.
+DATE_CACHE_SIZE = 4096
+
+tri_to_month = {
+    "JAN": "01",
+    "FEB": "02",
+    "MAR": "03",
+    "APR": "04",
+    "MAY": "05",
+    "JUN": "06",
+    "JUL": "07",
+    "AUG": "08",
+    "SEP": "09",
+    "OCT": "10",
+    "NOV": "11",
+    "DEC": "12",
+}
+
+_qifNumericDate = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})')
+
+
+@functools.lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_dmy(value: str) -> datetime.date:
+    """DD/MM/YYYY, as used by the bank CSV exports."""
+    parts = value.split('/')
+    if len(parts) < 3:
+        raise ValueError(f'Invalid DD/MM/YYYY date {value!r}')
+    return datetime.date(int(parts[2]), int(parts[1]), int(parts[0]))
+
+
+@functools.lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_dd_mon_yy(value: str, century: str) -> datetime.date:
+    """DD-MON-YY, e.g. 28-OCT-24, with century supplying the missing first two digits of the year."""
+    parts = value.split('-')
+    if len(parts) != 3 or parts[1] not in tri_to_month:
+        raise ValueError(f'Invalid DD-MON-YY date {value!r}')
+    return datetime.date(int(century + parts[2]), int(tri_to_month[parts[1]]), int(parts[0]))
+
+
+@functools.lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_qif_date(value: str, dayfirst: bool) -> datetime.date:
+    """A QIF D line, read day-first or month-first.
+
+    Plain numeric dates with a four digit year are parsed directly; anything else (two digit years,
+    month names, Quicken's ' and space separators) goes through quiffen, so results always agree.
+    """
+    match = _qifNumericDate.fullmatch(value.strip())
+    if match:
+        first, second, year = (int(part) for part in match.groups())
+        day, month = (first, second) if dayfirst else (second, first)
+        try:
+            return datetime.date(year, month, day)
+        except ValueError:
+            # e.g. a month-first date in a day-first file; let quiffen decide as it always has.
+            pass
+
+    from quiffen import utils
+    return utils.parse_date(value, dayfirst).date()
+
+
+def date_cache_info() -> dict[str, functools._CacheInfo]:
+    """Hit and miss counts for each date parser's cache."""
+    return {parser.__name__: parser.cache_info() for parser in (parse_dmy, parse_dd_mon_yy, parse_qif_date)}
+
+
+def clear_date_caches():
+    for parser in (parse_dmy, parse_dd_mon_yy, parse_qif_date):
+        parser.cache_clear()
@@ -0,0 +1,91 @@
+import datetime
+from collections import Counter
+from typing import Iterable, Optional
+
+from beancount.core import data
+from beancount.ingest.extract import DUPLICATE_META
+
+from .LedgerCache import ledger_cached
+
+
+class DedupIndex:
+    """Existing transactions indexed by (account, date, amount) and by Amex reference.
+
+    Looking an imported transaction up costs a few set probes, however large the ledger, where
+    beancount's similarity pass compares it with every existing entry. Matches are exact; dateWindow
+    widens the date match by that many days either side. A transaction with a reference is matched
+    by it alone, so two same-day purchases of the same amount are told apart.
+    """
+
+    def __init__(self, entries: Iterable[data.Directive], dateWindow: int = 0):
+        self.dateWindow = dateWindow
+        # How many existing postings have each key, so each can stand for only one imported one.
+        self.postings: Counter[tuple] = Counter()
+        self.references: set[str] = set()
+        for entry in entries:
+            if not isinstance(entry, data.Transaction):
+                continue
+            reference = entry.meta.get('reference') if entry.meta else None
+            if reference:
+                self.references.add(reference)
+            for posting in entry.postings:
+                key = self.posting_key(entry.date, posting)
+                if key is not None:
+                    self.postings[key] += 1
+
+    @staticmethod
+    def posting_key(date: datetime.date, posting: data.Posting) -> Optional[tuple]:
+        if posting.units is None or posting.units.number is None:
+            return None
+        return posting.account, date, posting.units.number.normalize(), posting.units.currency
+
+    def is_duplicate(self, entry: data.Directive, consumed: Optional[Counter] = None) -> bool:
+        """Whether entry is already in the ledger.
+
+        Existing postings counted in consumed are taken, and the one entry matches is added to it, so
+        entries checked against the same consumed match one existing posting each.
+        """
+        if not isinstance(entry, data.Transaction):
+            return False
+        reference = entry.meta.get('reference') if entry.meta else None
+        if reference:
+            return reference in self.references
+        consumed = Counter() if consumed is None else consumed
+        for posting in entry.postings:
+            key = self.posting_key(entry.date, posting)
+            if key is None:
+                continue
+            account, date, number, currency = key
+            for days in range(self.dateWindow + 1):
+                delta = datetime.timedelta(days=days)
+                for day in (date - delta, date + delta) if days else (date,):
+                    candidate = (account, day, number, currency)
+                    if self.postings[candidate] > consumed[candidate]:
+                        consumed[candidate] += 1
+                        return True
+        return False
+
+    def mark(self, entries: list[data.Directive]) -> list[data.Directive]:
+        """entries, with duplicates of the ledger carrying the __duplicate__ metadata bean-extract uses."""
+        consumed = Counter()
+        marked = []
+        for entry in entries:
+            if DUPLICATE_META not in entry.meta and self.is_duplicate(entry, consumed):
+                entry = entry._replace(meta={**entry.meta, DUPLICATE_META: True})
+            marked.append(entry)
+        return marked
+
+
+ledger_dedup_index = ledger_cached(DedupIndex)
+
+
+def mark_duplicates(entries: list[data.Directive], existing_entries) -> list[data.Directive]:
+    """Mark entries already in existing_entries, with an index built once per ledger."""
+    index = ledger_dedup_index(existing_entries)
+    return index.mark(entries) if index else entries
+
+
+def find_duplicate_entries(newEntriesList: list[tuple[str, list[data.Directive]]], existing_entries
+                           ) -> list[tuple[str, list[data.Directive]]]:
+    """Indexed stand-in for beancount.ingest.extract.find_duplicate_entries."""
+    return [(key, mark_duplicates(entries, existing_entries)) for key, entries in newEntriesList]
@@ -0,0 +1,54 @@
+import threading
+import weakref
+from typing import Any, Callable, Hashable, TypeVar
+
+from beancount.ingest import cache
+
+T = TypeVar('T')
+
+_contexts: 'weakref.WeakKeyDictionary[cache._FileMemo, FileContext]' = weakref.WeakKeyDictionary()
+_contextsLock = threading.Lock()
+
+
+class FileContext:
+    """Parse state for a single file, shared by every importer looking at the same _FileMemo.
+
+    Importers keep per-file artefacts here instead of on self, so one configured importer can
+    identify and extract many files, in any order and from many threads. Each value is computed
+    at most once, even when several threads ask for it at the same time.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._values: dict[Hashable, Any] = {}
+        self._locks: dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, compute: Callable[[], T]) -> T:
+        """Return the value stored under key, computing and storing it on first use.
+
+        If compute raises, nothing is stored and the next call tries again.
+        """
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+
+        with self._lock:
+            keyLock = self._locks.setdefault(key, threading.Lock())
+        with keyLock:
+            try:
+                return self._values[key]
+            except KeyError:
+                value = self._values[key] = compute()
+                return value
+
+
+def file_context(file: cache._FileMemo) -> FileContext:
+    """Return the FileContext for file, creating it on first use; it lives as long as the _FileMemo."""
+    with _contextsLock:
+        try:
+            return _contexts[file]
+        except KeyError:
+            context = _contexts[file] = FileContext(file.name)
+            return context
@@ -0,0 +1,230 @@
+import cProfile
+import functools
+import json
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, NamedTuple, Optional
+
+from beancount.ingest import cache
+
+
+class Event(NamedTuple):
+    """One finished phase: identify, extract, parse or a file.convert, for one file."""
+    phase: str
+    importer: str
+    file: str
+    # What ran: the converter's name for convert, else the method's.
+    detail: str
+    seconds: float
+    counters: dict[str, int]
+
+
+class Sink:
+    """Receives an Event as each instrumented phase finishes."""
+
+    def begin(self, phase: str):
+        """Called as a phase starts, before any phase nested in it."""
+
+    def record(self, event: Event):
+        raise NotImplementedError
+
+
+class MemorySink(Sink):
+    """Keeps every event in a list."""
+
+    def __init__(self):
+        self.events: list[Event] = []
+        self._lock = threading.Lock()
+
+    def record(self, event: Event):
+        with self._lock:
+            self.events.append(event)
+
+    def totals(self) -> dict[tuple[str, str], dict[str, float]]:
+        """calls, seconds and summed counters for each (importer, phase)."""
+        totals: dict[tuple[str, str], dict[str, float]] = {}
+        for event in self.events:
+            total = totals.setdefault((event.importer, event.phase), {'calls': 0, 'seconds': 0.0})
+            total['calls'] += 1
+            total['seconds'] += event.seconds
+            for name, value in event.counters.items():
+                total[name] = total.get(name, 0) + value
+        return totals
+
+
+class JsonLinesSink(Sink):
+    """Appends each event to a file as a line of JSON.
+
+    The file is opened on first use, so the sink can be sent to worker processes, each of which
+    appends its own whole lines.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'])
+
+    def record(self, event: Event):
+        line = json.dumps(event._asdict()) + '\n'
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class ProfileSink(Sink):
+    """Runs cProfile while any phase is running, passing events on to sink if one is given.
+
+    cProfile follows the thread that enabled it, so profile with BatchIngest jobs=1.
+    """
+
+    def __init__(self, sink: Optional[Sink] = None):
+        self.sink = sink
+        self.profile = cProfile.Profile()
+        self._depth = 0
+        self._lock = threading.Lock()
+
+    def begin(self, phase: str):
+        with self._lock:
+            if self._depth == 0:
+                self.profile.enable()
+            self._depth += 1
+        if self.sink is not None:
+            self.sink.begin(phase)
+
+    def record(self, event: Event):
+        with self._lock:
+            self._depth -= 1
+            if self._depth == 0:
+                self.profile.disable()
+        if self.sink is not None:
+            self.sink.record(event)
+
+    def stats(self) -> pstats.Stats:
+        return pstats.Stats(self.profile)
+
+    def dump_stats(self, path: str):
+        self.profile.dump_stats(path)
+
+
+# The active sink; None disables instrumentation, leaving only a global lookup per identify or extract.
+_sink: Optional[Sink] = None
+_local = threading.local()
+_originalConvert = cache._FileMemo.convert
+
+
+def get_sink() -> Optional[Sink]:
+    return _sink
+
+
+def set_sink(sink: Optional[Sink]) -> Optional[Sink]:
+    """Send events to sink from now on, or stop with None; returns the sink it replaces.
+
+    While a sink is set, _FileMemo.convert is timed too, mimetype detection included.
+    """
+    global _sink
+    previous, _sink = _sink, sink
+    cache._FileMemo.convert = _originalConvert if sink is None else _timed_convert
+    return previous
+
+
+@contextmanager
+def recording(sink: Optional[Sink]) -> Iterator[Optional[Sink]]:
+    """Send events to sink for the duration of the with block."""
+    previous = set_sink(sink)
+    try:
+        yield sink
+    finally:
+        set_sink(previous)
+
+
+def count(name: str, value: int = 1):
+    """Add value to counter name of every phase running in this thread, e.g. rows parsed."""
+    if _sink is None:
+        return
+    for counters in getattr(_local, 'stack', ()):
+        counters[name] = counters.get(name, 0) + value
+
+
+def _current_importer() -> str:
+    importers = getattr(_local, 'importers', None)
+    return importers[-1] if importers else ''
+
+
+def _measure(sink: Sink, phase: str, importerName: str, filename: str, detail: str,
+             run: Callable[[], Any], counters: dict[str, int],
+             measure: Optional[Callable[[Any], dict[str, int]]] = None) -> Any:
+    stack = _local.__dict__.setdefault('stack', [])
+    importers = _local.__dict__.setdefault('importers', [])
+    stack.append(counters)
+    importers.append(importerName)
+    sink.begin(phase)
+    start = time.perf_counter()
+    try:
+        result = run()
+        if measure is not None:
+            counters.update(measure(result))
+        return result
+    finally:
+        seconds = time.perf_counter() - start
+        stack.pop()
+        importers.pop()
+        sink.record(Event(phase, importerName, filename, detail, seconds, counters))
+
+
+def _timed_convert(file: cache._FileMemo, converter_func):
+    sink = _sink
+    if sink is None:
+        return _originalConvert(file, converter_func)
+    detail = getattr(converter_func, '__qualname__', type(converter_func).__name__)
+    return _measure(sink, 'convert', _current_importer(), file.name, detail,
+                    lambda: _originalConvert(file, converter_func), {'cached': int(converter_func in file._cache)})
+
+
+def _file_size(file) -> dict[str, int]:
+    try:
+        return {'bytes': os.path.getsize(file.name)}
+    except (OSError, AttributeError):
+        return {}
+
+
+_MEASURES: dict[str, Callable[[Any], dict[str, int]]] = {
+    'identify': lambda matched: {'matched': int(bool(matched))},
+    'extract': lambda entries: {'entries': len(entries)},
+}
+
+
+def instrumented(phase: str):
+    """Decorate an importer method taking the file first, so it reports phase to the active sink.
+
+    identify and extract also report the file's size, whether it matched and the entries made.
+    """
+    def decorate(method):
+        measure = _MEASURES.get(phase)
+
+        @functools.wraps(method)
+        def wrapper(self, file, *args, **kwargs):
+            sink = _sink
+            if sink is None:
+                return method(self, file, *args, **kwargs)
+            counters = _file_size(file) if phase in _MEASURES else {}
+            return _measure(sink, phase, self.name(), getattr(file, 'name', str(file)), method.__qualname__,
+                            lambda: method(self, file, *args, **kwargs), counters, measure)
+        return wrapper
+    return decorate
@@ -0,0 +1,27 @@
+import functools
+import threading
+from typing import Callable, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+def ledger_cached(build: Callable[[list], T]) -> Callable[[Optional[list]], Optional[T]]:
+    """Cache build(existing_entries) for the last ledger it was called with.
+
+    Every importer in a run is handed the same existing_entries list, so an index built from it
+    once serves them all. None or an empty ledger gives None without calling build.
+    """
+    lock = threading.Lock()
+    last = [None, None]
+
+    @functools.wraps(build)
+    def cached(existing_entries):
+        if not existing_entries:
+            return None
+        with lock:
+            if existing_entries is not last[0]:
+                last[1] = build(existing_entries)
+                last[0] = existing_entries
+            return last[1]
+
+    return cached
@@ -0,0 +1,94 @@
+import codecs
+import csv
+import mmap
+from typing import Iterator, Optional, Sequence, Union
+
+
+def iter_lines(filename: str) -> Iterator[bytes]:
+    """Lines of a file as bytes, line endings included, read through a memory map where possible.
+
+    Only the line being read is ever copied out of the map, so a file of any size costs one line's
+    worth of memory. Empty files, pipes and other inputs that cannot be mapped are streamed instead.
+    A UTF-8 byte order mark at the start of the file is dropped, as the utf-8-sig codec does.
+    """
+    with open(filename, 'rb') as infile:
+        try:
+            mapped = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            first = infile.readline()
+            if first:
+                yield first.removeprefix(codecs.BOM_UTF8)
+                yield from infile
+            return
+        with mapped:
+            if hasattr(mapped, 'madvise'):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            if mapped[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8:
+                mapped.seek(len(codecs.BOM_UTF8))
+            if mapped.find(b'\n') < 0:
+                # Lines ending in a bare \r, as old Mac exports have, or a single unterminated line.
+                yield from mapped[mapped.tell():].splitlines(keepends=True)
+                return
+            yield from iter(mapped.readline, b'')
+
+
+def iter_text_lines(filename: str, encoding: str = 'utf-8') -> Iterator[str]:
+    """Lines of a text file without their line endings, decoded one at a time from iter_lines."""
+    for line in iter_lines(filename):
+        yield line.decode(encoding).rstrip('\r\n')
+
+
+def iter_csv_fields(filename: str, columns: Sequence[Union[str, int]], header: bool = True
+                    ) -> Iterator[tuple[Optional[str], ...]]:
+    """The given columns of every non-blank row of a CSV, decoding only those fields.
+
+    columns are names from the header row when header is True, else indexes. Rows with a quote in
+    them are read by the csv module, so quoted commas and line breaks come out as csv.reader gives
+    them; the rest are split on commas without decoding the fields no one asked for. A field
+    missing from a short row is None, as csv.DictReader has it.
+    """
+    lines = iter_lines(filename)
+    pending = None
+
+    def quoted_lines():
+        # Hands the csv reader the line that needs it, then whatever further lines a quoted line break spans.
+        nonlocal pending
+        while True:
+            if pending is not None:
+                line, pending = pending, None
+            else:
+                line = next(lines, None)
+                if line is None:
+                    return
+            yield line.decode('utf-8')
+
+    reader = csv.reader(quoted_lines())
+
+    def split(line: bytes) -> Optional[list]:
+        nonlocal pending
+        if b'"' in line:
+            pending = line
+            return next(reader, None)
+        stripped = line.rstrip(b'\r\n')
+        return stripped.split(b',') if stripped else []
+
+    if header:
+        first = next(lines, None)
+        if first is None:
+            return
+        names = [name.decode('utf-8') if isinstance(name, bytes) else name for name in split(first) or []]
+        # A repeated name means its last column, as with csv.DictReader.
+        positions = {name: index for index, name in enumerate(names)}
+        indexes = [positions[column] for column in columns]
+    else:
+        indexes = list(columns)
+
+    for line in lines:
+        fields = split(line)
+        if not fields:
+            continue
+        count = len(fields)
+        if isinstance(fields[0], bytes):
+            yield tuple([fields[index].decode('utf-8') if index < count else None for index in indexes])
+        else:
+            yield tuple([fields[index] if index < count else None for index in indexes])
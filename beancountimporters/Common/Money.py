@@ -0,0 +1,90 @@
+import functools
+from decimal import Decimal
+from typing import Union
+
+from beancount.core.amount import Amount
+from beancount.core.number import D
+
+# An amount in whole pence when it was written with exactly two decimal places, otherwise the
+# Decimal itself, so the directive built later has the same number, exponent and sign as D(text).
+Pence = Union[int, Decimal]
+
+# Distinct amounts whose Amount is kept; a statement repeats the same few hundred prices many times over.
+AMOUNT_CACHE_SIZE = 16384
+
+
+def to_pence(number: Decimal) -> Pence:
+    sign, digits, exponent = number.as_tuple()
+    if exponent != -2 or (sign and not any(digits)):
+        return number
+    return int(number.scaleb(2))
+
+
+def parse_pence(text: str, negate: bool = False) -> Pence:
+    """An amount as written in a statement, straight to pence without a Decimal when it is plainly 12.34.
+
+    Anything else D accepts, such as 1,234.5, is kept as a Decimal. Raises ValueError for a blank,
+    malformed or non-finite amount.
+    """
+    whole, dot, fraction = text.partition('.')
+    digits = whole[1:] if whole[:1] == '-' else whole
+    if dot and len(fraction) == 2 and digits.isdigit() and fraction.isdigit():
+        pence = int(whole + fraction)
+        # -0.00 keeps its sign as a Decimal, but not as an int.
+        if pence or whole[:1] != '-' or negate:
+            return -pence if negate else pence
+    try:
+        number = D(text) if text.strip() else None
+    except ValueError:
+        number = None
+    if number is None or not number.is_finite():
+        raise ValueError(f'invalid amount {text!r}')
+    return to_pence(-number if negate else number)
+
+
+def parse_row_pence(text: str, filename: str, row: int, negate: bool = False) -> Pence:
+    """parse_pence, naming the file and 1-based row of a malformed amount."""
+    try:
+        return parse_pence(text, negate)
+    except ValueError:
+        raise ValueError(f'{filename}: Row {row}: invalid amount {text!r}') from None
+
+
+def negate_pence(amount: Pence) -> Pence:
+    """-amount, with the sign of a zero Decimal as -D(text) would give it."""
+    return -amount if type(amount) is int else to_pence(-amount)
+
+
+def scale_pence(amount: Pence, multiplier: int) -> Pence:
+    """amount times multiplier, as -D(text) * -multiplier for a negative multiplier, else D(text) * multiplier."""
+    if type(amount) is int:
+        return amount * multiplier
+    return to_pence(-amount * -multiplier if multiplier < 0 else amount * multiplier)
+
+
+def round_pence(number: Decimal) -> Pence:
+    """number rounded to two decimal places, as D(format(number, '.2f')) is."""
+    return to_pence(number.quantize(Decimal('0.01')))
+
+
+@functools.lru_cache(maxsize=AMOUNT_CACHE_SIZE)
+def _pence_to_decimal(pence: int) -> Decimal:
+    return Decimal(pence).scaleb(-2)
+
+
+def from_pence(amount: Pence) -> Decimal:
+    return _pence_to_decimal(amount) if type(amount) is int else amount
+
+
+@functools.lru_cache(maxsize=AMOUNT_CACHE_SIZE)
+def _pence_amount(pence: int, currency: str) -> Amount:
+    return Amount(_pence_to_decimal(pence), currency)
+
+
+def pence_amount(amount: Pence, currency: str) -> Amount:
+    """The Amount for amount, shared between every posting of the same whole-pence amount.
+
+    Amounts are immutable, so one instance serves them all. Decimals are not interned: 1.5 and 1.50
+    are equal, and would share an entry, but print differently.
+    """
+    return _pence_amount(amount, currency) if type(amount) is int else Amount(amount, currency)
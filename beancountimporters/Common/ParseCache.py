@@ -0,0 +1,134 @@
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from beancount.ingest import cache
+
+
+def default_cache_dir() -> Path:
+    """$BEANCOUNTIMPORTERS_CACHE, else beancountimporters under the XDG cache directory."""
+    if 'BEANCOUNTIMPORTERS_CACHE' in os.environ:
+        return Path(os.environ['BEANCOUNTIMPORTERS_CACHE'])
+    base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'beancountimporters'
+
+
+def content_hash(filename: str) -> str:
+    """sha256 of the file's bytes, read in chunks."""
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as infile:
+        for chunk in iter(lambda: infile.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """On-disk cache of converted file contents, shared across importer instances and processes.
+
+    Entries are keyed by the file's content hash plus the converter's name and version, so an
+    edited file or a bumped converter version is simply a miss. Once the cache directory grows
+    past maxBytes, the least recently used entries are evicted.
+    """
+
+    def __init__(self, directory: Optional[str] = None, maxBytes: int = 256 * 1024 * 1024):
+        self.directory = Path(directory) if directory else default_cache_dir()
+        self.maxBytes = maxBytes
+        self.hits = 0
+        self.misses = 0
+        self._converters: dict[tuple[Callable, str], Callable[[str], Any]] = {}
+
+    def __getstate__(self):
+        # The wrapped converters are closures; rebuild them lazily after unpickling in a worker.
+        state = self.__dict__.copy()
+        state['_converters'] = {}
+        return state
+
+    def convert(self, file: cache._FileMemo, converter: Callable[[str], Any], version: str) -> Any:
+        """Like file.convert(converter), but backed by the disk cache."""
+        return file.convert(self.converter(converter, version))
+
+    def converter(self, converter: Callable[[str], Any], version: str) -> Callable[[str], Any]:
+        """Return a stable converter function wrapping converter, suitable for _FileMemo.convert.
+
+        Returning the same function each time lets _FileMemo keep memoising within a process.
+        """
+        try:
+            return self._converters[(converter, version)]
+        except KeyError:
+            def cached_converter(filename: str) -> Any:
+                return self.load_or_convert(filename, converter, version)
+
+            self._converters[(converter, version)] = cached_converter
+            return cached_converter
+
+    def key(self, filename: str, converter: Callable[[str], Any], version: str) -> str:
+        converterName = f'{converter.__module__}.{converter.__qualname__}'
+        return hashlib.sha256(f'{content_hash(filename)}:{converterName}:{version}'.encode()).hexdigest()
+
+    def load_or_convert(self, filename: str, converter: Callable[[str], Any], version: str) -> Any:
+        path = self.directory / f'{self.key(filename, converter, version)}.pickle'
+        try:
+            with open(path, 'rb') as infile:
+                result = pickle.load(infile)
+        except FileNotFoundError:
+            pass
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            # Corrupt or stale entry; drop it and convert afresh.
+            path.unlink(missing_ok=True)
+        else:
+            self.hits += 1
+            # Bump the mtime, which doubles as the LRU timestamp.
+            os.utime(path)
+            return result
+
+        self.misses += 1
+        result = converter(filename)
+        self.store(path, result)
+        return result
+
+    def store(self, path: Path, result: Any):
+        # Logged rather than printed: stdout carries the extracted entries.
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmpname = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        except OSError as e:
+            logging.warning("Could not write parse cache entry %s: %s", path, e)
+            return
+        try:
+            with os.fdopen(fd, 'wb') as outfile:
+                pickle.dump(result, outfile, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmpname, path)
+        except (OSError, pickle.PicklingError, AttributeError, TypeError) as e:
+            # Anything pickle cannot store, such as a local function, is simply not cached.
+            Path(tmpname).unlink(missing_ok=True)
+            logging.warning("Could not write parse cache entry %s: %s", path, e)
+            return
+        except BaseException:
+            Path(tmpname).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in maxBytes."""
+        entries = []
+        for path in self.directory.glob('*.pickle'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.maxBytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self):
+        for path in self.directory.glob('*.pickle'):
+            path.unlink(missing_ok=True)
@@ -0,0 +1,53 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Iterator, NamedTuple
+
+if TYPE_CHECKING:
+    from pypdf import PdfReader
+
+
+class PageText(NamedTuple):
+    """Text of one PDF page and how long it took to decode."""
+    number: int
+    text: str
+    seconds: float
+
+
+def _extract_page(reader: 'PdfReader', number: int, layout: bool) -> PageText:
+    start = time.perf_counter()
+    text = reader.pages[number].extract_text(extraction_mode='layout' if layout else 'plain')
+    return PageText(number, text, time.perf_counter() - start)
+
+
+def _extract_page_from_file(filename: str, number: int, layout: bool) -> PageText:
+    from pypdf import PdfReader
+    return _extract_page(PdfReader(filename), number, layout)
+
+
+def iter_pdf_pages(filename: str, workers: int = 1, layout: bool = False) -> Iterator[PageText]:
+    """Decode the pages of a PDF lazily, in page order.
+
+    Pages are only decoded as the caller asks for them, so stopping early skips the rest of the
+    document. With workers > 1, pages are decoded in parallel batches of that many, each worker
+    opening its own reader. layout=True uses pypdf's layout mode, which keeps columns aligned but
+    changes word positions compared to the default plain text.
+    """
+    from pypdf import PdfReader
+    reader = PdfReader(filename)
+    pageCount = len(reader.pages)
+    if workers <= 1 or pageCount <= 1:
+        for number in range(pageCount):
+            yield _extract_page(reader, number, layout)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for batchStart in range(0, pageCount, workers):
+            batch = [pool.submit(_extract_page_from_file, filename, number, layout)
+                     for number in range(batchStart, min(batchStart + workers, pageCount))]
+            for future in batch:
+                yield future.result()
+
+
+def pdf_pages_to_text(filename: str, workers: int = 1, layout: bool = False) -> str:
+    """Text of every page of a PDF, joined once at the end."""
+    return ''.join(page.text for page in iter_pdf_pages(filename, workers, layout))
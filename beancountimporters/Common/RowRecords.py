@@ -0,0 +1,84 @@
+import datetime
+from array import array
+from decimal import Decimal
+from typing import Iterable, Iterator, Sequence
+
+from .Money import Pence, from_pence
+
+
+class RowRecord:
+    """A CSV row reduced to what the importers read, before any directive is built for it."""
+
+    __slots__ = ('lineno', 'ordinal', 'amount', 'text')
+
+    def __init__(self, lineno: int, ordinal: int, amount: Pence, text: tuple[str, ...]):
+        self.lineno = lineno
+        self.ordinal = ordinal
+        self.amount = amount
+        self.text = text
+
+    @property
+    def date(self) -> datetime.date:
+        return datetime.date.fromordinal(self.ordinal)
+
+    @property
+    def number(self) -> Decimal:
+        return from_pence(self.amount)
+
+    def __repr__(self):
+        return f'RowRecord({self.lineno}, {self.date}, {self.number}, {self.text!r})'
+
+
+class RowTable:
+    """Every row of a CSV as columns: date ordinals, amounts in pence and offsets into shared text.
+
+    Repeated descriptions are stored once, and a row costs a few machine words until it is read
+    back as a RowRecord.
+    """
+
+    __slots__ = ('ordinals', 'pence', 'amounts', 'offsets', 'strings', 'stringIndex')
+
+    def __init__(self, width: int):
+        self.ordinals = array('l')
+        self.pence = array('q')
+        # Amounts that are not whole pence, by row index.
+        self.amounts: dict[int, Decimal] = {}
+        # One column of offsets into strings per text column.
+        self.offsets = [array('L') for _ in range(width)]
+        self.strings: list[str] = []
+        self.stringIndex: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.ordinals)
+
+    def add_number(self, ordinal: int, amount: Pence):
+        """Date ordinal and amount of the next row; rows are numbered in the order these are added."""
+        if isinstance(amount, int):
+            self.pence.append(amount)
+        else:
+            self.pence.append(0)
+            self.amounts[len(self.ordinals)] = amount
+        self.ordinals.append(ordinal)
+
+    def add_text(self, text: Sequence[str]):
+        """Text columns of the next row."""
+        for column, value in zip(self.offsets, text):
+            offset = self.stringIndex.get(value)
+            if offset is None:
+                offset = self.stringIndex[value] = len(self.strings)
+                self.strings.append(value)
+            column.append(offset)
+
+    def __iter__(self) -> Iterator[RowRecord]:
+        return self._records(range(len(self)), zip(self.ordinals, self.pence, *self.offsets))
+
+    def __reversed__(self) -> Iterator[RowRecord]:
+        """Rows last to first, without copying the table."""
+        columns = [reversed(column) for column in (self.ordinals, self.pence, *self.offsets)]
+        return self._records(range(len(self) - 1, -1, -1), zip(*columns))
+
+    def _records(self, indexes: Iterable[int], rows: Iterator[tuple]) -> Iterator[RowRecord]:
+        strings, amounts = self.strings, self.amounts
+        for index, (ordinal, pence, *offsets) in zip(indexes, rows):
+            yield RowRecord(index + 1, ordinal, amounts.get(index, pence) if amounts else pence,
+                            tuple([strings[offset] for offset in offsets]))
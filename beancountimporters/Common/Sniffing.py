@@ -0,0 +1,90 @@
+import csv
+import io
+import os
+import re
+from typing import Optional
+
+# Upper bound on what identify reads from any one file.
+HEAD_BYTES = 8192
+
+_dmyDate = re.compile(r'\d{2}/\d{2}/\d{4}')
+_amount = re.compile(r'-?[\d,]*\.?\d+')
+
+
+def first_line(filename: str) -> str:
+    """First line of a text file, reading at most HEAD_BYTES."""
+    with open(filename, 'rb') as infile:
+        head = infile.read(HEAD_BYTES)
+    line = head.split(b'\n', 1)[0].rstrip(b'\r')
+    return line.decode('utf-8', errors='replace').lstrip('\ufeff')
+
+
+def first_content_line(filename: str) -> str:
+    """First line that is neither blank nor a # comment, within the first HEAD_BYTES."""
+    with open(filename, 'rb') as infile:
+        head = infile.read(HEAD_BYTES)
+    for line in head.decode('utf-8', errors='replace').lstrip('\ufeff').splitlines():
+        if line.strip() and not line.startswith('#'):
+            return line.strip()
+    return ''
+
+
+def first_csv_row(filename: str) -> list[str]:
+    """First line of a CSV, split into fields."""
+    return next(csv.reader([first_line(filename)]), [])
+
+
+def _record_start(tail: bytes) -> Optional[int]:
+    """Offset in tail of the start of its last CSV record, or None if it starts before tail does.
+
+    The text ends outside quotes, so a newline is a record boundary when an even number of quotes follow it.
+    """
+    quotes = 0
+    end = len(tail)
+    while (newline := tail.rfind(b'\n', 0, end)) >= 0:
+        quotes += tail.count(b'"', newline, end)
+        if quotes % 2 == 0:
+            return newline + 1
+        end = newline
+    return None
+
+
+def last_csv_row(filename: str) -> list[str]:
+    """Last non-blank record of a CSV, split into fields, keeping a quoted field that spans lines whole.
+
+    Reads HEAD_BYTES from the end of the file, and further back only if the record started before them.
+    """
+    with open(filename, 'rb') as infile:
+        end = infile.seek(0, os.SEEK_END)
+        size = HEAD_BYTES
+        while True:
+            start = max(0, end - size)
+            infile.seek(start)
+            tail = infile.read().rstrip(b'\r\n')
+            recordStart = _record_start(tail)
+            if recordStart is not None or start == 0:
+                break
+            size *= 2
+    text = tail[recordStart or 0:].decode('utf-8', errors='replace').lstrip('\ufeff')
+    return next(csv.reader(io.StringIO(text, newline='')), [])
+
+
+def first_pdf_page_text(filename: str) -> str:
+    """Text of the first page of a PDF only; '' if it has no pages or is unreadable."""
+    # pypdf is slow to import, and only needed once a PDF is actually read.
+    from pypdf import PdfReader
+    from pypdf.errors import PdfReadError
+    try:
+        reader = PdfReader(filename)
+        if len(reader.pages) == 0:
+            return ''
+        return reader.pages[0].extract_text()
+    except PdfReadError:
+        return ''
+
+
+def looks_like_dmy_amount_row(row: list[str], dateColumn: int, amountColumn: int) -> bool:
+    """Whether row has a DD/MM/YYYY date and an amount in the given columns."""
+    if len(row) <= max(dateColumn, amountColumn):
+        return False
+    return bool(_dmyDate.fullmatch(row[dateColumn].strip()) and _amount.fullmatch(row[amountColumn].strip()))
@@ -0,0 +1,120 @@
+import datetime
+from typing import Sequence
+
+import numpy as np
+
+from .Dates import parse_dmy
+from .Money import Pence, parse_pence
+
+_SLASH = ord('/')
+_ZERO = ord('0')
+_DOT = ord('.')
+_MINUS = ord('-')
+
+# Widest amount summed as a byte matrix; 16 digits of pence cannot overflow an int64.
+_MAX_AMOUNT_WIDTH = 18
+
+
+def _first_index(inverse: np.ndarray, uniqueIndex: int) -> int:
+    return int(np.argmax(inverse == uniqueIndex))
+
+
+def parse_dmy_dates(values: Sequence[str]) -> list[datetime.date]:
+    """Parse DD/MM/YYYY strings in bulk.
+
+    Distinct strings are decoded together as a byte matrix, validated (digits, separators and day of
+    month) with array operations, and turned into datetime.date once each. Strings that are not
+    zero-padded go through the scalar parse instead. Raises ValueError naming the 1-based row of the
+    first invalid value.
+    """
+    if len(values) == 0:
+        return []
+
+    uniques, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    encoded = np.char.encode(uniques, 'ascii', 'replace')
+    fixedWidth = np.char.str_len(encoded) == 10
+    matrix = np.zeros((len(uniques), 10), dtype=np.uint8)
+    matrix[fixedWidth] = encoded[fixedWidth].astype('S10').view(np.uint8).reshape(-1, 10)
+
+    digits = matrix.astype(np.int32) - _ZERO
+    digitColumns = [0, 1, 3, 4, 6, 7, 8, 9]
+    wellFormed = (fixedWidth
+                  & (matrix[:, 2] == _SLASH) & (matrix[:, 5] == _SLASH)
+                  & ((digits[:, digitColumns] >= 0) & (digits[:, digitColumns] <= 9)).all(axis=1))
+
+    days = digits[:, 0] * 10 + digits[:, 1]
+    months = digits[:, 3] * 10 + digits[:, 4]
+    years = digits[:, 6] * 1000 + digits[:, 7] * 100 + digits[:, 8] * 10 + digits[:, 9]
+    wellFormed &= (years >= 1) & (months >= 1) & (months <= 12) & (days >= 1)
+
+    # Build dates as month start plus day offset; a day past the end of its month spills into the next.
+    yearStarts = (np.where(wellFormed, years, 1970) - 1970).astype('datetime64[Y]')
+    monthStarts = yearStarts.astype('datetime64[M]') + (np.where(wellFormed, months, 1) - 1).astype('timedelta64[M]')
+    nextMonthStarts = (monthStarts + np.timedelta64(1, 'M')).astype('datetime64[D]')
+    dates = monthStarts.astype('datetime64[D]') + (np.where(wellFormed, days, 1) - 1).astype('timedelta64[D]')
+    invalid = wellFormed & (dates >= nextMonthStarts)
+    if invalid.any():
+        bad = int(np.argmax(invalid))
+        raise ValueError(f'Row {_first_index(inverse, bad) + 1}: invalid date {uniques[bad]!r}')
+
+    parsed = dates.astype(object)
+    for index in np.flatnonzero(~wellFormed):
+        # Not fixed-width DD/MM/YYYY; fall back to the forgiving scalar parse.
+        value = str(uniques[index])
+        try:
+            parsed[index] = parse_dmy(value)
+        except ValueError as e:
+            raise ValueError(f'Row {_first_index(inverse, index) + 1}: invalid date {value!r}') from e
+
+    return parsed[inverse].tolist()
+
+
+def parse_amounts(values: Sequence[str], negate: bool = False) -> list[Pence]:
+    """Parse amount strings in bulk, each to what parse_pence(value, negate) gives.
+
+    Plain amounts such as -12.34 are decoded together as a byte matrix, validated and summed into
+    pence with array operations. Anything else, such as 1,234.5 or -0.00, goes through the scalar
+    parse instead. Raises ValueError naming the 1-based row of the first invalid value.
+    """
+    if len(values) == 0:
+        return []
+
+    try:
+        matrix = np.asarray(values, dtype='S')
+    except UnicodeEncodeError:
+        matrix = None
+    width = matrix.dtype.itemsize if matrix is not None else 0
+    if not 0 < width <= _MAX_AMOUNT_WIDTH:
+        return [_parse_amount(value, row, negate) for row, value in enumerate(values, 1)]
+
+    matrix = matrix.view(np.uint8).reshape(len(values), width)
+    present = matrix != 0
+    lengths = np.where(present.any(axis=1), width - present[:, ::-1].argmax(axis=1), 0)
+    columns = np.arange(width)
+    signed = matrix[:, 0] == _MINUS
+    dots = lengths - 3
+    inNumber = (columns >= signed[:, None]) & (columns < lengths[:, None]) & (columns != dots[:, None])
+    digits = matrix.astype(np.int64) - _ZERO
+    plain = ((dots > signed)
+             & (matrix[np.arange(len(values)), np.maximum(dots, 0)] == _DOT)
+             & (((digits >= 0) & (digits <= 9)) | ~inNumber).all(axis=1))
+
+    # A digit's place is its distance from the end, less one if it is left of the point.
+    places = lengths[:, None] - 1 - columns - (columns < dots[:, None])
+    pence = (np.where(inNumber, digits, 0) * 10 ** np.clip(places, 0, None)).sum(axis=1)
+    pence = np.where(signed != negate, -pence, pence)
+    if not negate:
+        # -0.00 keeps its sign as a Decimal, but not as an int.
+        plain &= ~(signed & (pence == 0))
+
+    parsed = pence.tolist()
+    for index in np.flatnonzero(~plain).tolist():
+        parsed[index] = _parse_amount(values[index], index + 1, negate)
+    return parsed
+
+
+def _parse_amount(value: str, row: int, negate: bool) -> Pence:
+    try:
+        return parse_pence(value, negate)
+    except ValueError as e:
+        raise ValueError(f'Row {row}: invalid amount {value!r}') from e
@@ -0,0 +1,91 @@
+import datetime
+import functools
+from collections import Counter
+from typing import Iterable, NamedTuple, Optional
+
+from beancount.core import data
+
+from .LedgerCache import ledger_cached
+
+
+class Watermark(NamedTuple):
+    """The latest date an account has entries for in the ledger, and a fingerprint of each of them."""
+    date: datetime.date
+    fingerprints: tuple[str, ...]
+
+
+def entry_fingerprint(entry: data.Transaction, account: str) -> str:
+    """Identity of an imported row that survives editing its payee, narration or other postings.
+
+    Amex rows carry a reference; for the rest the amount posted to account is the best we have.
+    """
+    reference = entry.meta.get('reference') if entry.meta else None
+    if reference:
+        return f'reference:{reference}'
+    for posting in entry.postings:
+        if posting.account == account and posting.units is not None and posting.units.number is not None:
+            return f'{posting.units.number.normalize()} {posting.units.currency}'
+    return ''
+
+
+def watermarks_from_entries(entries: Iterable[data.Directive], anyPosting: bool = False) -> dict[str, Watermark]:
+    """Watermark for every account that is the source of a transaction in entries.
+
+    An importer puts its own account's posting first, and a categoriser or the user adds the
+    postings that balance it after, so only the first posting's account is a transaction's source.
+    Otherwise paying the Amex bill from the current account would move the Amex watermark past
+    purchases not yet imported. anyPosting counts every account posted to instead.
+    """
+    dates: dict[str, datetime.date] = {}
+    fingerprints: dict[str, list[str]] = {}
+    for entry in entries:
+        if not isinstance(entry, data.Transaction) or not entry.postings:
+            continue
+        accounts = {posting.account for posting in entry.postings} if anyPosting else {entry.postings[0].account}
+        for account in accounts:
+            latest = dates.get(account)
+            if latest is None or entry.date > latest:
+                dates[account] = entry.date
+                fingerprints[account] = [entry_fingerprint(entry, account)]
+            elif entry.date == latest:
+                fingerprints[account].append(entry_fingerprint(entry, account))
+    return {account: Watermark(date, tuple(fingerprints[account])) for account, date in dates.items()}
+
+
+ledger_watermarks = ledger_cached(watermarks_from_entries)
+ledger_posting_watermarks = ledger_cached(functools.partial(watermarks_from_entries, anyPosting=True))
+
+
+def account_watermark(account: str, existing_entries, anyPosting: bool = False) -> Optional[Watermark]:
+    """Watermark for account in existing_entries, or None if it has no entries yet.
+
+    anyPosting is for an account only its own importer ever posts to, such as a payslip's salary
+    account, which comes after the others in the transactions it is the source of.
+    """
+    watermarks = (ledger_posting_watermarks if anyPosting else ledger_watermarks)(existing_entries)
+    return watermarks.get(account) if watermarks else None
+
+
+class WatermarkFilter:
+    """Tells new entries from ones already imported up to an account's watermark.
+
+    Rows dated before the watermark can be dropped by date alone, before any directive is built.
+    On the watermark date each fingerprint in the ledger accounts for one row, so two identical
+    transactions on the same day are only skipped if both were imported.
+    """
+
+    def __init__(self, account: str, watermark: Optional[Watermark]):
+        self.account = account
+        self.since: Optional[datetime.date] = watermark.date if watermark else None
+        self.remaining = Counter(watermark.fingerprints) if watermark else Counter()
+
+    def is_new(self, entry: data.Transaction) -> bool:
+        if self.since is None or entry.date > self.since:
+            return True
+        if entry.date < self.since:
+            return False
+        fingerprint = entry_fingerprint(entry, self.account)
+        if self.remaining[fingerprint] > 0:
+            self.remaining[fingerprint] -= 1
+            return False
+        return True
@@ -0,0 +1,16 @@
+import importlib
+
+# Modules are loaded on first access; several pull in NumPy or pypdf, which most importers never need.
+_MODULES = ('BalanceCheck', 'Categorise', 'Classifier', 'CsvEngine', 'Dates', 'Dedup', 'FileContext',
+            'Instrumentation', 'LedgerCache', 'MappedFile', 'Money', 'ParseCache', 'PdfText', 'RowRecords', 'Sniffing',
+            'VectorParse', 'Watermarks')
+
+
+def __getattr__(name: str):
+    if name not in _MODULES:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    return importlib.import_module(f'.{name}', __name__)
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_MODULES))
@@ -1,90 +1,151 @@
-import collections
-import csv
 import datetime
+import logging
+from typing import Iterator, Optional
 
-from beancount.ingest import importer, cache
+from beancount.ingest import cache
 from beancount.core import data
 from beancount.core import flags
-from beancount.core.amount import Amount
-from beancount.core.number import D
 
+from ..Common.BalanceCheck import BalanceMismatch, csv_balance_mismatch
+from ..Common.Categorise import Categoriser
+from ..Common.CsvEngine import CsvImporter, csv_to_list, iter_csv_rows
+from ..Common.Dates import parse_dmy
+from ..Common.Instrumentation import instrumented
+from ..Common.Money import pence_amount, parse_row_pence
+from ..Common.RowRecords import RowRecord
+from ..Common.Sniffing import first_line, last_csv_row
 
-def csv_to_list(filename: str):
-    with open(filename, 'r') as infile:
-        rows: [str] = infile.readlines()
-    return rows
 
+# First day of the balance assertion period a date falls in, for each balanceinterval.
+PERIOD_STARTS = {
+    'daily': lambda date: date,
+    'weekly': lambda date: date - datetime.timedelta(days=date.weekday()),
+    'monthly': lambda date: date.replace(day=1),
+    'yearly': lambda date: date.replace(month=1, day=1),
+}
 
-class Importer(importer.ImporterProtocol):
-    """Beancount importer for FirstDirect 1st Account CSV"""
+# Position of the Balance column in textColumns.
+_BALANCE = 1
 
-    def __init__(self, currentaccount: str, flag: str = ''):
+
+class Importer(CsvImporter):
+    """Beancount importer for FirstDirect 1st Account CSV
+
+    Transactions are extracted oldest first whichever way the file is sorted. Every row's Balance is
+    checked against the one before it before anything else is read, so a corrupt or partial download
+    is not identified and fails extract with the line it goes wrong on. balanceinterval ('daily', 'weekly', 'monthly' or
+    'yearly') adds a balance assertion at the start of each period as well as the closing one.
+    """
+
+    textColumns = ('Description', 'Balance')
+
+    def __init__(self, currentaccount: str, flag: str = '', vectorized: bool = False, incremental: bool = False,
+                 balanceinterval: Optional[str] = None, categoriser: Optional[Categoriser] = None):
+        if balanceinterval is not None and balanceinterval not in PERIOD_STARTS:
+            raise ValueError(f'balanceinterval must be one of {", ".join(PERIOD_STARTS)}, not {balanceinterval!r}')
         self.currentAccount = currentaccount
         self.currency = "GBP"
         self.FLAG = flags.FLAG_WARNING if flag == '' else flags.FLAG_OKAY
-        self.cachedRows: [str] = None
+        self.vectorized = vectorized
+        self.incremental = incremental
+        self.balanceInterval = balanceinterval
+        self.categoriser = categoriser
 
+    @instrumented('identify')
     def identify(self, file: cache._FileMemo) -> bool:
         if file.mimetype() != 'text/csv':
             return False
 
-        self.cachedRows = file.convert(csv_to_list)
-        if self.cachedRows:
-            return self.cachedRows[0].startswith("Date,Description,Amount,Balance")
-
-        return False
-
-    def extract(self, file, existing_entries=None):
-        if self.cachedRows is None:
-            self.cachedRows = file.convert(csv_to_list)
-
-        rows = csv.DictReader(self.cachedRows)
-        txns = collections.deque()
-        finalBalance = None
-
-        for idx, row in enumerate(rows):
-            meta = data.new_metadata(file.name, idx + 1)
-            postings = [data.Posting(
-                account=self.currentAccount,
-                units=Amount(D(row['Amount']), self.currency),
-                cost=None, price=None, flag=None, meta=None
-            )]
-            splitdate = row['Date'].split('/')
-            d = splitdate[0]
-            m = splitdate[1]
-            y = splitdate[2]
-            newdate = datetime.date(int(y), int(m), int(d))
-            txn = data.Transaction(
-                meta=meta,
-                date=newdate,
-                flag=self.FLAG,
-                payee=None,
-                narration=row['Description'],
-                postings=postings,
-                tags=data.EMPTY_SET,
-                links=data.EMPTY_SET
-            )
-            # Most Recent item is first in CSV, and we want it to be last; add to left.
-            txns.appendleft(txn)
-            if idx == 0:
-                finalBalance = (newdate, idx + 1, row['Balance'])
-
-        if finalBalance is not None:
-            balanceDirective = data.Balance(
-                meta=data.new_metadata(file.name, finalBalance[1], kvlist={'date': self.file_date(file)}),
-                date=finalBalance[0],
-                account=self.currentAccount,
-                amount=Amount(D(finalBalance[2]), self.currency),
-                diff_amount=None, tolerance=None
-            )
-            txns.append(balanceDirective)
-
-        return list(txns)
+        if not file.convert(first_line).startswith("Date,Description,Amount,Balance"):
+            return False
+
+        mismatch = file.convert(self.balance_mismatch)
+        if mismatch is not None:
+            logging.warning("%s: line %d: %s; not importing", file.name, mismatch.lineno, mismatch.reason)
+            return False
+        return True
+
+    def make_transaction(self, file, lineno, row, date, units):
+        meta = data.new_metadata(file.name, lineno)
+        postings = [data.Posting(
+            account=self.currentAccount,
+            units=units,
+            cost=None, price=None, flag=None, meta=None
+        )]
+        return data.Transaction(
+            meta=meta,
+            date=date,
+            flag=self.FLAG,
+            payee=None,
+            narration=row['Description'],
+            postings=postings,
+            tags=data.EMPTY_SET,
+            links=data.EMPTY_SET
+        )
+
+    def is_descending(self, filename: str) -> bool:
+        """Whether filename lists its most recent row first, judged by its first and last rows.
+
+        FirstDirect exports are most recent first, so a file whose rows all share a date is taken to be
+        too, as is one whose first or last row is too damaged to date; the balance check reports those.
+        """
+        first = next(iter_csv_rows(filename, self.hasHeader), None)
+        if first is None:
+            return True
+        try:
+            return parse_dmy(first[self.dateColumn]) >= parse_dmy(last_csv_row(filename)[0])
+        except (ValueError, IndexError):
+            return True
+
+    def balance_mismatch(self, filename: str) -> Optional[BalanceMismatch]:
+        """First row of filename whose Balance does not follow from the previous row's, in one pass."""
+        return csv_balance_mismatch(filename, self.is_descending(filename), self.amountColumn, 'Balance')
+
+    def iter_chronological(self, file: cache._FileMemo) -> Iterator[RowRecord]:
+        """Rows oldest first: streamed if the file is ascending, else read into a RowTable and walked backwards."""
+        if not file.convert(self.is_descending):
+            return self.iter_records(file)
+        return reversed(self.read_table(file))
+
+    def iter_extract(self, file, existing_entries=None):
+        """Yield transactions oldest first, each period's opening balance before it, then the closing balance."""
+        mismatch = file.convert(self.balance_mismatch)
+        if mismatch is not None:
+            raise ValueError(f'{file.name}: line {mismatch.lineno}: {mismatch.reason}')
+
+        watermark = self.watermark_filter(file, existing_entries)
+        sinceOrdinal = watermark.since.toordinal() if watermark.since is not None else None
+        periodStart = PERIOD_STARTS.get(self.balanceInterval)
+
+        previous = None
+        for record in self.iter_chronological(file):
+            if periodStart is not None and previous is not None and periodStart(record.date) != periodStart(previous.date):
+                start = periodStart(record.date)
+                if sinceOrdinal is None or start.toordinal() >= sinceOrdinal:
+                    yield self.make_balance(file, previous.lineno, start, previous.text[_BALANCE])
+            previous = record
+
+            if sinceOrdinal is not None and record.ordinal < sinceOrdinal:
+                continue
+            _, txn = self.record_to_entry(file, record)
+            if watermark.is_new(txn):
+                yield self.categorise(txn, existing_entries)
+
+        if previous is not None and (sinceOrdinal is None or previous.ordinal >= sinceOrdinal):
+            yield self.make_balance(file, previous.lineno, previous.date, previous.text[_BALANCE],
+                                    {'date': self.file_date(file)})
+
+    def make_balance(self, file, lineno, date, balance, kvlist=None):
+        return data.Balance(
+            meta=data.new_metadata(file.name, lineno, kvlist=kvlist),
+            date=date,
+            account=self.currentAccount,
+            amount=pence_amount(parse_row_pence(balance, file.name, lineno), self.currency),
+            diff_amount=None, tolerance=None
+        )
 
     def file_account(self, file):
         return self.currentAccount
 
     def file_date(self, file):
         return datetime.date.today()
-
-
@@ -0,0 +1,99 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from multiprocessing import get_context
+from typing import AsyncIterator, Optional, Sequence
+
+from beancount.core import data
+from beancount.ingest import cache, importer
+
+from ..Common.Instrumentation import Sink, recording
+from .BatchIngest import _init_worker, _process_file, find_files, process_file
+
+# Files of these types spend their time in pypdf rather than waiting on the disk, so get a process of their own.
+CPU_BOUND_MIMETYPES = frozenset({'application/pdf'})
+
+_DONE = object()
+
+
+async def ingest_stream(importers: Sequence[importer.ImporterProtocol],
+                        paths: Sequence[str],
+                        existing_entries: Optional[list[data.Directive]] = None,
+                        threads: int = 8,
+                        processes: Optional[int] = None,
+                        buffer: int = 16,
+                        sink: Optional[Sink] = None
+                        ) -> AsyncIterator[tuple[str, importer.ImporterProtocol, list[data.Directive]]]:
+    """Identify and extract every file under paths, yielding (filename, importer, entries) as each file finishes.
+
+    Each file's mimetype is sniffed on the event loop. CPU-bound types, such as PDF payslips, are
+    identified and extracted by up to processes worker processes, started only once the first such
+    file turns up; None uses every CPU and 0 keeps everything in threads. The rest, CSVs and QIFs,
+    go to up to threads threads. Each stage takes files from a queue of at most buffer, and finished
+    results wait in one of the same size, so a consumer that stops reading pauses the pipeline
+    rather than letting results pile up. Duplicates of existing_entries are marked as by ingest, but
+    results come in the order files finish, so a slow PDF holds up nothing else.
+    """
+    loop = asyncio.get_running_loop()
+    processes = (os.cpu_count() or 1) if processes is None else processes
+    threadQueue: asyncio.Queue = asyncio.Queue(buffer)
+    processQueue: asyncio.Queue = asyncio.Queue(buffer)
+    results: asyncio.Queue = asyncio.Queue(buffer)
+    threadPool = ThreadPoolExecutor(threads, thread_name_prefix='ingest')
+    processPool: list[ProcessPoolExecutor] = []
+
+    def process_executor() -> Executor:
+        if not processPool:
+            # Threads are already running by now, which makes forking this process unsafe; the fork
+            # server forks from a clean one with the package already imported instead.
+            context = get_context('forkserver')
+            context.set_forkserver_preload([__name__, 'pypdf'])
+            processPool.append(ProcessPoolExecutor(max_workers=processes, mp_context=context,
+                                                   initializer=_init_worker,
+                                                   initargs=(importers, existing_entries, sink)))
+        return processPool[0]
+
+    async def route():
+        for filename in await asyncio.to_thread(find_files, paths):
+            cpuBound = processes > 0 and cache.get_file(filename).mimetype() in CPU_BOUND_MIMETYPES
+            await (processQueue if cpuBound else threadQueue).put(filename)
+        for _ in range(threads):
+            await threadQueue.put(None)
+        for _ in range(processes):
+            await processQueue.put(None)
+
+    async def work(queue: asyncio.Queue, executor, convert):
+        while (filename := await queue.get()) is not None:
+            for index, entries in await loop.run_in_executor(executor(), convert, filename):
+                await results.put((filename, importers[index], entries))
+
+    completed = False
+    with recording(sink) if sink is not None else nullcontext():
+        threadConvert = functools.partial(process_file, importers, existing_entries=existing_entries)
+        tasks = [asyncio.create_task(route()),
+                 *(asyncio.create_task(work(threadQueue, lambda: threadPool, threadConvert)) for _ in range(threads)),
+                 *(asyncio.create_task(work(processQueue, process_executor, _process_file)) for _ in range(processes))]
+
+        async def run():
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                # Once the consumer has gone, nothing is left to read _DONE, and the queue may be full.
+                if not asyncio.current_task().cancelling():
+                    await results.put(_DONE)
+
+        supervisor = asyncio.create_task(run())
+        try:
+            while (result := await results.get()) is not _DONE:
+                yield result
+            # Raises whatever stopped a stage early.
+            await supervisor
+            completed = True
+        finally:
+            for task in [supervisor, *tasks]:
+                task.cancel()
+            threadPool.shutdown(wait=completed, cancel_futures=True)
+            for pool in processPool:
+                pool.shutdown(wait=completed, cancel_futures=True)
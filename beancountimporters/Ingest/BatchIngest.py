@@ -0,0 +1,121 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from typing import Optional, Sequence, TextIO
+
+from beancount.core import data
+from beancount.ingest import cache, extract, identify, importer
+from beancount.utils import file_utils
+
+from ..Common.Instrumentation import Sink, recording, set_sink
+
+# Set in each worker process by _init_worker, so importers and existing entries are sent once per worker.
+_workerImporters: Sequence[importer.ImporterProtocol] = ()
+_workerEntries: Optional[list[data.Directive]] = None
+
+
+def _init_worker(importers: Sequence[importer.ImporterProtocol], existing_entries: Optional[list[data.Directive]],
+                 sink: Optional[Sink] = None):
+    global _workerImporters, _workerEntries
+    _workerImporters = importers
+    _workerEntries = existing_entries
+    if sink is not None:
+        set_sink(sink)
+
+
+def identify_file(importers: Sequence[importer.ImporterProtocol], filename: str) -> list[int]:
+    """Indexes of the importers which identify filename."""
+    file = cache.get_file(filename)
+    matches = []
+    for index, fileImporter in enumerate(importers):
+        try:
+            if fileImporter.identify(file):
+                matches.append(index)
+        except Exception as exc:
+            logging.exception("Importer %s.identify() raised an unexpected error: %s", fileImporter.name(), exc)
+    return matches
+
+
+def extract_file(fileImporter: importer.ImporterProtocol, filename: str,
+                 existing_entries: Optional[list[data.Directive]]) -> list[data.Directive]:
+    try:
+        return extract.extract_from_file(filename, fileImporter, existing_entries=existing_entries)
+    except Exception as exc:
+        logging.exception("Importer %s.extract() raised an unexpected error: %s", fileImporter.name(), exc)
+        return []
+
+
+def process_file(importers: Sequence[importer.ImporterProtocol], filename: str,
+                 existing_entries: Optional[list[data.Directive]]) -> list[tuple[int, list[data.Directive]]]:
+    """Identify and extract one file, giving (importer index, entries) for each match."""
+    return [(index, extract_file(importers[index], filename, existing_entries))
+            for index in identify_file(importers, filename)]
+
+
+def _identify_file(filename: str) -> list[int]:
+    return identify_file(_workerImporters, filename)
+
+
+def _extract_file(job: tuple[str, int]) -> list[data.Directive]:
+    filename, index = job
+    return extract_file(_workerImporters[index], filename, _workerEntries)
+
+
+def _process_file(filename: str) -> list[tuple[int, list[data.Directive]]]:
+    return process_file(_workerImporters, filename, _workerEntries)
+
+
+def find_files(paths: Sequence[str]) -> list[str]:
+    """Absolute names of every file under paths, in a stable order."""
+    return list(dict.fromkeys(os.path.abspath(filename) for filename in file_utils.find_files(list(paths))))
+
+
+def ingest(importers: Sequence[importer.ImporterProtocol],
+           paths: Sequence[str],
+           existing_entries: Optional[list[data.Directive]] = None,
+           jobs: Optional[int] = None,
+           sink: Optional[Sink] = None) -> list[tuple[str, list[data.Directive]]]:
+    """Identify every file under paths, then extract each (file, importer) match over a process pool.
+
+    Returns (filename, entries) pairs ordered by filename and then by the importer's position in
+    importers, regardless of the order in which workers finish. Each importer marks duplicates of
+    existing_entries as it extracts, as bean-extract does, though by indexed exact match rather than
+    its similarity pass. jobs=1 runs everything in this process; None uses every CPU.
+    Instrumentation events go to sink; other than with jobs=1 each worker gets a copy of it, so use
+    one that writes somewhere, such as a JsonLinesSink.
+    """
+    return [(filename, entries)
+            for filename, _, entries in ingest_files(importers, find_files(paths), existing_entries, jobs, sink)]
+
+
+def ingest_files(importers: Sequence[importer.ImporterProtocol],
+                 files: Sequence[str],
+                 existing_entries: Optional[list[data.Directive]] = None,
+                 jobs: Optional[int] = None,
+                 sink: Optional[Sink] = None) -> list[tuple[str, importer.ImporterProtocol, list[data.Directive]]]:
+    """As ingest, over a list of absolute filenames, giving the importer that extracted each file's entries too."""
+    if jobs == 1:
+        _init_worker(importers, existing_entries)
+        with recording(sink) if sink is not None else nullcontext():
+            matches = [_identify_file(filename) for filename in files]
+            work = [(filename, index) for filename, indexes in zip(files, matches) for index in indexes]
+            extracted = [_extract_file(job) for job in work]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(importers, existing_entries, sink)) as pool:
+            matches = list(pool.map(_identify_file, files))
+            work = [(filename, index) for filename, indexes in zip(files, matches) for index in indexes]
+            # pool.map yields in submission order, which keeps the merge deterministic.
+            extracted = list(pool.map(_extract_file, work))
+
+    return [(filename, importers[index], entries) for (filename, index), entries in zip(work, extracted)]
+
+
+def write_extracted(newEntriesList: list[tuple[str, list[data.Directive]]], output: TextIO, ascending: bool = True):
+    """Write extracted entries in the same layout as bean-extract."""
+    output.write(extract.HEADER)
+    for filename, entries in newEntriesList:
+        output.write(identify.SECTION.format(filename))
+        output.write('\n')
+        extract.print_extracted_entries(entries if ascending else entries[::-1], output)
@@ -0,0 +1,167 @@
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple, Optional, Sequence
+
+from beancount import loader
+from beancount.core import data
+from beancount.ingest import cache, importer
+
+from ..Common.Instrumentation import Sink
+from ..Common.ParseCache import content_hash
+from .BatchIngest import find_files, ingest_files, write_extracted
+
+# Browsers download to one of these and rename it once it is complete.
+PARTIAL_SUFFIXES = ('.crdownload', '.part', '.partial', '.download', '.tmp')
+
+
+class FileState(NamedTuple):
+    """What a file looked like when it was last extracted."""
+    mtime: int
+    size: int
+    digest: str
+
+
+def staging_name(account: str) -> str:
+    """Name of the staging file for account, e.g. Liabilities-Amex.beancount."""
+    return account.replace(':', '-') + '.beancount'
+
+
+class Watcher:
+    """Polls paths for new and changed files and extracts only those, keeping staging files up to date.
+
+    Importers, the beancount file cache and any ParseCache stay loaded between polls, so a new
+    download costs one identify and extract rather than a cold run over everything. A file is only
+    hashed once its size or mtime changes, and only extracted if its content did too; one modified
+    within the last settle seconds is left for the next poll, as it may still be being written.
+    Entries are written per account to stagingdir in bean-extract's layout, each file replaced
+    whole so readers never see it half written. When ledger changes it is reloaded and every file
+    re-extracted against it, so entries imported since are marked as duplicates.
+    """
+
+    def __init__(self, importers: Sequence[importer.ImporterProtocol], paths: Sequence[str], stagingdir: str,
+                 ledger: Optional[str] = None, interval: float = 2.0, settle: float = 1.0, ascending: bool = True,
+                 sink: Optional[Sink] = None):
+        self.importers = importers
+        self.paths = list(paths)
+        self.stagingDir = Path(stagingdir).absolute()
+        self.ledger = ledger
+        self.interval = interval
+        self.settle = settle
+        self.ascending = ascending
+        self.sink = sink
+        self.states: dict[str, FileState] = {}
+        # Entries extracted from each file, by the account of the importer that extracted them.
+        self.extracted: dict[str, dict[str, list[data.Directive]]] = {}
+        self.existingEntries: Optional[list[data.Directive]] = None
+        self.ledgerStamp: Optional[tuple[int, int]] = None
+        self.hashed = 0
+        self.extractions = 0
+
+    def load_ledger(self) -> bool:
+        """Load ledger if it has changed since it was last loaded, returning whether it had."""
+        if self.ledger is None:
+            return False
+        try:
+            stat = os.stat(self.ledger)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            stamp = None
+        if stamp == self.ledgerStamp:
+            return False
+        self.ledgerStamp = stamp
+        self.existingEntries = loader.load_file(self.ledger)[0] if stamp is not None else None
+        return True
+
+    def watched_files(self) -> list[str]:
+        return [filename for filename in find_files(self.paths)
+                if not filename.endswith(PARTIAL_SUFFIXES)
+                and not os.path.basename(filename).startswith('.')
+                and not Path(filename).is_relative_to(self.stagingDir)]
+
+    def changed_files(self) -> tuple[list[str], list[str]]:
+        """Files new or changed in content since the last call, and those since removed."""
+        now = time.time()
+        seen = set()
+        changed = []
+        for filename in self.watched_files():
+            try:
+                stat = os.stat(filename)
+            except FileNotFoundError:
+                continue
+            seen.add(filename)
+            previous = self.states.get(filename)
+            if previous is not None and (previous.mtime, previous.size) == (stat.st_mtime_ns, stat.st_size):
+                continue
+            if now - stat.st_mtime < self.settle:
+                continue
+            # Recorded with the stat from before hashing, so a write during it is caught next time.
+            digest = content_hash(filename)
+            self.hashed += 1
+            self.states[filename] = FileState(stat.st_mtime_ns, stat.st_size, digest)
+            if previous is None or previous.digest != digest:
+                changed.append(filename)
+        removed = [filename for filename in self.states if filename not in seen]
+        for filename in removed:
+            del self.states[filename]
+        return changed, removed
+
+    def poll(self) -> list[str]:
+        """Extract whatever has changed since the last poll and rewrite the staging files affected.
+
+        Returns the files found new or changed, whether or not an importer identified them.
+        """
+        changed, removed = self.changed_files()
+        if self.load_ledger():
+            changed = sorted(set(changed) | set(self.extracted))
+        if not changed and not removed:
+            return []
+
+        accounts = set()
+        for filename in [*removed, *changed]:
+            accounts.update(self.extracted.pop(filename, {}))
+            # Drop the memo, and with it every conversion and FileContext of the old contents.
+            cache._CACHE.pop(filename, None)
+
+        for filename, fileImporter, entries in ingest_files(self.importers, changed, self.existingEntries, jobs=1,
+                                                            sink=self.sink):
+            account = fileImporter.file_account(cache.get_file(filename))
+            self.extracted.setdefault(filename, {}).setdefault(account, []).extend(entries)
+            accounts.add(account)
+        self.extractions += len(changed)
+
+        for account in sorted(accounts):
+            self.write_staging(account)
+        return changed
+
+    def write_staging(self, account: str):
+        """Write every entry extracted for account to its staging file, or remove it if there are none."""
+        newEntriesList = [(filename, byAccount[account]) for filename, byAccount in sorted(self.extracted.items())
+                          if account in byAccount]
+        path = self.stagingDir / staging_name(account)
+        if not newEntriesList:
+            path.unlink(missing_ok=True)
+            return
+        self.stagingDir.mkdir(parents=True, exist_ok=True)
+        fd, tmpname = tempfile.mkstemp(dir=self.stagingDir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as output:
+                write_extracted(newEntriesList, output, self.ascending)
+            os.replace(tmpname, path)
+        except BaseException:
+            os.unlink(tmpname)
+            raise
+
+    def run(self, stop: Optional[threading.Event] = None):
+        """Poll every interval seconds until stop is set; errors are logged and polling carries on."""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            try:
+                for filename in self.poll():
+                    logging.info("Read %s", filename)
+            except Exception as exc:
+                logging.exception("Watching %s failed: %s", ', '.join(self.paths), exc)
+            stop.wait(self.interval)
@@ -0,0 +1 @@
+from . import AsyncIngest, BatchIngest, Watcher
@@ -1,84 +1,144 @@
 import datetime
-from typing import Optional
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
 
 from beancount.core import flags, data
-from beancount.core.amount import Amount
-from beancount.core.number import D
 from beancount.ingest import importer, cache
-from quiffen import Qif, AccountType, Transaction, ParserException, Account
+
+from ..Common.Categorise import Categoriser
+from ..Common.Dedup import mark_duplicates
+from ..Common.FileContext import file_context
+from ..Common.Instrumentation import count, instrumented
+from ..Common.Money import negate_pence, pence_amount, round_pence
+from ..Common.ParseCache import ParseCache
+from ..Common.Sniffing import first_content_line
+from ..Common.Watermarks import WatermarkFilter, account_watermark
+from .QifReader import DEFAULT_ACCOUNT, QifRecord, iter_qif_records, read_qif_records_day_first, \
+    read_qif_records_month_first
+
+if TYPE_CHECKING:
+    from quiffen import Qif, AccountType, Transaction, Account
+
+
+# Bump when the read functions change, so stale parse cache entries are ignored.
+QIF_READER_VERSION = '1'
 
 
 class QifImporter(importer.ImporterProtocol):
-    """Importer for Qif Files."""
+    """Importer for Qif Files.
+
+    By default only the qifaccount (or the default account of a file without !Account headers) is
+    imported, into destinationaccount. accountmap instead maps (QIF account name, QIF account type)
+    pairs such as ('Current', 'Bank') to beancount accounts, so every account and section of a
+    multi-account file is extracted in one pass; '' names the default account there too.
+    Setting incremental skips transactions already in existing_entries, up to each account's watermark.
+    A categoriser adds the counter-posting of each transaction its rules match.
+    """
 
     def __init__(self,
                  destinationaccount: str,
                  dayfirst: bool,
                  qifaccount: str = '',
-                 currency: str = 'GBP'):
-        self.qifObject = None
+                 currency: str = 'GBP',
+                 parsecache: Optional[ParseCache] = None,
+                 accountmap: Optional[dict[tuple[str, str], str]] = None,
+                 incremental: bool = False,
+                 categoriser: Optional[Categoriser] = None):
         self.destinationAccount = destinationaccount
         self.dayFirst = dayfirst
         self.qifAccount = qifaccount
         self.currency = currency
         self.FLAG = flags.FLAG_OKAY
+        self.parseCache = parsecache
+        self.incremental = incremental
+        self.categoriser = categoriser
+        self.accountMap = None if accountmap is None else {
+            (name or DEFAULT_ACCOUNT, accountType): account for (name, accountType), account in accountmap.items()}
 
     def name(self) -> str:
         return f'QifImporter.{self.destinationAccount}'
 
+    @instrumented('identify')
     def identify(self, file: cache._FileMemo) -> bool:
         if not file.name.endswith('.qif'):
             return False
 
-        try:
-            self.qifObject = Qif.parse(file.name, day_first=self.dayFirst)
-        except ParserException:
-            return False
-
-        return True
-
-    def extract(self, file: cache._FileMemo, existing_entries=None) -> list[data.Transaction]:
-        if self.qifObject is None:
-            self.qifObject = Qif.parse(file.name, day_first=self.dayFirst)
-
-        account = self.GetQifAccount()
-        if not account:
-            return []
-
-        if len(account.transactions) != 1:
-            print('More than one "transaction" in account.transactions, aborting.')
-            return []
-        (accounttype, transactionlist), = account.transactions.items()
-
-        invertSign = self.GetInvertSign(accounttype)
-        if invertSign is None:
-            return []
-
-        txns = []
-        transaction: Transaction
-        for transaction in transactionlist:
-            meta = data.new_metadata(filename=file.name, lineno=transaction.line_number)
-            formattedAmount = format(transaction.amount, '.2f')
-            amount = Amount(-D(formattedAmount), currency=self.currency) if invertSign else Amount(
-                D(formattedAmount), currency=self.currency)
+        # A QIF file opens with a header such as !Type:Bank, !Account or !Option:AutoSwitch.
+        return file.convert(first_content_line).startswith('!')
+
+    def iter_extract(self, file: cache._FileMemo, existing_entries=None) -> Iterator[data.Transaction]:
+        """Yield transactions for every mapped account and section, reading the file once."""
+        accounts = set()
+        sections = {}
+        watermarks = {}
+        rows = 0
+        record: QifRecord
+        for rows, record in enumerate(self.records(file), 1):
+            accounts.add(record.account)
+            section = (record.account, record.accountType)
+            if section not in sections:
+                sections[section] = self.section_posting_rule(section)
+            rule = sections[section]
+            if rule is None:
+                continue
+            destinationAccount, invertSign = rule
+            if destinationAccount not in watermarks:
+                watermarks[destinationAccount] = WatermarkFilter(
+                    destinationAccount,
+                    account_watermark(destinationAccount, existing_entries) if self.incremental else None)
+            watermark = watermarks[destinationAccount]
+            if watermark.since is not None and record.date < watermark.since:
+                continue
+
+            meta = data.new_metadata(filename=file.name, lineno=record.line_number)
+            pence = round_pence(record.amount)
             postings = [data.Posting(
-                account=self.destinationAccount,
-                units=amount,
+                account=destinationAccount,
+                units=pence_amount(negate_pence(pence) if invertSign else pence, self.currency),
                 cost=None, price=None, flag=None, meta=None
             )]
             txn = data.Transaction(
                 meta=meta,
-                date=transaction.date.date(),
+                date=record.date,
                 flag=self.FLAG,
-                payee=transaction.payee.rstrip(),
-                narration=self.GetNarration(transaction),
+                payee=record.payee.rstrip() if record.payee is not None else None,
+                narration=self.GetNarration(record),
                 postings=postings,
                 tags=data.EMPTY_SET,
                 links=data.EMPTY_SET
             )
-            txns.append(txn)
+            if watermark.is_new(txn):
+                yield txn if self.categoriser is None else self.categoriser.categorise(txn, existing_entries)
+
+        count('rows', rows)
+        if not any(rule is not None for rule in sections.values()):
+            print(f'Number of accounts = {len(accounts)} and specified account ({self.qifAccount}) or default account not found.')
+
+    @instrumented('extract')
+    def extract(self, file: cache._FileMemo, existing_entries=None) -> list[data.Transaction]:
+        return mark_duplicates(list(self.iter_extract(file, existing_entries)), existing_entries)
+
+    def section_posting_rule(self, section: tuple[str, str]) -> Optional[tuple[str, bool]]:
+        """Beancount account and sign inversion for a (QIF account, QIF type) section, or None to skip it."""
+        qifAccount, accountType = section
+        if self.accountMap is None:
+            destinationAccount = self.destinationAccount if qifAccount == (self.qifAccount or DEFAULT_ACCOUNT) else None
+        else:
+            destinationAccount = self.accountMap.get(section)
+        if destinationAccount is None:
+            return None
+
+        from quiffen import AccountType
+        invertSign = self.GetInvertSign(AccountType(accountType))
+        if invertSign is None:
+            return None
+        return destinationAccount, invertSign
 
-        return txns
+    def records(self, file: cache._FileMemo) -> Iterable[QifRecord]:
+        """Transactions in file from the native reader, streamed unless a parse cache is configured."""
+        if self.parseCache is None:
+            return iter_qif_records(file.name, self.dayFirst)
+        reader = read_qif_records_day_first if self.dayFirst else read_qif_records_month_first
+        return file_context(file).get(reader, lambda: self.parseCache.convert(file, reader, QIF_READER_VERSION))
 
     def file_account(self, file: cache._FileMemo) -> str:
         return self.destinationAccount
@@ -86,18 +146,18 @@ class QifImporter(importer.ImporterProtocol):
     def file_date(self, file: cache._FileMemo) -> datetime.date:
         return datetime.date.today()
 
-    def GetQifAccount(self) -> Optional[Account]:
-        if self.qifObject is None:
+    def GetQifAccount(self, qifObject: Optional['Qif']) -> Optional['Account']:
+        if qifObject is None:
             raise ValueError("QifObject is None so an account cannot be determined.")
         try:
-            return self.qifObject.accounts[self.qifAccount] if self.qifAccount else self.qifObject.accounts[
+            return qifObject.accounts[self.qifAccount] if self.qifAccount else qifObject.accounts[
                 'Quiffen Default Account']
         except KeyError:
-            print(f'Number of accounts = {len(self.qifObject.accounts)} and specified account ({self.qifAccount}) or default account not found.')
+            print(f'Number of accounts = {len(qifObject.accounts)} and specified account ({self.qifAccount}) or default account not found.')
             return None
 
     @staticmethod
-    def GetNarration(transaction: Transaction) -> Optional[str]:
+    def GetNarration(transaction: 'Transaction | QifRecord') -> Optional[str]:
         narrations = []
         if transaction.memo:
             narrations.append(f'Memo: {transaction.memo}')
@@ -114,7 +174,8 @@ class QifImporter(importer.ImporterProtocol):
         return ', '.join(narrations)
 
     @staticmethod
-    def GetInvertSign(accounttype: AccountType) -> Optional[bool]:
+    def GetInvertSign(accounttype: 'AccountType') -> Optional[bool]:
+        from quiffen import AccountType
         match accounttype:
             case AccountType.CASH | AccountType.BANK:
                 return False
@@ -0,0 +1,202 @@
+import datetime
+import re
+from decimal import Decimal
+from typing import Iterator, NamedTuple, Optional
+
+from ..Common.Dates import parse_qif_date
+from ..Common.MappedFile import iter_text_lines
+
+DEFAULT_ACCOUNT = 'Quiffen Default Account'
+
+TRANSACTION_HEADERS = frozenset(['!type:cash', '!type:bank', '!type:ccard', '!type:otha', '!type:othl', '!type:invoice'])
+
+# Line codes read into a record, or accepted and ignored; anything else is rejected as quiffen does.
+IGNORED_LINE_CODES = frozenset('AEF$£%1234567X')
+
+_invalidAmountCharacters = re.compile(r'[^\d.-]')
+
+
+class QifRecord(NamedTuple):
+    """One transaction from a QIF file, with only the fields the importer reads."""
+    account: str
+    accountType: str
+    line_number: int
+    date: Optional[datetime.date]
+    amount: Optional[Decimal]
+    payee: Optional[str]
+    memo: Optional[str]
+    cleared: Optional[str]
+    categories: tuple[str, ...]
+    check_number: Optional[str]
+
+    @property
+    def category(self):
+        """The quiffen Category for the record's L lines, built only when asked for."""
+        if not self.categories:
+            return None
+
+        from quiffen.core.category import create_categories_from_hierarchy
+        category = None
+        for hierarchy in self.categories:
+            child = create_categories_from_hierarchy(hierarchy)
+            if category is not None:
+                child.traverse_up()[-1].set_parent(category)
+            category = child
+        return category
+
+
+def parse_qif_amount(value: str) -> Decimal:
+    """A T or U line, ignoring currency symbols and thousands separators."""
+    return Decimal(_invalidAmountCharacters.sub('', value))
+
+
+def _is_preamble(line: str) -> bool:
+    stripped = line.strip()
+    return not stripped or stripped.startswith('!Clear:') or stripped.startswith('!Option:') or line[0] == '#'
+
+
+def iter_qif_records(filename: str, dayfirst: bool) -> Iterator[QifRecord]:
+    """Yield the transactions in a QIF file one at a time, holding a single section in memory.
+
+    The file is read through a memory map, a line at a time, rather than as one string.
+
+    Reads the same sections, headers and accounts as quiffen's Qif.parse and numbers records the
+    same way, so line_number matches what quiffen reports.
+    """
+    lineNumber = 1
+    lastHeader = None
+    account = None
+    accountType = None
+    # A section is the lines between ^ separators; a separator also swallows the blank lines after it.
+    section = None
+    afterSeparator = False
+
+    def read_section(lines):
+        nonlocal lineNumber, lastHeader, account, accountType
+        for i, line in enumerate(lines):
+            if not _is_preamble(line):
+                break
+        else:
+            return None
+        lineNumber += i
+        header = lines[i]
+        if header[0] != '!':
+            if not lastHeader:
+                raise ValueError(f'Line {lineNumber}: No header found before transactions.')
+            header = lastHeader
+        lastHeader = header
+
+        fields = [line for line in lines[i:] if line.strip() and line.strip()[0] != '!']
+        if not fields:
+            return None
+
+        record = None
+        if '!Account' in header:
+            account = _account_name(fields)
+        elif '!Type:Invst' in header:
+            record = QifRecord(account, 'Invst', lineNumber, None, None, None, None, None, (), None)
+        elif '!Type' in header and account is None and '!Type:Cat' not in header and \
+                '!Type:Class' not in header and '!Type:Security' not in header:
+            account = DEFAULT_ACCOUNT
+
+        if header.lower().replace(' ', '') in TRANSACTION_HEADERS:
+            accountType = header.split(':')[1].strip()
+            record = _read_transaction(fields, account, accountType, lineNumber, dayfirst)
+
+        lineNumber += len(lines)
+        return record
+
+    for line in iter_text_lines(filename):
+        if section is None:
+            # Leading whitespace is stripped from the file as a whole.
+            if not line.strip():
+                continue
+            section = [line.lstrip()]
+        elif line[:1] == '^' and not line[1:].strip():
+            section.append('')
+            if section != ['']:
+                record = read_section(section)
+                if record is not None:
+                    yield record
+            section = ['']
+            afterSeparator = True
+        elif afterSeparator and not line.strip():
+            continue
+        else:
+            afterSeparator = False
+            section.append(line)
+
+    if section is None or section == ['']:
+        return
+    # Trailing whitespace is stripped from the file as a whole too.
+    while section and not section[-1].strip():
+        section.pop()
+    section[-1] = section[-1].rstrip()
+    record = read_section(section)
+    if record is not None:
+        yield record
+
+
+def read_qif_records(filename: str, dayfirst: bool) -> list[QifRecord]:
+    return list(iter_qif_records(filename, dayfirst))
+
+
+def read_qif_records_day_first(filename: str) -> list[QifRecord]:
+    return read_qif_records(filename, True)
+
+
+def read_qif_records_month_first(filename: str) -> list[QifRecord]:
+    return read_qif_records(filename, False)
+
+
+def _account_name(fields: list[str]) -> Optional[str]:
+    name = None
+    for field in fields:
+        if field[0] == 'N':
+            name = field[1:]
+    return name
+
+
+def _read_transaction(fields: list[str], account: Optional[str], accountType: str, lineNumber: int,
+                      dayfirst: bool) -> QifRecord:
+    if account is None:
+        raise ValueError(f'Line {lineNumber}: No account found before transactions.')
+
+    date = amount = payee = memo = cleared = checkNumber = None
+    categories = []
+    inSplits = False
+    for field in fields:
+        code, info = field[0], field[1:]
+        if code == 'S':
+            # Everything after the first split line describes the splits, bar the payee.
+            inSplits = True
+        elif code == 'P':
+            payee = info
+        elif code in IGNORED_LINE_CODES:
+            continue
+        elif inSplits:
+            if code not in 'DTUMCLN':
+                raise ValueError(f'Line {lineNumber}: Unknown line code: {code}')
+        elif code == 'D':
+            date = parse_qif_date(info, dayfirst)
+        elif code in 'TU':
+            try:
+                amount = parse_qif_amount(info)
+            except ArithmeticError:
+                raise ValueError(f'Line {lineNumber}: invalid amount {info!r}') from None
+        elif code == 'M':
+            memo = info
+        elif code == 'C':
+            cleared = info
+        elif code == 'L':
+            category = info.split('/')[0] if '/' in info else info
+            # [Account] is a transfer rather than a category.
+            if not category.startswith('['):
+                categories.append(category)
+        elif code == 'N':
+            checkNumber = info
+        else:
+            raise ValueError(f'Line {lineNumber}: Unknown line code: {code}')
+
+    return QifRecord(account, accountType, lineNumber, date, amount, payee, memo, cleared, tuple(categories),
+                     checkNumber)
@@ -1 +1,2 @@
-from . import QifImporter
\ No newline at end of file
+from . import QifImporter
+from . import QifReader
\ No newline at end of file
@@ -1,5 +1,15 @@
-from .AccessSalaryImporter import AccessSalaryImporter
-from .AmexCSVImporter import AmexCSVImporter
-from .FirstAccountImporter import FirstAccountImporter
-from .HSBCCCImporter import HSBCCCImporter
-from .QifImporter import QifImporter
\ No newline at end of file
+import importlib
+
+# Each importer is loaded on first access, so a config using only the CSV importers never imports pypdf or quiffen.
+_IMPORTERS = ('AccessSalaryImporter', 'AmexCSVImporter', 'FirstAccountImporter', 'HSBCCCImporter', 'QifImporter')
+
+
+def __getattr__(name: str):
+    if name not in _IMPORTERS:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    module = globals()[name] = importlib.import_module(f'.{name}.{name}', __name__)
+    return module
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_IMPORTERS))
@@ -1,22 +1,47 @@
-def main():
-    import AccessSalaryImporter
-    from beancount.ingest import cache
-    import os
-
-    # fc = cache.get_file(os.getcwd() + "/AccessSalaryImporter/My Payslip 22-DEC-22.pdf")
-    # imp = AccessSalaryImporter.Importer("", "", "20")
-    # print(imp.identify(fc))
-    # x = imp.extract(fc)
-    # print(x)
-    import FirstAccountImporter
-    from beancount.ingest import cache
-    fc = cache.get_file(os.getcwd() + "/FirstAccountImporter/25012023_1621.csv")
-    imp = FirstAccountImporter.Importer(currentaccount="current", groceriesaccount="groceries", phoneaccount="phoneac", flag="*")
-    x = imp.identify(fc)
-    print(x)
-    y = imp.extract(fc)
-    input("Continue")
+import argparse
+import logging
+import runpy
+import sys
+
+from beancount import loader
+
+from .Ingest.BatchIngest import ingest, write_extracted
+from .Ingest.Watcher import Watcher
+
+
+def main(argv=None):
+    """Batch ingest: python -m beancountimporters.main CONFIG PATH [PATH ...] [--watch STAGING_DIR]"""
+    parser = argparse.ArgumentParser(description="Identify and extract a tree of downloads in parallel.")
+    parser.add_argument('config', help='Python file defining CONFIG, a list of importer instances (as for bean-extract).')
+    parser.add_argument('paths', nargs='+', help='Files or directories to import.')
+    parser.add_argument('-e', '--existing', metavar='BEANCOUNT_FILE', default=None,
+                        help='Beancount file whose entries are used for de-duplication.')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='Worker processes; defaults to the CPU count, 1 runs in-process.')
+    parser.add_argument('-r', '--reverse', action='store_false', dest='ascending',
+                        help='Write out the entries in descending order.')
+    parser.add_argument('-w', '--watch', metavar='STAGING_DIR', default=None,
+                        help='Keep running, extracting new and changed files to a staging file per account.')
+    parser.add_argument('--interval', type=float, default=2.0, help='Seconds between polls when watching.')
+    args = parser.parse_args(argv)
+
+    importers = runpy.run_path(args.config)['CONFIG']
+    if args.watch:
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+        watcher = Watcher(importers, args.paths, args.watch, ledger=args.existing, interval=args.interval,
+                          ascending=args.ascending)
+        try:
+            watcher.run()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    existingEntries = loader.load_file(args.existing)[0] if args.existing else None
+
+    newEntriesList = ingest(importers, args.paths, existing_entries=existingEntries, jobs=args.jobs)
+    write_extracted(newEntriesList, sys.stdout, ascending=args.ascending)
+    return 0
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
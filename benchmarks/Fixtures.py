@@ -0,0 +1,53 @@
+import datetime
+import random
+from pathlib import Path
+
+from tests.Utilities import AMEX_HEADER, PAYSLIP_LINES, write_text_pdf
+
+_start = datetime.date(2020, 1, 1)
+
+
+def _days(count: int, seed: int):
+    """count (date, pence) pairs, newest first, spread over roughly five years."""
+    rng = random.Random(seed)
+    for i in range(count):
+        yield _start + datetime.timedelta(days=(count - i) * 1825 // max(count, 1)), rng.randint(-50000, 50000)
+
+
+def write_amex_csv(path: Path, rows: int, seed: int = 1):
+    with open(path, 'w', newline='') as outfile:
+        outfile.write(AMEX_HEADER + "\r\n")
+        for i, (date, pence) in enumerate(_days(rows, seed)):
+            outfile.write(f"{date:%d/%m/%Y},MERCHANT {i % 500},{pence / 100:.2f},\"Card purchase\nref {i}\","
+                          f"MERCHANT {i % 500},1 HIGH ST,HULL,HU1 1AA,UNITED KINGDOM,'AT{i:021d}',Shopping\r\n")
+
+
+def write_first_account_csv(path: Path, rows: int, seed: int = 2):
+    balance = 100000
+    with open(path, 'w', newline='') as outfile:
+        outfile.write("Date,Description,Amount,Balance\n")
+        for i, (date, pence) in enumerate(_days(rows, seed)):
+            outfile.write(f"{date:%d/%m/%Y},PAYEE {i % 500},{pence / 100:.2f},{balance / 100:.2f}\n")
+            balance -= pence
+
+
+def write_hsbc_csv(path: Path, rows: int, seed: int = 3):
+    with open(path, 'w', newline='') as outfile:
+        for i, (date, pence) in enumerate(_days(rows, seed)):
+            outfile.write(f"{date:%d/%m/%Y},MERCHANT {i % 500}          01926865061   GB,{pence / 100:.2f}\r\n")
+
+
+def write_qif(path: Path, transactions: int, accountType: str = "CCard", seed: int = 4):
+    with open(path, 'w') as outfile:
+        outfile.write(f"!Type:{accountType}\n")
+        for i, (date, pence) in enumerate(_days(transactions, seed)):
+            outfile.write(f"D{date:%d/%m/%Y}\nT{pence / 100:.2f}\nPPayee {i % 500}\n")
+            if i % 3 == 0:
+                outfile.write(f"MMemo {i}\n")
+            outfile.write("^\n")
+
+
+def write_payslip_pdf(path: Path, pages: int):
+    """A payslip on the first page followed by pages - 1 pages of notes."""
+    write_text_pdf(path, [PAYSLIP_LINES] + [[f"Notes page {page} line {line}" for line in range(40)]
+                                            for page in range(1, pages)])
@@ -0,0 +1,185 @@
+"""Measure import time, and identify and extract throughput, of every importer on synthetic files.
+
+    python -m benchmarks.run_benchmarks --sizes 1000 10000 -o bench.json
+    python -m benchmarks.run_benchmarks --baseline bench.json --tolerance 0.25
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+from beancount.ingest import cache, importer
+
+from beancountimporters.AccessSalaryImporter.AccessSalaryImporter import Importer as AccessSalaryImporter
+from beancountimporters.AmexCSVImporter.AmexCSVImporter import Importer as AmexImporter
+from beancountimporters.FirstAccountImporter.FirstAccountImporter import Importer as FirstAccountImporter
+from beancountimporters.HSBCCCImporter.HSBCCCImporter import Importer as HSBCImporter
+from beancountimporters.QifImporter.QifImporter import QifImporter
+from benchmarks import Fixtures
+
+
+class Case(NamedTuple):
+    name: str
+    suffix: str
+    write: Callable[[Path, int], None]
+    make_importer: Callable[[], importer.ImporterProtocol]
+    # Payslip sizes are pages rather than rows, so they are scaled down.
+    sizeDivisor: int = 1
+
+
+CASES = [
+    Case("amex", ".csv", Fixtures.write_amex_csv, lambda: AmexImporter("Liabilities:Amex")),
+    Case("amex-vectorized", ".csv", Fixtures.write_amex_csv, lambda: AmexImporter("Liabilities:Amex", vectorized=True)),
+    Case("firstaccount", ".csv", Fixtures.write_first_account_csv, lambda: FirstAccountImporter("Assets:Current")),
+    Case("firstaccount-vectorized", ".csv", Fixtures.write_first_account_csv,
+         lambda: FirstAccountImporter("Assets:Current", vectorized=True)),
+    Case("hsbc", ".csv", Fixtures.write_hsbc_csv, lambda: HSBCImporter("Liabilities:HSBC")),
+    Case("qif", ".qif", Fixtures.write_qif, lambda: QifImporter("Liabilities:Lloyds", dayfirst=True)),
+    Case("payslip", ".pdf", Fixtures.write_payslip_pdf,
+         lambda: AccessSalaryImporter("Income:Salary", "Assets:Current", "Expenses:PAYE", "Income:PensionMatch",
+                                      "Expenses:NI", "Assets:Pension", "Liabilities:StudentLoan", "20"),
+         sizeDivisor=100),
+]
+
+
+# Optional dependencies that loading an importer config must not import; each waits for a file that needs it.
+LAZY_MODULES = ('numpy', 'pypdf', 'quiffen')
+
+# Run in a fresh interpreter: import every importer, as fava or bean-extract loading a config does.
+STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from beancountimporters.AccessSalaryImporter.AccessSalaryImporter import Importer
+from beancountimporters.AmexCSVImporter.AmexCSVImporter import Importer
+from beancountimporters.FirstAccountImporter.FirstAccountImporter import Importer
+from beancountimporters.HSBCCCImporter.HSBCCCImporter import Importer
+from beancountimporters.QifImporter.QifImporter import QifImporter
+seconds = time.perf_counter() - start
+print(json.dumps({"seconds": seconds, "loaded": sorted(set(sys.argv[1:]) & set(sys.modules))}))
+"""
+
+
+def measure_startup(repeats: int) -> dict:
+    """Median seconds to import every importer in a new interpreter, and which LAZY_MODULES that loaded."""
+    runs = [json.loads(subprocess.run([sys.executable, "-c", STARTUP_SCRIPT, *LAZY_MODULES], check=True,
+                                      capture_output=True, text=True).stdout)
+            for _ in range(repeats)]
+    return {"import_seconds": statistics.median(run["seconds"] for run in runs), "loaded": runs[-1]["loaded"]}
+
+
+def measure(case: Case, size: int, directory: Path, repeats: int) -> dict:
+    path = directory / f"{case.name}-{size}{case.suffix}"
+    case.write(path, size)
+    fileImporter = case.make_importer()
+
+    identifySeconds = []
+    for _ in range(repeats):
+        file = cache._FileMemo(str(path.absolute()))
+        start = time.perf_counter()
+        matched = fileImporter.identify(file)
+        identifySeconds.append(time.perf_counter() - start)
+    if not matched:
+        raise RuntimeError(f"{case.name} did not identify its own fixture {path}")
+
+    extractSeconds = []
+    entries = 0
+    for _ in range(repeats):
+        file = cache._FileMemo(str(path.absolute()))
+        start = time.perf_counter()
+        entries = len(fileImporter.extract(file))
+        extractSeconds.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fileImporter.extract(cache._FileMemo(str(path.absolute())))
+    _, peakBytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    extractMedian = statistics.median(extractSeconds)
+    return {
+        "importer": case.name,
+        "size": size,
+        "bytes": path.stat().st_size,
+        "entries": entries,
+        "identify_seconds": statistics.median(identifySeconds),
+        "extract_seconds": extractMedian,
+        "rows_per_second": entries / extractMedian if extractMedian else None,
+        "peak_bytes": peakBytes,
+    }
+
+
+def run(sizes: list[int], repeats: int, only: list[str]) -> dict:
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for case in CASES:
+            if only and case.name not in only:
+                continue
+            for size in sizes:
+                results.append(measure(case, max(1, size // case.sizeDivisor), Path(directory), repeats))
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "startup": measure_startup(repeats),
+        "results": results,
+    }
+
+
+def regressions(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Descriptions of every result whose throughput fell by more than tolerance against baseline.
+
+    Import time counts too, as does importing any of LAZY_MODULES at startup whatever the baseline.
+    """
+    found = []
+    startup, oldStartup = current.get("startup"), baseline.get("startup")
+    if startup:
+        if startup["loaded"]:
+            found.append(f'startup imports {", ".join(startup["loaded"])}')
+        if oldStartup and startup["import_seconds"] > oldStartup["import_seconds"] * (1 + tolerance):
+            found.append(f'startup: {startup["import_seconds"]:.3f}s, was {oldStartup["import_seconds"]:.3f}s')
+
+    previous = {(r["importer"], r["size"]): r for r in baseline["results"]}
+    for result in current["results"]:
+        old = previous.get((result["importer"], result["size"]))
+        if not old or not old["rows_per_second"] or not result["rows_per_second"]:
+            continue
+        if result["rows_per_second"] < old["rows_per_second"] * (1 - tolerance):
+            found.append(f'{result["importer"]} @ {result["size"]}: {result["rows_per_second"]:.0f} rows/s, '
+                         f'was {old["rows_per_second"]:.0f}')
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark identify/extract for every importer.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='Rows (or transactions) per generated file; payslips use size / 100 pages.')
+    parser.add_argument('--repeats', type=int, default=3, help='Timed runs per measurement; the median is kept.')
+    parser.add_argument('--only', nargs='*', default=[], help='Restrict to these importer names.')
+    parser.add_argument('-o', '--output', help='Write JSON results here instead of stdout.')
+    parser.add_argument('--baseline', help='Earlier JSON results to compare against.')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed fractional drop in rows/second before a result counts as a regression.')
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, args.repeats, args.only)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        found = regressions(report, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
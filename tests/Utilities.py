@@ -1,4 +1,17 @@
+import datetime
+from decimal import Decimal
 from pathlib import Path
+from typing import Optional
+
+from beancount.core import data
+from beancount.core.amount import Amount
+
+AMEX_HEADER = ("Date,Description,Amount,Extended Details,Appears On Your Statement As,Address,Town/City,"
+               "Postcode,Country,Reference,Category")
+
+PAYSLIP_LINES = ["ACCESS UK LTD", "PAY ADVICE", "Payslip Date: 28-OCT-24", "Basic Salary 2,833.33",
+                 "Employee NI Letter A", "Employee NI 123.56", "PAYE 328.60", "Scottish Widows EE SS -141.67",
+                 "Student Loan Plan 2 28.00", "Net Pay Total 2112.33"]
 
 
 def GetTestFilesDir():
@@ -11,4 +24,61 @@ def GetTestFilesDir():
         case _:
             print(f"cwd: {cwd}")
             print(f"-1part: {cwd.parts[-1]}")
-            raise ValueError("Current Working Directory isn't the right place.")
\ No newline at end of file
+            raise ValueError("Current Working Directory isn't the right place.")
+
+
+def MakeTxn(date: datetime.date, number: str, account: str = "Liabilities:Card", reference: Optional[str] = None,
+            narration: str = "SHOP", payee: Optional[str] = None, balancing: tuple[str, ...] = ()) -> data.Transaction:
+    """A GBP transaction of number to account, plus a posting left to balance it to each of balancing."""
+    kvlist = {'reference': reference} if reference else None
+    return data.Transaction(
+        meta=data.new_metadata("ledger.beancount", 1, kvlist=kvlist),
+        date=date, flag="*", payee=payee, narration=narration,
+        postings=[data.Posting(account, Amount(Decimal(number), "GBP"), None, None, None, None)]
+                 + [data.Posting(other, None, None, None, None, None) for other in balancing],
+        tags=data.EMPTY_SET, links=data.EMPTY_SET)
+
+
+def write_amex_days(path: Path, days: int):
+    """One purchase a day from 1 October 2024 for days days, newest first, so shorter files overlap longer ones."""
+    rows = [AMEX_HEADER] + [f"{day:02d}/10/2024,SHOP {day},{day}.50,,SHOP,,,,,'REF{day}',Shopping"
+                            for day in range(days, 0, -1)]
+    path.write_text("\n".join(rows) + "\n")
+
+
+def write_first_account_days(path: Path, days: int):
+    """As write_amex_days, for a 1st Account statement whose balances follow from its amounts."""
+    rows = ["Date,Description,Amount,Balance"] + [f"{day:02d}/01/2023,PAYEE {day},-{day}.00,"
+                                                  f"{100 - day * (day + 1) // 2}.00"
+                                                  for day in range(days, 0, -1)]
+    path.write_text("\n".join(rows) + "\n")
+
+
+def write_text_pdf(path: Path, pages: list[list[str]]):
+    """Write a minimal PDF with one Helvetica text line per entry of each page."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>"]
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(len(pages)))
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    fontId = 3 + 2 * len(pages)
+    for i, lines in enumerate(pages):
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 {fontId} 0 R >> >> /Contents {4 + 2 * i} 0 R >>".encode())
+        stream = "BT /F1 10 Tf 12 TL 50 750 Td\n"
+        for line in lines:
+            escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            stream += f"({escaped}) Tj T*\n"
+        stream = (stream + "ET").encode("latin-1")
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects):
+        offsets.append(len(output))
+        output += f"{i + 1} 0 obj\n".encode() + obj + b"\nendobj\n"
+    xref = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        output += f"{offset:010d} 00000 n \n".encode()
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    Path(path).write_bytes(bytes(output))
@@ -1,11 +1,15 @@
 import datetime
+import tempfile
 import unittest
 from pathlib import Path
-from beancountimporters.AccessSalaryImporter.AccessSalaryImporter import Importer, pdf_to_text
+from beancountimporters.AccessSalaryImporter.AccessSalaryImporter import (Importer, pdf_to_text, PayslipField,
+                                                                          PayslipPosting, read_payslip_fields)
 from beancount.ingest import cache
 from beancount.core.amount import Amount
 from beancount.core.number import D
 
+from beancountimporters.Common.ParseCache import ParseCache
+
 from tests.Utilities import GetTestFilesDir
 
 
@@ -36,6 +40,19 @@ class AccessSalaryTestCase(unittest.TestCase):
         salaryIndentify = self.importer.identify(self.salaryFile)
         self.assertEqual(salaryIndentify, True)
 
+    def test_IdentifyUsesParseCache(self):
+        with tempfile.TemporaryDirectory() as cacheDir:
+            parseCache = ParseCache(cacheDir)
+            importer = Importer(salaryaccount="SalaryAccount", currentaccount="CurrentAccount", paye="PAYE",
+                                pensionmatchaccount="PensionMatchAccount",
+                                nationalinsuranceaccount="NationalInsuranceAccount",
+                                pensionassetaccount="PensionAssetAccount", studentloanaccount="StudentLoanAccount",
+                                y2kfix="20", parsecache=parseCache)
+            self.assertTrue(importer.identify(self.salaryFile))
+            self.assertEqual(parseCache.misses, 1)
+            self.assertTrue(importer.identify(cache._FileMemo(self.salaryFile.name)))
+            self.assertEqual((parseCache.hits, parseCache.misses), (1, 1))
+
     def test_ImporterCorrectlyDeniesAmexCSV(self):
         salaryIndentify = self.importer.identify(self.amexFile)
         self.assertEqual(salaryIndentify, False)
@@ -88,6 +105,34 @@ class AccessSalaryTestCase(unittest.TestCase):
         self.assertEqual(grossPay.account, "SalaryAccount")
         self.assertEqual(grossPay.units, Amount(-D("2,833.33"), "GBP"))
 
+    def test_ReadPayslipFieldsUsesOccurrenceAndToken(self):
+        text = "Employee NI A\nPAYE 10.00\nEmployee NI 5.00\nBonus Payment 100.00"
+        ni = PayslipField("Employee NI", 2, occurrence=1)
+        paye = PayslipField("PAYE", 1)
+        bonus = PayslipField("Bonus Payment", 2, required=False)
+        sacrifice = PayslipField("Salary Sacrifice", 2, required=False)
+        values = read_payslip_fields(text, [ni, paye, bonus, sacrifice])
+        self.assertEqual(values, {ni: "5.00", paye: "10.00", bonus: "100.00", sacrifice: None})
+
+    def test_ReadPayslipFieldsMissingRequiredFieldRaises(self):
+        with self.assertRaises(ValueError) as cm:
+            read_payslip_fields("PAYE 10.00", [PayslipField("Net Pay", 3)])
+        self.assertEqual(str(cm.exception), 'Payslip has 0 line(s) starting "Net Pay", expected at least 1.')
+
+    def test_ExtraPostingsForMissingOptionalLinesAreSkipped(self):
+        importer = Importer(
+            salaryaccount="SalaryAccount",
+            currentaccount="CurrentAccount",
+            paye="PAYE",
+            pensionmatchaccount="PensionMatchAccount",
+            nationalinsuranceaccount="NationalInsuranceAccount",
+            pensionassetaccount="PensionAssetAccount",
+            studentloanaccount="StudentLoanAccount",
+            y2kfix="20",
+            extrapostings=[PayslipPosting("BonusAccount", PayslipField("Bonus", 1, required=False), -1)])
+        transaction, = importer.extract(self.salaryFile)
+        self.assertEqual(len(transaction.postings), 7)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,12 +1,14 @@
-import unittest
 import datetime
+import tempfile
+import types
 import unittest
+from pathlib import Path
 from beancountimporters.AmexCSVImporter.AmexCSVImporter import Importer, csv_to_list
 from beancount.ingest import cache
 from beancount.core.amount import Amount
 from beancount.core.number import D
 
-from tests.Utilities import GetTestFilesDir
+from tests.Utilities import GetTestFilesDir, MakeTxn
 
 
 class AmexCSVTestCase(unittest.TestCase):
@@ -54,6 +56,50 @@ class AmexCSVTestCase(unittest.TestCase):
         self.assertEqual(posting.account, "CreditCardAccount")
         self.assertEqual(posting.units, Amount(-D("2.19"), "GBP"))
 
+    def test_IterExtractStreamsSameEntriesAsExtract(self):
+        entries = self.importer.iter_extract(self.amexFile)
+        self.assertIsInstance(entries, types.GeneratorType)
+        self.assertEqual(list(entries), self.importer.extract(self.amexFile))
+
+    def test_VectorizedExtractMatchesRowLoop(self):
+        vectorizedImporter = Importer(creditcardaccount="CreditCardAccount", flag="!", vectorized=True)
+        self.assertEqual(vectorizedImporter.extract(self.amexFile), self.importer.extract(self.amexFile))
+
+    def test_IncrementalExtractSkipsRowsUpToWatermark(self):
+        allTxns = sorted(self.importer.extract(self.amexFile), key=lambda txn: txn.date)
+        existing = allTxns[:5]
+        for vectorized in (False, True):
+            incrementalImporter = Importer(creditcardaccount="CreditCardAccount", flag="!", vectorized=vectorized,
+                                           incremental=True)
+            txns = incrementalImporter.extract(self.amexFile, existing)
+            self.assertEqual(sorted(txns, key=lambda txn: txn.date), allTxns[5:])
+
+    def test_PaymentFromAnotherStatementDoesNotMoveWatermark(self):
+        allTxns = sorted(self.importer.extract(self.amexFile), key=lambda txn: txn.date)
+        payment = MakeTxn(allTxns[-1].date, "-100.00", account="Assets:Current", narration="AMEX PAYMENT",
+                          balancing=("CreditCardAccount",))
+        incrementalImporter = Importer(creditcardaccount="CreditCardAccount", flag="!", incremental=True)
+        txns = incrementalImporter.extract(self.amexFile, allTxns[:5] + [payment])
+        self.assertEqual(sorted(txns, key=lambda txn: txn.date), allTxns[5:])
+
+    def test_DirectivesAreOnlyBuiltForRowsAfterWatermark(self):
+        allTxns = sorted(self.importer.extract(self.amexFile), key=lambda txn: txn.date)
+        incrementalImporter = Importer(creditcardaccount="CreditCardAccount", flag="!", incremental=True)
+        built = []
+        makeTransaction = incrementalImporter.make_transaction
+        incrementalImporter.make_transaction = lambda *args: built.append(args[1]) or makeTransaction(*args)
+        incrementalImporter.extract(self.amexFile, allTxns[:5])
+        self.assertLess(len(built), len(allTxns))
+
+    def test_ByteOrderMarkIsIgnored(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            path = Path(tempDir) / "Amex.csv"
+            path.write_bytes(b"\xef\xbb\xbf" + Path(self.amexFile.name).read_bytes())
+            bomFile = cache._FileMemo(path.as_posix())
+            self.assertTrue(self.importer.identify(bomFile))
+            self.assertEqual([entry._replace(meta=None) for entry in self.importer.extract(bomFile)],
+                             [entry._replace(meta=None) for entry in self.importer.extract(self.amexFile)])
+
 
 if __name__ == '__main__':
     unittest.main()
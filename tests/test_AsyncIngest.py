@@ -0,0 +1,108 @@
+import asyncio
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from beancount.ingest.extract import DUPLICATE_META
+
+from beancountimporters.AccessSalaryImporter.AccessSalaryImporter import Importer as AccessSalaryImporter
+from beancountimporters.AmexCSVImporter.AmexCSVImporter import Importer as AmexImporter
+from beancountimporters.FirstAccountImporter.FirstAccountImporter import Importer as FirstAccountImporter
+from beancountimporters.Ingest.AsyncIngest import ingest_stream
+from beancountimporters.Ingest.BatchIngest import ingest
+from tests.Utilities import GetTestFilesDir, write_amex_days, write_first_account_days
+
+
+class SlowAmexImporter(AmexImporter):
+    """Counts extracts, and takes its time over files with slow in their name."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.extracted = 0
+        self.lock = threading.Lock()
+
+    def extract(self, file, existing_entries=None):
+        if "slow" in Path(file.name).name:
+            time.sleep(0.3)
+        with self.lock:
+            self.extracted += 1
+        return super().extract(file, existing_entries)
+
+
+async def collect(stream, pause=0.0):
+    results = []
+    async for result in stream:
+        results.append(result)
+        await asyncio.sleep(pause)
+    return results
+
+
+class AsyncIngestTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tempDir.name)
+        write_amex_days(self.root / "amex.csv", 5)
+        write_first_account_days(self.root / "first.csv", 3)
+        (self.root / "notes.txt").write_text("nothing to import")
+        self.importers = [FirstAccountImporter(currentaccount="Assets:Current"),
+                          AmexImporter(creditcardaccount="Liabilities:Amex")]
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+
+    def test_StreamMatchesBatchIngest(self):
+        results = asyncio.run(collect(ingest_stream(self.importers, [self.tempDir.name], processes=0)))
+        self.assertEqual(sorted((filename, entries) for filename, _, entries in results),
+                         ingest(self.importers, [self.tempDir.name], jobs=1))
+        self.assertEqual({Path(filename).name: fileImporter for filename, fileImporter, _ in results},
+                         {"first.csv": self.importers[0], "amex.csv": self.importers[1]})
+
+    def test_StreamMarksDuplicates(self):
+        existingEntries = [entry for _, entries in ingest(self.importers, [str(self.root / "amex.csv")], jobs=1)
+                           for entry in entries]
+        results = asyncio.run(collect(ingest_stream(self.importers, [self.tempDir.name], existingEntries,
+                                                    processes=0)))
+        duplicates = {Path(filename).name: all(DUPLICATE_META in entry.meta for entry in entries)
+                      for filename, _, entries in results}
+        self.assertEqual(duplicates, {"amex.csv": True, "first.csv": False})
+
+    def test_SlowFileDoesNotHoldUpTheRest(self):
+        write_amex_days(self.root / "a_slow.csv", 2)
+        importers = [SlowAmexImporter(creditcardaccount="Liabilities:Amex")]
+        results = asyncio.run(collect(ingest_stream(importers, [self.tempDir.name], threads=2, processes=0)))
+        self.assertEqual([Path(filename).name for filename, _, _ in results], ["amex.csv", "a_slow.csv"])
+
+    def test_SlowConsumerPausesThePipeline(self):
+        for day in range(20):
+            write_amex_days(self.root / f"amex{day:02d}.csv", 1)
+        importer = SlowAmexImporter(creditcardaccount="Liabilities:Amex")
+
+        async def first_results():
+            stream = ingest_stream([importer], [self.tempDir.name], threads=1, processes=0, buffer=1)
+            await anext(stream)
+            await asyncio.sleep(0.2)
+            extracted = importer.extracted
+            await stream.aclose()
+            return extracted
+
+        # One result taken, one waiting in the buffer and one blocked putting its result.
+        self.assertLessEqual(asyncio.run(first_results()), 3)
+
+    def test_PdfIsExtractedInAWorkerProcess(self):
+        shutil.copy(GetTestFilesDir() / "2024-10-25 My Payslip 28-OCT-24.pdf", self.root / "payslip.pdf")
+        importers = self.importers + [AccessSalaryImporter(
+            salaryaccount="Income:Salary", currentaccount="Assets:Current", paye="Expenses:PAYE",
+            pensionmatchaccount="Income:PensionMatch", nationalinsuranceaccount="Expenses:NI",
+            pensionassetaccount="Assets:Pension", studentloanaccount="Liabilities:StudentLoan", y2kfix="20")]
+        results = asyncio.run(collect(ingest_stream(importers, [self.tempDir.name], processes=1)))
+        self.assertEqual(sorted((filename, entries) for filename, _, entries in results),
+                         ingest(importers, [self.tempDir.name], jobs=1))
+        self.assertIn(str(self.root / "payslip.pdf"), [filename for filename, _, _ in results])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import tempfile
+import unittest
+from decimal import Decimal
+from pathlib import Path
+
+from beancountimporters.Common.BalanceCheck import (BalanceMismatch, csv_balance_mismatch, first_balance_mismatch,
+                                                    follows)
+
+
+class BalanceCheckTestCase(unittest.TestCase):
+
+    def test_FollowsInPenceAndDecimals(self):
+        self.assertTrue(follows(10000, -150, 9850))
+        self.assertFalse(follows(10000, -150, 9851))
+        self.assertTrue(follows(10000, Decimal("-1.505"), Decimal("98.495")))
+
+    def test_AscendingAndDescendingRows(self):
+        ascending = [("-1.00", "99.00"), ("-2.00", "97.00"), ("3.50", "100.50")]
+        self.assertIsNone(first_balance_mismatch(ascending, descending=False))
+        self.assertIsNone(first_balance_mismatch(list(reversed(ascending)), descending=True))
+
+    def test_FirstMismatchStopsTheCheck(self):
+        consumed = []
+
+        def rows():
+            for row in [("-1.00", "99.00"), ("-2.00", "96.00"), ("1.00", "oops"), ("1.00", "98.00")]:
+                consumed.append(row)
+                yield row
+
+        self.assertEqual(first_balance_mismatch(rows(), descending=False),
+                         BalanceMismatch(2, "balance 96.00 is not 99.00 plus -2.00"))
+        self.assertEqual(len(consumed), 2)
+
+    def test_InvalidAndIncompleteRows(self):
+        self.assertEqual(first_balance_mismatch([("-1.00", "99.00"), ("x", "98.00")], descending=False),
+                         BalanceMismatch(2, "invalid amount 'x' or balance '98.00'"))
+        self.assertEqual(first_balance_mismatch([("-1.00", "99.00"), None], descending=False),
+                         BalanceMismatch(2, "row is incomplete"))
+
+    def test_CsvBalanceMismatchReportsTruncatedDownload(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            path = Path(tempDir) / "partial.csv"
+            path.write_text("Date,Description,Amount,Balance\n"
+                            "02/01/2023,B,-1.00,99.00\n"
+                            "01/01/2023,A,-1.0")
+            self.assertEqual(csv_balance_mismatch(path.as_posix(), descending=True),
+                             BalanceMismatch(2, "row is incomplete"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import io
+import tempfile
+import unittest
+from pathlib import Path
+
+from beancount.ingest.extract import DUPLICATE_META
+
+from beancountimporters.AmexCSVImporter.AmexCSVImporter import Importer as AmexImporter
+from beancountimporters.FirstAccountImporter.FirstAccountImporter import Importer as FirstAccountImporter
+from beancountimporters.Ingest.BatchIngest import find_files, ingest, write_extracted
+from tests.Utilities import write_amex_days, write_first_account_days
+
+
+class BatchIngestTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        root = Path(self.tempDir.name)
+        (root / "b").mkdir()
+        (root / "a").mkdir()
+        write_amex_days(root / "b" / "amex.csv", 5)
+        write_first_account_days(root / "a" / "first.csv", 3)
+        write_amex_days(root / "a" / "z_amex.csv", 2)
+        (root / "a" / "notes.txt").write_text("nothing to import")
+        self.importers = [FirstAccountImporter(currentaccount="Assets:Current"),
+                          AmexImporter(creditcardaccount="Liabilities:Amex")]
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+
+    def test_FindFilesIsStable(self):
+        files = find_files([self.tempDir.name])
+        self.assertEqual([Path(f).relative_to(self.tempDir.name).as_posix() for f in files],
+                         ["a/first.csv", "a/notes.txt", "a/z_amex.csv", "b/amex.csv"])
+
+    def test_SerialIngestOrdersByFile(self):
+        results = ingest(self.importers, [self.tempDir.name], jobs=1)
+        self.assertEqual([(Path(f).name, len(entries)) for f, entries in results],
+                         [("first.csv", 4), ("z_amex.csv", 2), ("amex.csv", 5)])
+
+    def test_ParallelIngestMatchesSerial(self):
+        serial = ingest(self.importers, [self.tempDir.name], jobs=1)
+        parallel = ingest(self.importers, [self.tempDir.name], jobs=2)
+        self.assertEqual(parallel, serial)
+
+    def test_IngestMarksDuplicatesOfExistingEntries(self):
+        existing = ingest(self.importers, [str(Path(self.tempDir.name) / "a")], jobs=1)
+        existingEntries = [entry for _, entries in existing for entry in entries]
+        results = dict(ingest(self.importers, [self.tempDir.name], existing_entries=existingEntries, jobs=1))
+        amex = results[str(Path(self.tempDir.name) / "b" / "amex.csv")]
+        # z_amex.csv held the first two days, so only those are marked in the overlapping amex.csv.
+        self.assertEqual([DUPLICATE_META in entry.meta for entry in amex], [True, True, False, False, False])
+
+    def test_EachExistingEntryMarksOneDuplicate(self):
+        root = Path(self.tempDir.name) / "repeat"
+        root.mkdir()
+        (root / "old.csv").write_text("Date,Description,Amount,Balance\n02/01/2023,X,-1.00,99.00\n")
+        existingEntries = [entry for _, entries in ingest(self.importers, [str(root)], jobs=1) for entry in entries]
+        (root / "old.csv").unlink()
+        (root / "new.csv").write_text("Date,Description,Amount,Balance\n"
+                                      "02/01/2023,X,-1.00,98.00\n02/01/2023,X,-1.00,99.00\n")
+        (_, entries), = ingest(self.importers, [str(root)], existing_entries=existingEntries, jobs=1)
+        self.assertEqual(sum(DUPLICATE_META in entry.meta for entry in entries), 1)
+
+    def test_WriteExtracted(self):
+        output = io.StringIO()
+        write_extracted(ingest(self.importers, [self.tempDir.name], jobs=1), output)
+        text = output.getvalue()
+        self.assertTrue(text.startswith(";; -*- mode: beancount -*-"))
+        self.assertIn("**** " + str(Path(self.tempDir.name) / "a" / "first.csv"), text)
+        self.assertIn("SHOP 5", text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+
+from benchmarks.run_benchmarks import CASES, measure_startup, regressions, run
+
+
+class BenchmarksTestCase(unittest.TestCase):
+
+    def test_EveryImporterRunsOnItsFixture(self):
+        report = run(sizes=[5], repeats=1, only=[])
+        self.assertEqual({r["importer"] for r in report["results"]}, {case.name for case in CASES})
+        for result in report["results"]:
+            self.assertGreater(result["entries"], 0)
+            self.assertGreater(result["peak_bytes"], 0)
+
+    def test_RegressionsFlagsThroughputDrops(self):
+        baseline = {"results": [{"importer": "amex", "size": 10, "rows_per_second": 1000.0},
+                                {"importer": "hsbc", "size": 10, "rows_per_second": 1000.0}]}
+        current = {"results": [{"importer": "amex", "size": 10, "rows_per_second": 700.0},
+                               {"importer": "hsbc", "size": 10, "rows_per_second": 900.0}]}
+        self.assertEqual(regressions(current, baseline, tolerance=0.2), ["amex @ 10: 700 rows/s, was 1000"])
+
+    def test_StartupLoadsNoOptionalDependencies(self):
+        startup = measure_startup(repeats=1)
+        self.assertEqual(startup["loaded"], [])
+        self.assertGreater(startup["import_seconds"], 0)
+
+    def test_RegressionsFlagsSlowOrEagerStartup(self):
+        baseline = {"startup": {"import_seconds": 0.2, "loaded": []}, "results": []}
+        current = {"startup": {"import_seconds": 0.3, "loaded": ["pypdf"]}, "results": []}
+        self.assertEqual(regressions(current, baseline, tolerance=0.2),
+                         ["startup imports pypdf", "startup: 0.300s, was 0.200s"])
+
+
+if __name__ == '__main__':
+    unittest.main()
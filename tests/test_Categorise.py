@@ -0,0 +1,93 @@
+import datetime
+import unittest
+from decimal import Decimal
+
+from beancount.core import data
+from beancount.core.amount import Amount
+from beancount.ingest import cache
+
+from beancountimporters.AmexCSVImporter.AmexCSVImporter import Importer as AmexImporter
+from beancountimporters.Common.Categorise import Categoriser, Rule
+from tests.Utilities import GetTestFilesDir, MakeTxn
+
+DATE = datetime.date(2024, 1, 1)
+
+
+class CategoriseTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.categoriser = Categoriser([
+            Rule("Expenses:Groceries:Big", prefix="TESCO", minAmount=Decimal("-1000"), maxAmount=Decimal("-100")),
+            Rule("Expenses:Groceries", prefix="tesco"),
+            Rule("Expenses:Coffee", pattern=r"\b(costa|pret)\b"),
+            Rule("Expenses:Phone", pattern=r"^EE\b", field="payee"),
+            Rule("Expenses:Transport", pattern="TFL", prefix="TFL TRAVEL"),
+            Rule("Income:Refunds", minAmount=Decimal("0.01")),
+        ])
+
+    def account(self, narration, number, payee=None):
+        rule = self.categoriser.match(narration, payee, Decimal(number))
+        return rule.account if rule else None
+
+    def test_PrefixesIgnoreCase(self):
+        self.assertEqual(self.account("Tesco Stores 1234", "-5.00"), "Expenses:Groceries")
+        self.assertIsNone(self.account("TES", "-5.00"))
+
+    def test_FirstMatchingRuleWinsWithAmountRanges(self):
+        self.assertEqual(self.account("TESCO STORES", "-150.00"), "Expenses:Groceries:Big")
+        self.assertEqual(self.account("TESCO STORES", "-15.00"), "Expenses:Groceries")
+        self.assertEqual(self.account("TESCO REFUND", "15.00"), "Expenses:Groceries")
+
+    def test_PatternsAndFields(self):
+        self.assertEqual(self.account("PRET A MANGER", "-3.20"), "Expenses:Coffee")
+        self.assertIsNone(self.account("INTERPRETER", "-3.20"))
+        self.assertEqual(self.account("DIRECT DEBIT", "-20.00", payee="EE LIMITED"), "Expenses:Phone")
+        self.assertIsNone(self.account("EE LIMITED", "-20.00", payee="FREE"))
+
+    def test_PatternAndPrefixMustBothHold(self):
+        self.assertEqual(self.account("TFL TRAVEL CH", "-2.80"), "Expenses:Transport")
+        self.assertIsNone(self.account("CONTACTLESS TFL", "-2.80"))
+
+    def test_PatternsAreCompiledAsWritten(self):
+        categoriser = Categoriser([Rule("Expenses:Groceries", pattern="(?i)tesco"),
+                                   Rule("Expenses:Food", pattern="FOO.BAR"),
+                                   Rule("Expenses:Books", pattern=r"(\w)\1K")], ignorecase=False)
+        self.assertEqual(categoriser.match("Tesco Stores", None, None).account, "Expenses:Groceries")
+        self.assertEqual(categoriser.match("FOO BAR", None, None).account, "Expenses:Food")
+        self.assertIsNone(categoriser.match("FOO\nBAR", None, None))
+        self.assertEqual(categoriser.match("BOOK", None, None).account, "Expenses:Books")
+        self.assertIsNone(categoriser.match("BOAK", None, None))
+
+    def test_InvalidPatternRaises(self):
+        with self.assertRaises(ValueError):
+            Categoriser([Rule("Expenses:Other", pattern="(")])
+
+    def test_RulesWithoutTextMatchOnAmount(self):
+        self.assertEqual(self.account("ANYTHING", "4.00"), "Income:Refunds")
+
+    def test_CategoriseAddsBalancingPosting(self):
+        entry = self.categoriser.categorise(MakeTxn(DATE, "-3.00", narration="COSTA COFFEE"))
+        self.assertEqual([(p.account, p.units) for p in entry.postings],
+                         [("Liabilities:Card", Amount(Decimal("-3.00"), "GBP")), ("Expenses:Coffee", None)])
+        unmatched = MakeTxn(DATE, "-3.00", narration="SOMEWHERE")
+        self.assertIs(self.categoriser.categorise(unmatched), unmatched)
+        balanced = MakeTxn(DATE, "-3.00", narration="COSTA COFFEE", balancing=("Expenses:Other",))
+        self.assertIs(self.categoriser.categorise(balanced), balanced)
+
+    def test_UnknownFieldRaises(self):
+        with self.assertRaises(ValueError):
+            Categoriser([Rule("Expenses:Other", prefix="X", field="memo")])
+
+    def test_ImporterAddsPostings(self):
+        amexFile = cache._FileMemo((GetTestFilesDir() / "Amex.csv").absolute().as_posix())
+        plain = AmexImporter("Liabilities:Amex").extract(amexFile)
+        categorised = AmexImporter("Liabilities:Amex", categoriser=Categoriser([Rule("Expenses:Shopping", pattern=".")])
+                                   ).extract(amexFile)
+        self.assertEqual(len(categorised), len(plain))
+        for before, after in zip(plain, categorised):
+            self.assertEqual(after.postings, before.postings + [data.Posting("Expenses:Shopping", None, None, None,
+                                                                             None, None)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import datetime
+import pickle
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from beancountimporters.Common.Categorise import Categoriser, Rule
+from beancountimporters.Common.Classifier import LedgerClassifier, TokenModel, normalise_tokens, training_examples
+from tests.Utilities import MakeTxn
+
+DATE = datetime.date(2024, 1, 1)
+AMEX = "Liabilities:Amex"
+
+
+def MakeLedger():
+    ledger = []
+    for store in range(20):
+        ledger.append(MakeTxn(DATE, "-10.00", AMEX, narration=f"TESCO STORES {store}",
+                              balancing=("Expenses:Groceries",)))
+        ledger.append(MakeTxn(DATE, "-12.00", AMEX, narration=f"SAINSBURYS {store} LONDON",
+                              balancing=("Expenses:Groceries",)))
+        ledger.append(MakeTxn(DATE, "-40.00", AMEX, narration=f"SHELL {store} PETROL", balancing=("Expenses:Fuel",)))
+        # Other accounts' history does not train the Amex model.
+        ledger.append(MakeTxn(DATE, "-40.00", "Assets:Current", narration=f"SHELL {store}",
+                              balancing=("Expenses:Groceries",)))
+    return ledger
+
+
+class ClassifierTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.ledger = MakeLedger()
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+
+    def test_TokensDropNumbersAndCase(self):
+        self.assertEqual(normalise_tokens("Tesco Stores 1234 o'neills"), ["TESCO", "STORES", "O'NEILLS"])
+
+    def test_TrainingExamplesAreTwoPostingTransactionsOfTheAccount(self):
+        examples = training_examples(self.ledger + [MakeTxn(DATE, "-1.00", AMEX, narration="SPLIT")], AMEX)
+        self.assertEqual(len(examples), 60)
+        self.assertEqual(examples[0], ("TESCO STORES 0", "Expenses:Groceries"))
+
+    def test_ModelPredictsCounterAccounts(self):
+        model = TokenModel.train(training_examples(self.ledger, "Liabilities:Amex"))
+        self.assertEqual(model.predict(["TESCO EXTRA 99", "SHELL GARAGE", "UNKNOWN SHOP", "1234"]),
+                         ["Expenses:Groceries", "Expenses:Fuel", None, None])
+        self.assertIsNone(TokenModel.train([("TESCO", "Expenses:Groceries")]))
+
+    def test_ModelIsSavedAndOnlyRetrainedWhenTheLedgerChanges(self):
+        classifier = LedgerClassifier(self.tempDir.name)
+        entry = MakeTxn(DATE, "-35.00", AMEX, narration="SHELL 99")
+        self.assertEqual(classifier.classify(entry, self.ledger), "Expenses:Fuel")
+        self.assertEqual(classifier.classify(entry, list(self.ledger)), "Expenses:Fuel")
+        self.assertEqual((classifier.trained, classifier.loaded), (1, 1))
+
+        restored = pickle.loads(pickle.dumps(classifier))
+        self.assertEqual(restored.classify(entry, list(self.ledger)), "Expenses:Fuel")
+        self.assertEqual((restored.trained, restored.loaded), (1, 2))
+
+        changed = self.ledger + [MakeTxn(DATE, "-35.00", AMEX, narration="SHELL 99", balancing=("Expenses:Car",))]
+        classifier.classify(entry, changed)
+        self.assertEqual(classifier.trained, 2)
+        self.assertEqual(len(list(Path(self.tempDir.name).glob("*.npz"))), 2)
+
+    def test_CorruptModelIsRetrained(self):
+        classifier = LedgerClassifier(self.tempDir.name)
+        classifier.classify(MakeTxn(DATE, "-1.00", AMEX, narration="SHELL"), self.ledger)
+        for path in Path(self.tempDir.name).glob("*.npz"):
+            path.write_bytes(b"not a model")
+        fresh = LedgerClassifier(self.tempDir.name)
+        self.assertEqual(fresh.classify(MakeTxn(DATE, "-1.00", AMEX, narration="SHELL"), self.ledger),
+                         "Expenses:Fuel")
+        self.assertEqual(fresh.trained, 1)
+
+    def test_SaveFailureIsLoggedAndLeavesNoTempFile(self):
+        classifier = LedgerClassifier(self.tempDir.name)
+        with mock.patch.object(TokenModel, "save", side_effect=OSError("disk full")), \
+                self.assertLogs(level="WARNING") as logs:
+            self.assertEqual(classifier.classify(MakeTxn(DATE, "-1.00", AMEX, narration="SHELL"), self.ledger),
+                             "Expenses:Fuel")
+        self.assertIn("Could not save classifier model", logs.output[0])
+        self.assertEqual(list(Path(self.tempDir.name).iterdir()), [])
+
+    def test_CategoriserFallsBackToClassifier(self):
+        categoriser = Categoriser([Rule("Expenses:Coffee", prefix="COSTA")],
+                                  classifier=LedgerClassifier(self.tempDir.name))
+        entries = categoriser.categorise_all([MakeTxn(DATE, "-3.00", AMEX, narration="COSTA 1"),
+                                              MakeTxn(DATE, "-5.00", AMEX, narration="TESCO 7"),
+                                              MakeTxn(DATE, "-5.00", AMEX, narration="NOWHERE")], self.ledger)
+        self.assertEqual([entry.postings[-1].account for entry in entries],
+                         ["Expenses:Coffee", "Expenses:Groceries", "Liabilities:Amex"])
+        # Without a ledger there is nothing to learn from.
+        self.assertEqual(len(categoriser.categorise(MakeTxn(DATE, "-5.00", AMEX, narration="TESCO 7")).postings), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
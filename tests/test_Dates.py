@@ -0,0 +1,40 @@
+import datetime
+import unittest
+
+from beancountimporters.Common.Dates import (clear_date_caches, date_cache_info, parse_dd_mon_yy, parse_dmy,
+                                             parse_qif_date)
+
+
+class DatesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        clear_date_caches()
+
+    def test_ParseDmy(self):
+        self.assertEqual(parse_dmy("18/10/2024"), datetime.date(2024, 10, 18))
+        self.assertEqual(parse_dmy("1/2/2023"), datetime.date(2023, 2, 1))
+        with self.assertRaises(ValueError):
+            parse_dmy("2024-10-18")
+
+    def test_ParseDdMonYy(self):
+        self.assertEqual(parse_dd_mon_yy("28-OCT-24", "20"), datetime.date(2024, 10, 28))
+        self.assertEqual(parse_dd_mon_yy("01-JAN-99", "19"), datetime.date(1999, 1, 1))
+        with self.assertRaises(ValueError):
+            parse_dd_mon_yy("28-OCTOBER-24", "20")
+
+    def test_ParseQifDate(self):
+        self.assertEqual(parse_qif_date("03/02/2025", True), datetime.date(2025, 2, 3))
+        self.assertEqual(parse_qif_date("03/02/2025", False), datetime.date(2025, 3, 2))
+        # Falls back to quiffen's parsing for Quicken's own formats.
+        self.assertEqual(parse_qif_date("12/20'2024", False), datetime.date(2024, 12, 20))
+        self.assertEqual(parse_qif_date("12/20/2024", True), datetime.date(2024, 12, 20))
+
+    def test_CacheInfoCountsHits(self):
+        for _ in range(3):
+            parse_dmy("18/10/2024")
+        info = date_cache_info()["parse_dmy"]
+        self.assertEqual((info.hits, info.misses), (2, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
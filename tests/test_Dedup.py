@@ -0,0 +1,73 @@
+import datetime
+import unittest
+
+from beancount.ingest.extract import DUPLICATE_META
+
+from beancountimporters.Common.Dedup import DedupIndex, find_duplicate_entries, mark_duplicates
+from beancountimporters.Common.LedgerCache import ledger_cached
+from tests.Utilities import MakeTxn
+
+
+class DedupTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.ledger = [MakeTxn(datetime.date(2024, 1, 2), "-5.00"),
+                       MakeTxn(datetime.date(2024, 1, 3), "-7.00", reference="'AT1'")]
+
+    def test_MatchesAccountDateAndAmount(self):
+        index = DedupIndex(self.ledger)
+        self.assertTrue(index.is_duplicate(MakeTxn(datetime.date(2024, 1, 2), "-5")))
+        self.assertFalse(index.is_duplicate(MakeTxn(datetime.date(2024, 1, 2), "-5.01")))
+        self.assertFalse(index.is_duplicate(MakeTxn(datetime.date(2024, 1, 2), "-5.00", account="Assets:Current")))
+        self.assertFalse(index.is_duplicate(MakeTxn(datetime.date(2024, 1, 4), "-5.00")))
+
+    def test_MatchesReferenceWhateverTheAmount(self):
+        index = DedupIndex(self.ledger)
+        self.assertTrue(index.is_duplicate(MakeTxn(datetime.date(2024, 2, 1), "-1.00", reference="'AT1'")))
+
+    def test_ReferenceIsAuthoritative(self):
+        index = DedupIndex([MakeTxn(datetime.date(2024, 1, 5), "-2.40", reference="'AT2'")])
+        self.assertTrue(index.is_duplicate(MakeTxn(datetime.date(2024, 1, 5), "-2.40", reference="'AT2'")))
+        self.assertFalse(index.is_duplicate(MakeTxn(datetime.date(2024, 1, 5), "-2.40", reference="'AT3'")))
+        self.assertTrue(index.is_duplicate(MakeTxn(datetime.date(2024, 1, 5), "-2.40")))
+
+    def test_EachExistingPostingMatchesOnce(self):
+        repeat = [MakeTxn(datetime.date(2024, 1, 2), "-5.00"), MakeTxn(datetime.date(2024, 1, 2), "-5.00")]
+        marked = mark_duplicates(repeat, self.ledger)
+        self.assertEqual([DUPLICATE_META in entry.meta for entry in marked], [True, False])
+        marked = mark_duplicates(repeat, self.ledger + self.ledger[:1])
+        self.assertEqual([DUPLICATE_META in entry.meta for entry in marked], [True, True])
+
+    def test_DateWindow(self):
+        self.assertTrue(DedupIndex(self.ledger, dateWindow=2).is_duplicate(MakeTxn(datetime.date(2024, 1, 4), "-5.00")))
+
+    def test_MarkLeavesNewEntriesUntouched(self):
+        new = MakeTxn(datetime.date(2024, 1, 9), "-1.00")
+        duplicate = MakeTxn(datetime.date(2024, 1, 2), "-5.00")
+        marked = mark_duplicates([new, duplicate], self.ledger)
+        self.assertIs(marked[0], new)
+        self.assertTrue(marked[1].meta[DUPLICATE_META])
+        self.assertNotIn(DUPLICATE_META, duplicate.meta)
+
+    def test_FindDuplicateEntriesKeepsKeys(self):
+        results = find_duplicate_entries([("a.csv", [MakeTxn(datetime.date(2024, 1, 2), "-5.00")])], self.ledger)
+        self.assertEqual([key for key, _ in results], ["a.csv"])
+        self.assertTrue(results[0][1][0].meta[DUPLICATE_META])
+
+    def test_NoLedgerMarksNothing(self):
+        entries = [MakeTxn(datetime.date(2024, 1, 2), "-5.00")]
+        self.assertIs(mark_duplicates(entries, None), entries)
+
+    def test_LedgerCachedBuildsOncePerLedger(self):
+        builds = []
+        cached = ledger_cached(lambda entries: builds.append(entries) or len(entries))
+        self.assertEqual(cached(self.ledger), 2)
+        self.assertEqual(cached(self.ledger), 2)
+        self.assertEqual(len(builds), 1)
+        self.assertEqual(cached(list(self.ledger)), 2)
+        self.assertEqual(len(builds), 2)
+        self.assertIsNone(cached([]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from beancount.ingest import cache
+from beancountimporters.Common.FileContext import FileContext, file_context
+
+
+class FileContextTestCase(unittest.TestCase):
+
+    def test_SameMemoSharesContext(self):
+        memo = cache._FileMemo("/tmp/a.csv")
+        self.assertIs(file_context(memo), file_context(memo))
+        self.assertIsNot(file_context(memo), file_context(cache._FileMemo("/tmp/a.csv")))
+
+    def test_ValueComputedOnce(self):
+        context = FileContext("/tmp/a.csv")
+        calls = []
+        self.assertEqual(context.get("key", lambda: calls.append(1) or "value"), "value")
+        self.assertEqual(context.get("key", lambda: calls.append(1) or "other"), "value")
+        self.assertEqual(len(calls), 1)
+
+    def test_ValueComputedOnceAcrossThreads(self):
+        context = FileContext("/tmp/a.csv")
+        calls = []
+        lock = threading.Lock()
+
+        def slow():
+            with lock:
+                calls.append(1)
+            time.sleep(0.05)
+            return "value"
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: context.get("key", slow), range(8)))
+        self.assertEqual(results, ["value"] * 8)
+        self.assertEqual(len(calls), 1)
+
+    def test_FailedComputeIsRetried(self):
+        context = FileContext("/tmp/a.csv")
+
+        def fail():
+            raise ValueError("bad file")
+
+        with self.assertRaises(ValueError):
+            context.get("key", fail)
+        self.assertEqual(context.get("key", lambda: "value"), "value")
+
+
+if __name__ == '__main__':
+    unittest.main()
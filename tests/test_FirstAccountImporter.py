@@ -1,7 +1,10 @@
-import unittest
 import datetime
+import tempfile
+import unittest
+from pathlib import Path
 
 from beancount.ingest import cache
+from beancount.core import data
 from beancount.core.amount import Amount
 from beancount.core.number import D
 from beancountimporters.FirstAccountImporter.FirstAccountImporter import Importer, csv_to_list
@@ -53,5 +56,114 @@ class FirstAccountTestCase(unittest.TestCase):
         self.assertEqual(posting.account, "CurrentAccount")
         self.assertEqual(posting.units, Amount(-D("2.40"), "GBP"))
 
+    def test_IterExtractYieldsOldestFirstThenBalance(self):
+        entries = list(self.importer.iter_extract(self.firstDirectFile))
+        self.assertEqual(entries, self.importer.extract(self.firstDirectFile))
+        dates = [entry.date for entry in entries[:-1]]
+        self.assertEqual(dates, sorted(dates))
+        self.assertEqual(entries[0].meta["lineno"], 17)
+        self.assertIsInstance(entries[-1], data.Balance)
+        self.assertEqual(entries[-1].amount, Amount(D("1000.00"), "GBP"))
+
+    def test_VectorizedExtractMatchesRowLoop(self):
+        vectorizedImporter = Importer(currentaccount="CurrentAccount", flag="!", vectorized=True)
+        self.assertEqual(vectorizedImporter.extract(self.firstDirectFile), self.importer.extract(self.firstDirectFile))
+
+    def test_AscendingFileGivesSameEntries(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            lines = Path(self.firstDirectFile.name).read_text().splitlines()
+            ascending = Path(tempDir) / "ascending.csv"
+            ascending.write_text("\n".join(lines[:1] + lines[:0:-1]) + "\n")
+            entries = self.importer.extract(cache._FileMemo(ascending.as_posix()))
+        expected = self.importer.extract(self.firstDirectFile)
+        self.assertEqual([(entry.date, entry.meta["lineno"]) for entry in entries],
+                         [(entry.date, 18 - entry.meta["lineno"]) for entry in expected])
+        self.assertEqual([entry.postings[0].units for entry in entries[:-1]],
+                         [entry.postings[0].units for entry in expected[:-1]])
+        self.assertEqual(entries[-1].amount, expected[-1].amount)
+
+    def test_MonthlyBalanceAssertions(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            path = Path(tempDir) / "months.csv"
+            path.write_text("Date,Description,Amount,Balance\n"
+                            "02/03/2023,C,-1.00,97.00\n"
+                            "28/02/2023,B,-1.00,98.00\n"
+                            "01/02/2023,A,-1.00,99.00\n"
+                            "31/01/2023,Z,-1.00,100.00\n")
+            monthlyImporter = Importer(currentaccount="CurrentAccount", flag="!", balanceinterval="monthly")
+            entries = monthlyImporter.extract(cache._FileMemo(path.as_posix()))
+        balances = [(entry.date, entry.amount.number) for entry in entries if isinstance(entry, data.Balance)]
+        self.assertEqual(balances, [(datetime.date(2023, 2, 1), D("100.00")),
+                                    (datetime.date(2023, 3, 1), D("98.00")),
+                                    (datetime.date(2023, 3, 2), D("97.00"))])
+        self.assertEqual(len(entries), 7)
+
+    def test_MultiLineLastDescription(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            path = Path(tempDir) / "multiline.csv"
+            path.write_text("Date,Description,Amount,Balance\n"
+                            "02/01/2023,B,-1.00,98.00\n"
+                            '01/01/2023,"first line\nsecond line",-1.00,99.00\n')
+            memo = cache._FileMemo(path.as_posix())
+            self.assertTrue(self.importer.identify(memo))
+            self.assertTrue(self.importer.is_descending(memo.name))
+            entries = self.importer.extract(memo)
+        self.assertEqual([entry.narration for entry in entries if isinstance(entry, data.Transaction)],
+                         ["first line\nsecond line", "B"])
+
+    def test_UnknownBalanceIntervalRaises(self):
+        with self.assertRaises(ValueError):
+            Importer(currentaccount="CurrentAccount", balanceinterval="fortnightly")
+
+    def test_InconsistentBalanceRaisesWithLineNumber(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            path = Path(tempDir) / "bad.csv"
+            path.write_text("Date,Description,Amount,Balance\n"
+                            "03/01/2023,C,-1.00,90.00\n"
+                            "02/01/2023,B,-1.00,99.00\n"
+                            "01/01/2023,A,-1.00,100.00\n")
+            with self.assertRaises(ValueError) as cm:
+                self.importer.extract(cache._FileMemo(path.as_posix()))
+        self.assertIn("line 1: balance 90.00 is not 99.00 plus -1.00", str(cm.exception))
+
+    def test_InconsistentFileIsNotIdentified(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            path = Path(tempDir) / "bad.csv"
+            path.write_text("Date,Description,Amount,Balance\n"
+                            "02/01/2023,B,-1.00,99.00\n"
+                            "01/01/2023,A,-1.00,101.00\n")
+            with self.assertLogs(level="WARNING") as logs:
+                self.assertFalse(self.importer.identify(cache._FileMemo(path.as_posix())))
+        self.assertEqual(logs.output, [f"WARNING:root:{path.as_posix()}: line 1: balance 99.00 is not 101.00 plus -1.00; "
+                                       "not importing"])
+
+    def test_PartialDownloadIsRejected(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            path = Path(tempDir) / "partial.csv"
+            path.write_text("Date,Description,Amount,Balance\n"
+                            "02/01/2023,B,-1.00,99.00\n"
+                            "01/01/20")
+            file = cache._FileMemo(path.as_posix())
+            self.assertFalse(self.importer.identify(file))
+            with self.assertRaises(ValueError) as cm:
+                self.importer.extract(file)
+        self.assertIn("line 2: row is incomplete", str(cm.exception))
+
+    def test_IncrementalExtractKeepsBalanceAndSkipsImportedRows(self):
+        allEntries = self.importer.extract(self.firstDirectFile)
+        incrementalImporter = Importer(currentaccount="CurrentAccount", flag="!", incremental=True)
+        entries = incrementalImporter.extract(self.firstDirectFile, allEntries[:-4])
+        self.assertEqual(entries, allEntries[-4:])
+
+    def test_ByteOrderMarkIsIgnored(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            path = Path(tempDir) / "FirstDirect.csv"
+            path.write_bytes(b"\xef\xbb\xbf" + Path(self.firstDirectFile.name).read_bytes())
+            bomFile = cache._FileMemo(path.as_posix())
+            self.assertTrue(self.importer.identify(bomFile))
+            self.assertEqual([entry._replace(meta=None) for entry in self.importer.extract(bomFile)],
+                             [entry._replace(meta=None) for entry in self.importer.extract(self.firstDirectFile)])
+
+
 if __name__ == '__main__':
     unittest.main()
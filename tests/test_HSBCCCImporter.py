@@ -1,5 +1,7 @@
-import unittest
 import datetime
+import tempfile
+import unittest
+from pathlib import Path
 
 from beancount.ingest import cache
 from beancount.core.amount import Amount
@@ -15,6 +17,7 @@ class HSBCCCTestCase(unittest.TestCase):
         testFilesDir = GetTestFilesDir()
         self.salaryFile = cache._FileMemo((testFilesDir / "2024-10-25 My Payslip 28-OCT-24.pdf").absolute().as_posix())
         self.hsbcccFile = cache._FileMemo((testFilesDir / "HSBCCreditCard.csv").absolute().as_posix())
+        self.amexFile = cache._FileMemo((testFilesDir / "Amex.csv").absolute().as_posix())
 
     def test_CSVToListImportsCorrectly(self):
         listResult = csv_to_list(self.hsbcccFile.name)
@@ -28,6 +31,10 @@ class HSBCCCTestCase(unittest.TestCase):
         hsbcIdentify = self.importer.identify(self.salaryFile)
         self.assertEqual(hsbcIdentify, False)
 
+    def test_ImporterCorrectlyDeniesAmexCSV(self):
+        hsbcIdentify = self.importer.identify(self.amexFile)
+        self.assertEqual(hsbcIdentify, False)
+
     def test_FileAccount(self):
         account = self.importer.file_account(self.hsbcccFile)
         self.assertEqual(account, "CreditCardAccount")
@@ -52,5 +59,19 @@ class HSBCCCTestCase(unittest.TestCase):
         self.assertEqual(posting.account, "CreditCardAccount")
         self.assertEqual(posting.units, Amount(-D("135.30"), "GBP"))
 
+    def test_VectorizedExtractMatchesRowLoop(self):
+        vectorizedImporter = Importer(creditcardaccount="CreditCardAccount", flag="!", vectorized=True)
+        self.assertEqual(vectorizedImporter.extract(self.hsbcccFile), self.importer.extract(self.hsbcccFile))
+
+    def test_ByteOrderMarkIsIgnored(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            path = Path(tempDir) / "HSBCCreditCard.csv"
+            path.write_bytes(b"\xef\xbb\xbf" + Path(self.hsbcccFile.name).read_bytes())
+            bomFile = cache._FileMemo(path.as_posix())
+            self.assertTrue(self.importer.identify(bomFile))
+            self.assertEqual([entry._replace(meta=None) for entry in self.importer.extract(bomFile)],
+                             [entry._replace(meta=None) for entry in self.importer.extract(self.hsbcccFile)])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,97 @@
+import json
+import pickle
+import tempfile
+import unittest
+from pathlib import Path
+
+from beancount.ingest import cache
+
+from beancountimporters.AmexCSVImporter.AmexCSVImporter import Importer as AmexImporter
+from beancountimporters.Common import Instrumentation
+from beancountimporters.Common.Instrumentation import JsonLinesSink, MemorySink, ProfileSink, count, recording
+from beancountimporters.FirstAccountImporter.FirstAccountImporter import Importer as FirstAccountImporter
+from beancountimporters.Ingest.BatchIngest import ingest
+from tests.Utilities import GetTestFilesDir
+
+
+class InstrumentationTestCase(unittest.TestCase):
+
+    def setUp(self):
+        testFilesDir = GetTestFilesDir()
+        self.amexName = (testFilesDir / "Amex.csv").absolute().as_posix()
+        self.firstDirectName = (testFilesDir / "FirstDirect.csv").absolute().as_posix()
+        self.importer = AmexImporter("Liabilities:Amex")
+
+    def run_amex(self):
+        file = cache._FileMemo(self.amexName)
+        self.assertTrue(self.importer.identify(file))
+        return self.importer.extract(file)
+
+    def test_DisabledByDefault(self):
+        self.assertIsNone(Instrumentation.get_sink())
+        self.assertIs(cache._FileMemo.convert, Instrumentation._originalConvert)
+        count("rows", 5)
+        self.run_amex()
+
+    def test_MemorySinkRecordsEveryPhase(self):
+        with recording(MemorySink()) as sink:
+            self.assertIsNot(cache._FileMemo.convert, Instrumentation._originalConvert)
+            entries = self.run_amex()
+        self.assertIs(cache._FileMemo.convert, Instrumentation._originalConvert)
+
+        phases = {(event.phase, event.detail): event for event in sink.events}
+        identify = phases[("identify", "Importer.identify")]
+        self.assertEqual(identify.counters["matched"], 1)
+        self.assertEqual(identify.counters["bytes"], Path(self.amexName).stat().st_size)
+        self.assertEqual(identify.importer, self.importer.name())
+        self.assertEqual(phases[("convert", "mimetype")].importer, self.importer.name())
+        self.assertIn(("convert", "first_line"), phases)
+
+        extract = phases[("extract", "CsvImporter.extract")]
+        self.assertEqual(extract.counters["entries"], len(entries))
+        self.assertEqual(extract.counters["rows"], len(entries))
+        self.assertEqual(sink.totals()[(self.importer.name(), "extract")]["calls"], 1)
+
+    def test_ParseAndConvertCacheHits(self):
+        importer = FirstAccountImporter("Assets:Current")
+        file = cache._FileMemo(self.firstDirectName)
+        with recording(MemorySink()) as sink:
+            importer.identify(file)
+            importer.extract(file)
+        checks = [event for event in sink.events if event.detail == "Importer.balance_mismatch"]
+        self.assertEqual([event.counters["cached"] for event in checks], [0, 1])
+        parse = [event for event in sink.events if event.phase == "parse"]
+        self.assertEqual(len(parse), 1)
+        self.assertEqual(parse[0].counters["rows"], 17)
+
+    def test_JsonLinesSink(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            path = Path(tempDir) / "events.jsonl"
+            sink = pickle.loads(pickle.dumps(JsonLinesSink(path.as_posix())))
+            with recording(sink):
+                self.run_amex()
+            sink.close()
+            events = [json.loads(line) for line in path.read_text().splitlines()]
+        self.assertEqual(events[-1]["phase"], "extract")
+        self.assertEqual(set(events[-1]), {"phase", "importer", "file", "detail", "seconds", "counters"})
+
+    def test_ProfileSinkCapturesPhasesOnly(self):
+        memory = MemorySink()
+        with recording(ProfileSink(memory)) as sink:
+            self.run_amex()
+        functions = {name for _, _, name in sink.stats().stats}
+        self.assertIn("make_transaction", functions)
+        self.assertNotIn("run_amex", functions)
+        self.assertTrue(memory.events)
+
+    def test_IngestReportsToSink(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            Path(tempDir, "amex.csv").write_bytes(Path(self.amexName).read_bytes())
+            sink = MemorySink()
+            ingest([self.importer], [tempDir], jobs=1, sink=sink)
+        self.assertEqual({event.phase for event in sink.events}, {"identify", "convert", "extract"})
+        self.assertIsNone(Instrumentation.get_sink())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from beancountimporters.Common.MappedFile import iter_csv_fields, iter_lines, iter_text_lines
+
+
+class MappedFileTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tempDir.name) / "file.csv"
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+
+    def write(self, data: bytes) -> str:
+        self.path.write_bytes(data)
+        return self.path.as_posix()
+
+    def test_LinesKeepTheirEndings(self):
+        self.assertEqual(list(iter_lines(self.write(b"a\r\nb\nc"))), [b"a\r\n", b"b\n", b"c"])
+        self.assertEqual(list(iter_text_lines(self.path.as_posix())), ["a", "b", "c"])
+
+    def test_BareCarriageReturnsAndEmptyFiles(self):
+        self.assertEqual(list(iter_text_lines(self.write(b"a\rb\r"))), ["a", "b"])
+        self.assertEqual(list(iter_lines(self.write(b""))), [])
+
+    def test_ByteOrderMarkIsDropped(self):
+        self.assertEqual(list(iter_lines(self.write(b"\xef\xbb\xbfDate,Amount\n01/01/2024,1.00\n"))),
+                         [b"Date,Amount\n", b"01/01/2024,1.00\n"])
+        self.assertEqual(list(iter_csv_fields(self.path.as_posix(), ["Date"])), [("01/01/2024",)])
+        self.assertEqual(list(iter_lines(self.write(b"\xef\xbb\xbfa\rb"))), [b"a\r", b"b"])
+
+    def test_NonSeekableInputIsStreamed(self):
+        fifo = Path(self.tempDir.name) / "fifo"
+        os.mkfifo(fifo)
+
+        def feed():
+            with open(fifo, "wb") as outfile:
+                outfile.write(b"Date,Amount\n01/01/2024,1.00\n")
+
+        writer = threading.Thread(target=feed)
+        writer.start()
+        try:
+            self.assertEqual(list(iter_csv_fields(fifo.as_posix(), ["Amount"])), [("1.00",)])
+        finally:
+            writer.join()
+
+    def test_FieldsMatchTheCsvModule(self):
+        filename = self.write(b'Date,Description,Amount\r\n'
+                              b'01/01/2024,"Shop, Ltd",1.00\r\n'
+                              b'\r\n'
+                              b'02/01/2024,"Two\r\nlines",-2.50\r\n'
+                              b'03/01/2024,Caf\xc3\xa9\r\n')
+        self.assertEqual(list(iter_csv_fields(filename, ["Amount", "Description"])),
+                         [("1.00", "Shop, Ltd"), ("-2.50", "Two\r\nlines"), (None, "Café")])
+
+    def test_FieldsByIndexWithoutHeader(self):
+        filename = self.write(b"01/01/2024,Shop,1.00\n02/01/2024,\"A \"\"quoted\"\" name\",2.00\n")
+        self.assertEqual(list(iter_csv_fields(filename, [2, 1], header=False)),
+                         [("1.00", "Shop"), ("2.00", 'A "quoted" name')])
+
+    def test_UnknownColumnRaises(self):
+        with self.assertRaises(KeyError):
+            list(iter_csv_fields(self.write(b"Date,Amount\n01/01/2024,1.00\n"), ["Balance"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
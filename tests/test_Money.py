@@ -0,0 +1,77 @@
+import tempfile
+import unittest
+from decimal import Decimal
+from pathlib import Path
+
+from beancount.core.number import D
+from beancount.ingest import cache
+
+from beancountimporters.AmexCSVImporter.AmexCSVImporter import Importer as AmexImporter
+from beancountimporters.Common.Money import (from_pence, negate_pence, parse_pence, parse_row_pence, pence_amount,
+                                             round_pence, scale_pence, to_pence)
+from tests.Utilities import AMEX_HEADER
+
+
+class MoneyTestCase(unittest.TestCase):
+
+    def test_ParsePenceMatchesDecimalParse(self):
+        for text in ["5.00", "-2.19", "0.00", "-0.00", "5", "1.234", "1,234.50", ".50", "+1.00", "007.50"]:
+            for negate in (False, True):
+                with self.subTest(text=text, negate=negate):
+                    expected = -D(text) if negate else D(text)
+                    actual = from_pence(parse_pence(text, negate))
+                    self.assertEqual(str(actual), str(expected))
+
+    def test_ParsePenceUsesIntsForPlainAmounts(self):
+        self.assertEqual(parse_pence("12.34"), 1234)
+        self.assertEqual(parse_pence("12.34", negate=True), -1234)
+        self.assertEqual(parse_pence("1,234.50"), 123450)
+        self.assertIsInstance(parse_pence("12.3"), Decimal)
+        self.assertIsInstance(parse_pence("-0.00"), Decimal)
+
+    def test_ParsePenceRejectsMalformedAmounts(self):
+        for text in ["", " ", "£5.00", "(5.00)", "1.2x", "NaN", "Infinity"]:
+            with self.subTest(text=text):
+                with self.assertRaises(ValueError) as cm:
+                    parse_pence(text)
+                self.assertEqual(str(cm.exception), f"invalid amount {text!r}")
+        with self.assertRaises(ValueError) as cm:
+            parse_row_pence("1.2x", "statement.csv", 7)
+        self.assertEqual(str(cm.exception), "statement.csv: Row 7: invalid amount '1.2x'")
+
+    def test_ToPenceKeepsAmountsItCannotRoundTrip(self):
+        self.assertEqual(to_pence(Decimal("-4.70")), -470)
+        self.assertEqual(to_pence(Decimal("4.7")), Decimal("4.7"))
+
+    def test_ArithmeticMatchesDecimal(self):
+        for text in ["5.00", "-2.19", "0.00", "-0.00", "1.5", "0"]:
+            with self.subTest(text=text):
+                self.assertEqual(str(from_pence(negate_pence(parse_pence(text)))), str(-D(text)))
+                for multiplier in (2, -2, -1):
+                    expected = -D(text) * -multiplier if multiplier < 0 else D(text) * multiplier
+                    self.assertEqual(str(from_pence(scale_pence(parse_pence(text), multiplier))), str(expected))
+        for number in ["1.005", "-0.001", "2.5", "-12.345", "7"]:
+            with self.subTest(number=number):
+                self.assertEqual(str(from_pence(round_pence(Decimal(number)))), str(D(format(Decimal(number), '.2f'))))
+
+    def test_PenceAmountsAreShared(self):
+        self.assertIs(pence_amount(1234, "GBP"), pence_amount(1234, "GBP"))
+        self.assertEqual(str(pence_amount(-5, "GBP")), "-0.05 GBP")
+        # Equal Decimals written differently keep their own exponent.
+        self.assertEqual(str(pence_amount(Decimal("1.5"), "GBP").number), "1.5")
+        self.assertEqual(str(pence_amount(Decimal("1.500"), "GBP").number), "1.500")
+
+    def test_ImporterNamesTheRowOfAMalformedAmount(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            path = Path(tempDir) / "amex.csv"
+            path.write_text(f"{AMEX_HEADER}\n02/10/2024,SHOP,1.50,,,,,,,'R1',\n01/10/2024,SHOP,one pound,,,,,,,'R2',\n")
+            for vectorized in (False, True):
+                with self.subTest(vectorized=vectorized):
+                    importer = AmexImporter(creditcardaccount="Liabilities:Amex", vectorized=vectorized)
+                    with self.assertRaises(ValueError) as cm:
+                        importer.extract(cache._FileMemo(str(path)))
+                    self.assertEqual(str(cm.exception), f"{path}: Row 2: invalid amount 'one pound'")
+
+
+if __name__ == '__main__':
+    unittest.main()
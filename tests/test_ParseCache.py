@@ -0,0 +1,110 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from beancount.ingest import cache
+from beancountimporters.Common.ParseCache import ParseCache, content_hash
+
+conversions = []
+
+
+def counting_upper(filename: str) -> str:
+    conversions.append(filename)
+    with open(filename, 'r') as infile:
+        return infile.read().upper()
+
+
+def unpicklable(filename: str):
+    text = counting_upper(filename)
+    return lambda: text
+
+
+class ParseCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        conversions.clear()
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.cacheDir = Path(self.tempDir.name) / "cache"
+        self.inputFile = Path(self.tempDir.name) / "input.txt"
+        self.inputFile.write_text("some statement text")
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+
+    def test_ConvertsOnMissAndStores(self):
+        parseCache = ParseCache(self.cacheDir)
+        result = parseCache.convert(cache._FileMemo(str(self.inputFile)), counting_upper, "1")
+        self.assertEqual(result, "SOME STATEMENT TEXT")
+        self.assertEqual(len(conversions), 1)
+        self.assertEqual(parseCache.misses, 1)
+        self.assertEqual(len(list(self.cacheDir.glob("*.pickle"))), 1)
+
+    def test_UnpicklableResultIsLoggedAndLeavesNoTempFile(self):
+        parseCache = ParseCache(self.cacheDir)
+        with self.assertLogs(level="WARNING") as logs:
+            result = parseCache.convert(cache._FileMemo(str(self.inputFile)), unpicklable, "1")
+        self.assertEqual(result(), "SOME STATEMENT TEXT")
+        self.assertIn("Could not write parse cache entry", logs.output[0])
+        self.assertEqual(list(self.cacheDir.iterdir()), [])
+
+    def test_HitSurvivesNewCacheAndFileMemo(self):
+        ParseCache(self.cacheDir).convert(cache._FileMemo(str(self.inputFile)), counting_upper, "1")
+        secondCache = ParseCache(self.cacheDir)
+        result = secondCache.convert(cache._FileMemo(str(self.inputFile)), counting_upper, "1")
+        self.assertEqual(result, "SOME STATEMENT TEXT")
+        self.assertEqual(len(conversions), 1)
+        self.assertEqual(secondCache.hits, 1)
+
+    def test_SameFileMemoIsMemoisedInProcess(self):
+        parseCache = ParseCache(self.cacheDir)
+        fileMemo = cache._FileMemo(str(self.inputFile))
+        parseCache.convert(fileMemo, counting_upper, "1")
+        parseCache.convert(fileMemo, counting_upper, "1")
+        self.assertEqual(parseCache.misses + parseCache.hits, 1)
+
+    def test_ChangedContentOrVersionMisses(self):
+        parseCache = ParseCache(self.cacheDir)
+        parseCache.convert(cache._FileMemo(str(self.inputFile)), counting_upper, "1")
+        parseCache.convert(cache._FileMemo(str(self.inputFile)), counting_upper, "2")
+        self.inputFile.write_text("edited statement text")
+        result = parseCache.convert(cache._FileMemo(str(self.inputFile)), counting_upper, "2")
+        self.assertEqual(result, "EDITED STATEMENT TEXT")
+        self.assertEqual(len(conversions), 3)
+
+    def test_CorruptEntryIsReconverted(self):
+        parseCache = ParseCache(self.cacheDir)
+        parseCache.convert(cache._FileMemo(str(self.inputFile)), counting_upper, "1")
+        entry, = self.cacheDir.glob("*.pickle")
+        entry.write_bytes(b"not a pickle")
+        result = ParseCache(self.cacheDir).convert(cache._FileMemo(str(self.inputFile)), counting_upper, "1")
+        self.assertEqual(result, "SOME STATEMENT TEXT")
+        self.assertEqual(len(conversions), 2)
+
+    def test_EvictsLeastRecentlyUsed(self):
+        parseCache = ParseCache(self.cacheDir)
+        files = []
+        for i in range(3):
+            path = Path(self.tempDir.name) / f"input{i}.txt"
+            path.write_text(f"statement {i}" * 100)
+            files.append(path)
+            parseCache.convert(cache._FileMemo(str(path)), counting_upper, "1")
+            entry = self.cacheDir / f"{parseCache.key(str(path), counting_upper, '1')}.pickle"
+            os.utime(entry, (1000 + i, 1000 + i))
+
+        entrySize = max(p.stat().st_size for p in self.cacheDir.glob("*.pickle"))
+        parseCache.maxBytes = entrySize * 2
+        parseCache.evict()
+
+        remaining = {p.name for p in self.cacheDir.glob("*.pickle")}
+        oldest = f"{parseCache.key(str(files[0]), counting_upper, '1')}.pickle"
+        self.assertEqual(len(remaining), 2)
+        self.assertNotIn(oldest, remaining)
+
+    def test_ContentHashIsStable(self):
+        self.assertEqual(content_hash(str(self.inputFile)), content_hash(str(self.inputFile)))
+        self.assertEqual(len(content_hash(str(self.inputFile))), 64)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from beancount.ingest import cache
+from beancountimporters.AccessSalaryImporter.AccessSalaryImporter import Importer, PayslipField, PayslipIndex
+from beancountimporters.Common.PdfText import iter_pdf_pages, pdf_pages_to_text
+from tests.Utilities import PAYSLIP_LINES, write_text_pdf
+
+
+class PdfTextTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.pdfPath = Path(self.tempDir.name) / "bundle.pdf"
+        write_text_pdf(self.pdfPath, [PAYSLIP_LINES] + [[f"Notes page {i}"] * 20 for i in range(4)])
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+
+    def test_PagesAreYieldedInOrderWithTimings(self):
+        pages = list(iter_pdf_pages(str(self.pdfPath)))
+        self.assertEqual([page.number for page in pages], [0, 1, 2, 3, 4])
+        self.assertTrue(all(page.seconds >= 0 for page in pages))
+        self.assertIn("Notes page 3", pages[4].text)
+
+    def test_ParallelDecodingMatchesSerial(self):
+        self.assertEqual(pdf_pages_to_text(str(self.pdfPath), workers=2), pdf_pages_to_text(str(self.pdfPath)))
+
+    def test_ImporterStopsDecodingOnceFieldsAreFound(self):
+        importer = Importer("Salary", "Current", "PAYE", "Match", "NI", "Pension", "StudentLoan", "20")
+        file = cache._FileMemo(str(self.pdfPath))
+        transaction, = importer.extract(file)
+        self.assertEqual(len(transaction.postings), 7)
+        self.assertEqual([page.number for page in importer.page_timings(file)], [0])
+
+    def test_IndexJoinsLinesSplitAcrossPages(self):
+        field = PayslipField("Net Pay", 3)
+        index = PayslipIndex([field])
+        index.feed("PAYE 1.00\nNet Pay")
+        self.assertFalse(index.complete())
+        index.feed(" Total 10.00\nOther")
+        self.assertTrue(index.complete())
+        self.assertEqual(index.values(), {field: "10.00"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,15 @@
 import decimal
+import tempfile
 import unittest
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
+from pathlib import Path
 
 from beancount.ingest import cache
 from beancount.core.amount import Amount
 from beancount.core.number import D
+from beancountimporters.Common.ParseCache import ParseCache
 from beancountimporters.QifImporter.QifImporter import QifImporter
 from tests.Utilities import GetTestFilesDir
 
@@ -57,26 +61,80 @@ class QifTestCase(unittest.TestCase):
         self.assertEqual(posting.account, "DestinationAccount")
         self.assertEqual(posting.units, Amount(-D("4.70"), "GBP"))
 
+    def test_ExtractWithParseCacheMatchesUncached(self):
+        with tempfile.TemporaryDirectory() as cacheDir:
+            cachedImporter = QifImporter(destinationaccount="DestinationAccount", dayfirst=True,
+                                         parsecache=ParseCache(cacheDir))
+            self.assertEqual(cachedImporter.extract(self.lloydsCcFile), self.importer.extract(self.lloydsCcFile))
+
+            secondCache = ParseCache(cacheDir)
+            secondImporter = QifImporter(destinationaccount="DestinationAccount", dayfirst=True,
+                                         parsecache=secondCache)
+            txns = secondImporter.extract(cache._FileMemo(self.lloydsCcFile.name))
+            self.assertEqual(len(txns), 12)
+            self.assertEqual(secondCache.hits, 1)
+
+    def test_IdentifyThenExtractOtherFileUsesOtherFile(self):
+        self.assertTrue(self.importer.identify(self.lloydsCcFile))
+        txns = self.importer.extract(self.lloydsCurrentFile)
+        self.assertEqual(len(txns), 27)
+        self.assertEqual(txns[0].meta["filename"], self.lloydsCurrentFile.name)
+
+    def test_ConcurrentExtractOverManyFiles(self):
+        files = [cache._FileMemo(memo.name) for memo in [self.lloydsCcFile, self.lloydsCurrentFile] * 8]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(self.importer.extract, files))
+        for memo, txns in zip(files, results):
+            self.assertEqual(len(txns), 12 if memo.name == self.lloydsCcFile.name else 27)
+            self.assertTrue(all(txn.meta["filename"] == memo.name for txn in txns))
+
+    def test_ExtractMapsEveryAccountAndSectionInOnePass(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            path = Path(tempDir) / "multi.qif"
+            path.write_text("!Account\nNCurrent\nTBank\n^\n!Type:Bank\nD03/02/2025\nT-10.00\nPRent\n^\n"
+                            "!Account\nNCard\nTCCard\n^\n!Type:CCard\nD04/02/2025\nT5.00\nPShop\n^\n"
+                            "!Type:Cash\nD05/02/2025\nT1.00\nPUnmapped\n^\n")
+            importer = QifImporter(destinationaccount="Assets:Current", dayfirst=True,
+                                   accountmap={("Current", "Bank"): "Assets:Current",
+                                               ("Card", "CCard"): "Liabilities:Card"})
+            txns = importer.extract(cache._FileMemo(path.as_posix()))
+
+        self.assertEqual([txn.payee for txn in txns], ["Rent", "Shop"])
+        self.assertEqual(txns[0].postings[0].account, "Assets:Current")
+        self.assertEqual(txns[0].postings[0].units, Amount(D("-10.00"), "GBP"))
+        # The credit card section has its sign inverted independently of the bank section.
+        self.assertEqual(txns[1].postings[0].account, "Liabilities:Card")
+        self.assertEqual(txns[1].postings[0].units, Amount(D("-5.00"), "GBP"))
+
+    def test_AccountMapNamesDefaultAccountWithEmptyString(self):
+        importer = QifImporter(destinationaccount="DestinationAccount", dayfirst=True,
+                               accountmap={("", "CCard"): "Liabilities:Lloyds"})
+        txns = importer.extract(self.lloydsCcFile)
+        self.assertEqual(len(txns), 12)
+        self.assertTrue(all(txn.postings[0].account == "Liabilities:Lloyds" for txn in txns))
+
+    def test_IncrementalExtractSkipsTransactionsUpToWatermark(self):
+        allTxns = self.importer.extract(self.lloydsCcFile)
+        incrementalImporter = QifImporter(destinationaccount="DestinationAccount", dayfirst=True, incremental=True)
+        # The file is newest first, so the last four transactions are the oldest.
+        txns = incrementalImporter.extract(self.lloydsCcFile, allTxns[-4:])
+        self.assertEqual(txns, allTxns[:-4])
+
     def test_GetQifAccountThrowsErrorWhenQifObjectDoesntYetExist(self):
         with self.assertRaises(ValueError) as cm:
-            self.importer.GetQifAccount()
+            self.importer.GetQifAccount(None)
 
         exception = cm.exception
         self.assertEqual(str(exception), "QifObject is None so an account cannot be determined.")
 
     def test_GetQifDAccountReturnsDefaultAccount(self):
-        self.importer.qifObject = self.dummyQifObject
-        qifAccount = self.importer.GetQifAccount()
+        qifAccount = self.importer.GetQifAccount(self.dummyQifObject)
         self.assertEqual(qifAccount.name, "Quiffen Default Account")
-        self.importer.qifObject = None
-        self.importer.qifAccount = ""
 
     def test_GetQifAccountReturnsNoneForBadAccount(self):
-        self.importer.qifObject = self.dummyQifObject
         self.importer.qifAccount = "BadAccount"
-        qifAccount = self.importer.GetQifAccount()
+        qifAccount = self.importer.GetQifAccount(self.dummyQifObject)
         self.assertEqual(qifAccount, None)
-        self.importer.qifObject = None
         self.importer.qifAccount = ""
 
     def test_GetNarration(self):
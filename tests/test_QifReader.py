@@ -0,0 +1,102 @@
+import datetime
+import tempfile
+import types
+import unittest
+from decimal import Decimal
+from pathlib import Path
+
+from quiffen import Qif
+
+from beancountimporters.QifImporter.QifReader import iter_qif_records, read_qif_records_day_first
+from tests.Utilities import GetTestFilesDir
+
+MULTI_SECTION_QIF = """!Option:AutoSwitch
+!Account
+NCurrent
+TBank
+^
+
+!Type:Bank
+D03/02/2025
+T-1,250.00
+PRent
+MFebruary
+LHousing:Rent/Home
+N0012
+^
+
+D04/02/2025
+T£20.5
+PShop
+SFood
+$-10.00
+EHalf
+MSplitMemo
+^
+"""
+
+
+class QifReaderTestCase(unittest.TestCase):
+
+    def setUp(self):
+        testFilesDir = GetTestFilesDir()
+        self.qifFiles = [(testFilesDir / name).absolute().as_posix() for name in ("LloydsCC.qif", "lloydsCurrentJan25.qif")]
+
+    def assertMatchesQuiffen(self, filename):
+        qif = Qif.parse(filename, day_first=True)
+        expected = [(account.name, accountType.value, t.line_number, t.date.date(), t.amount, t.payee, t.memo,
+                     t.cleared, str(t.category) if t.category else None)
+                    for account in qif.accounts.values()
+                    for accountType, transactions in account.transactions.items()
+                    for t in transactions]
+        actual = [(r.account, r.accountType, r.line_number, r.date, r.amount, r.payee, r.memo, r.cleared,
+                   str(r.category) if r.category else None)
+                  for r in iter_qif_records(filename, True)]
+        self.assertEqual(actual, expected)
+
+    def test_RecordsMatchQuiffen(self):
+        for filename in self.qifFiles:
+            with self.subTest(filename=filename):
+                self.assertMatchesQuiffen(filename)
+
+    def test_RecordsAreStreamed(self):
+        records = iter_qif_records(self.qifFiles[0], True)
+        self.assertIsInstance(records, types.GeneratorType)
+        first = next(records)
+        self.assertEqual(first.line_number, 1)
+        self.assertEqual(first.date, datetime.date(2024, 12, 23))
+
+    def test_AccountHeadersCategoriesAndSplits(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            path = Path(tempDir) / "multi.qif"
+            path.write_text(MULTI_SECTION_QIF)
+            self.assertMatchesQuiffen(path.as_posix())
+
+            rent, shop = read_qif_records_day_first(path.as_posix())
+        self.assertEqual((rent.account, rent.accountType), ("Current", "Bank"))
+        self.assertEqual(rent.amount, Decimal("-1250.00"))
+        self.assertEqual(rent.categories, ("Housing:Rent",))
+        self.assertEqual(rent.check_number, "0012")
+        # Fields after the first split line describe the split, not the transaction.
+        self.assertEqual(shop.amount, Decimal("20.5"))
+        self.assertEqual(shop.memo, None)
+
+    def test_TransactionBeforeHeaderRaises(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            path = Path(tempDir) / "headless.qif"
+            path.write_text("D03/02/2025\nT1.00\n^\n")
+            with self.assertRaises(ValueError) as cm:
+                list(iter_qif_records(path.as_posix(), True))
+        self.assertEqual(str(cm.exception), "Line 1: No header found before transactions.")
+
+    def test_MalformedAmountRaisesWithLine(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            path = Path(tempDir) / "bad.qif"
+            path.write_text("!Type:Bank\nD03/02/2025\nT1.00\n^\nD04/02/2025\nT1.2.3\n^\n")
+            with self.assertRaises(ValueError) as cm:
+                list(iter_qif_records(path.as_posix(), True))
+        self.assertEqual(str(cm.exception), "Line 6: invalid amount '1.2.3'")
+
+
+if __name__ == '__main__':
+    unittest.main()
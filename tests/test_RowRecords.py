@@ -0,0 +1,33 @@
+import datetime
+import unittest
+from decimal import Decimal
+
+from beancountimporters.Common.RowRecords import RowRecord, RowTable
+
+
+class RowRecordsTestCase(unittest.TestCase):
+
+    def test_RowRecord(self):
+        record = RowRecord(3, datetime.date(2024, 10, 20).toordinal(), -500, ("SHOP",))
+        self.assertEqual(record.date, datetime.date(2024, 10, 20))
+        self.assertEqual(str(record.number), "-5.00")
+        with self.assertRaises(AttributeError):
+            record.extra = 1
+
+    def test_RowTableInternsTextAndReadsBackRows(self):
+        table = RowTable(2)
+        for day, amount, description in [(1, 150, "SHOP"), (2, Decimal("2.5"), "CAFE"), (3, -25, "SHOP")]:
+            table.add_text([description, f"'REF{day}'"])
+            table.add_number(datetime.date(2024, 1, day).toordinal(), amount)
+
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table.strings.count("SHOP"), 1)
+        records = list(table)
+        self.assertEqual([record.lineno for record in records], [1, 2, 3])
+        self.assertEqual([str(record.number) for record in records], ["1.50", "2.5", "-0.25"])
+        self.assertEqual(records[2].text, ("SHOP", "'REF3'"))
+        self.assertEqual(records[1].date, datetime.date(2024, 1, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
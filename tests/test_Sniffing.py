@@ -0,0 +1,60 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from beancountimporters.Common.Sniffing import (HEAD_BYTES, first_content_line, first_csv_row, first_line,
+                                                first_pdf_page_text, last_csv_row, looks_like_dmy_amount_row)
+
+
+class SniffingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tempDir.name)
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+
+    def write(self, name: str, content: bytes) -> str:
+        path = self.root / name
+        path.write_bytes(content)
+        return str(path)
+
+    def test_FirstLineStripsNewlineAndBom(self):
+        filename = self.write("a.csv", "\ufeffDate,Description,Amount,Balance\r\n01/01/2023,X,1.00,2.00\r\n".encode())
+        self.assertEqual(first_line(filename), "Date,Description,Amount,Balance")
+
+    def test_FirstLineOnlyReadsHead(self):
+        filename = self.write("long.csv", b"x" * (HEAD_BYTES * 4))
+        self.assertEqual(len(first_line(filename)), HEAD_BYTES)
+
+    def test_FirstContentLineSkipsBlankAndComments(self):
+        filename = self.write("a.qif", b"\n# exported\n  \n!Type:Bank\nD01/01/2025\n")
+        self.assertEqual(first_content_line(filename), "!Type:Bank")
+
+    def test_FirstCsvRowHandlesQuotes(self):
+        filename = self.write("a.csv", b'18/03/2023,"SHOP, LONDON",-135.30\n')
+        self.assertEqual(first_csv_row(filename), ["18/03/2023", "SHOP, LONDON", "-135.30"])
+
+    def test_LastCsvRowKeepsQuotedNewlines(self):
+        filename = self.write("a.csv", b'Date,Description,Amount\n01/01/2023,"A ""B""",1.00\n'
+                                       b'02/01/2023,"first line\nsecond line",-2.00\r\n\r\n')
+        self.assertEqual(last_csv_row(filename), ["02/01/2023", "first line\nsecond line", "-2.00"])
+
+    def test_LastCsvRowReadsBackPastHead(self):
+        filename = self.write("a.csv", b'Date,Description\n01/01/2023,"' + b"x\n" * HEAD_BYTES + b'"\n')
+        self.assertEqual(last_csv_row(filename), ["01/01/2023", "x\n" * HEAD_BYTES])
+
+    def test_LooksLikeDmyAmountRow(self):
+        self.assertTrue(looks_like_dmy_amount_row(["18/03/2023", "SHOP", "-1,135.30"], 0, 2))
+        self.assertFalse(looks_like_dmy_amount_row(["Date", "Description", "Amount"], 0, 2))
+        self.assertFalse(looks_like_dmy_amount_row(["18/03/2023", "SHOP"], 0, 2))
+        self.assertFalse(looks_like_dmy_amount_row([], 0, 2))
+
+    def test_FirstPdfPageTextOfNonPdfIsEmpty(self):
+        filename = self.write("a.pdf", b"not really a pdf")
+        self.assertEqual(first_pdf_page_text(filename), "")
+
+
+if __name__ == '__main__':
+    unittest.main()
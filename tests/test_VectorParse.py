@@ -0,0 +1,48 @@
+import datetime
+import unittest
+
+from beancountimporters.Common.Money import parse_pence
+from beancountimporters.Common.VectorParse import parse_amounts, parse_dmy_dates
+
+
+class VectorParseTestCase(unittest.TestCase):
+
+    def test_ParseDmyDates(self):
+        dates = parse_dmy_dates(["01/02/2023", "29/02/2024", "31/12/1999", "01/02/2023"])
+        self.assertEqual(dates, [datetime.date(2023, 2, 1), datetime.date(2024, 2, 29),
+                                 datetime.date(1999, 12, 31), datetime.date(2023, 2, 1)])
+
+    def test_ParseDmyDatesFallsBackForUnpaddedDates(self):
+        self.assertEqual(parse_dmy_dates(["1/2/2023"]), [datetime.date(2023, 2, 1)])
+
+    def test_ParseDmyDatesReportsRowOfInvalidDate(self):
+        for bad in ["30/02/2023", "29/02/2023", "00/01/2023", "01/13/2023", "ab/cd/efgh", "2023-01-01"]:
+            with self.assertRaises(ValueError) as cm:
+                parse_dmy_dates(["01/01/2020", "02/01/2020", bad])
+            self.assertEqual(str(cm.exception), f"Row 3: invalid date {bad!r}")
+
+    def test_ParseAmountsMatchesScalarParse(self):
+        values = ["-2.40", "5", "1,234.50", "-0.00", "0.00", "-2.40", "00.10", "+1.00", "-.50", "12.3", "7.00"]
+        for negate in (False, True):
+            parsed = parse_amounts(values, negate)
+            expected = [parse_pence(value, negate) for value in values]
+            self.assertEqual([(type(p), str(p)) for p in parsed], [(type(p), str(p)) for p in expected])
+
+    def test_ParseAmountsFallsBackForWideOrNonAsciiValues(self):
+        self.assertEqual(parse_amounts(["12345678901234567.89", "1.00"]), [1234567890123456789, 100])
+        with self.assertRaises(ValueError) as cm:
+            parse_amounts(["1.00", "£1.00"])
+        self.assertEqual(str(cm.exception), "Row 2: invalid amount '£1.00'")
+
+    def test_ParseAmountsReportsRowOfInvalidAmount(self):
+        with self.assertRaises(ValueError) as cm:
+            parse_amounts(["1.00", "one pound"])
+        self.assertEqual(str(cm.exception), "Row 2: invalid amount 'one pound'")
+
+    def test_EmptyInput(self):
+        self.assertEqual(parse_dmy_dates([]), [])
+        self.assertEqual(parse_amounts([]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from beancountimporters.AmexCSVImporter.AmexCSVImporter import Importer as AmexImporter
+from beancountimporters.FirstAccountImporter.FirstAccountImporter import Importer as FirstAccountImporter
+from beancountimporters.Ingest.Watcher import Watcher, staging_name
+from tests.Utilities import write_amex_days, write_first_account_days
+
+
+class WatcherTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tempDir.name)
+        self.downloads = self.root / "downloads"
+        self.downloads.mkdir()
+        self.staging = self.downloads / "staging"
+        write_amex_days(self.downloads / "amex.csv", 3)
+        write_first_account_days(self.downloads / "first.csv", 2)
+        (self.downloads / "notes.txt").write_text("nothing to import")
+        self.importers = [FirstAccountImporter(currentaccount="Assets:Current"),
+                          AmexImporter(creditcardaccount="Liabilities:Amex")]
+        self.watcher = Watcher(self.importers, [str(self.downloads)], str(self.staging), settle=0)
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+
+    def staged(self, account):
+        return (self.staging / staging_name(account)).read_text()
+
+    def test_FirstPollStagesEveryAccount(self):
+        extracted = self.watcher.poll()
+        self.assertEqual([Path(f).name for f in extracted], ["amex.csv", "first.csv", "notes.txt"])
+        self.assertEqual(sorted(os.listdir(self.staging)), ["Assets-Current.beancount", "Liabilities-Amex.beancount"])
+        self.assertIn("SHOP 3", self.staged("Liabilities:Amex"))
+        self.assertIn("PAYEE 2", self.staged("Assets:Current"))
+        self.assertNotIn("SHOP", self.staged("Assets:Current"))
+
+    def test_OnlyChangedContentIsExtracted(self):
+        self.watcher.poll()
+        self.assertEqual((self.watcher.poll(), self.watcher.hashed), ([], 3))
+
+        # A new mtime alone costs a hash but not an extract.
+        os.utime(self.downloads / "first.csv", ns=(0, 10 ** 18))
+        self.assertEqual((self.watcher.poll(), self.watcher.hashed), ([], 4))
+
+        firstStaged = (self.staging / "Assets-Current.beancount").stat().st_mtime_ns
+        write_amex_days(self.downloads / "amex.csv", 4)
+        self.assertEqual([Path(f).name for f in self.watcher.poll()], ["amex.csv"])
+        self.assertIn("SHOP 4", self.staged("Liabilities:Amex"))
+        self.assertEqual((self.staging / "Assets-Current.beancount").stat().st_mtime_ns, firstStaged)
+        self.assertEqual(self.watcher.extractions, 4)
+
+    def test_RemovedFileIsUnstaged(self):
+        self.watcher.poll()
+        (self.downloads / "amex.csv").unlink()
+        self.assertEqual(self.watcher.poll(), [])
+        self.assertFalse((self.staging / "Liabilities-Amex.beancount").exists())
+        self.assertTrue((self.staging / "Assets-Current.beancount").exists())
+
+    def test_PartialAndUnsettledDownloadsWait(self):
+        write_amex_days(self.downloads / "new.csv.crdownload", 2)
+        self.watcher.settle = 3600
+        self.assertEqual(self.watcher.poll(), [])
+        self.watcher.settle = 0
+        self.assertNotIn("new.csv.crdownload", [Path(f).name for f in self.watcher.poll()])
+
+    def test_LedgerChangeMarksDuplicates(self):
+        ledger = self.root / "ledger.beancount"
+        ledger.write_text("")
+        self.watcher.ledger = str(ledger)
+        self.watcher.poll()
+        self.assertNotIn("; 2024-10-01", self.staged("Liabilities:Amex"))
+
+        ledger.write_text(self.staged("Liabilities:Amex"))
+        self.assertEqual([Path(f).name for f in self.watcher.poll()], ["amex.csv", "first.csv"])
+        self.assertIn("; 2024-10-01", self.staged("Liabilities:Amex"))
+        self.assertNotIn("; 2023-01-01", self.staged("Assets:Current"))
+
+    def test_RunStopsWhenAsked(self):
+        stop = threading.Event()
+        thread = threading.Thread(target=self.watcher.run, args=(stop,))
+        self.watcher.interval = 0.01
+        thread.start()
+        while not (self.staging / "Liabilities-Amex.beancount").exists():
+            stop.wait(0.01)
+        stop.set()
+        thread.join(5)
+        self.assertFalse(thread.is_alive())
+
+
+if __name__ == '__main__':
+    unittest.main()
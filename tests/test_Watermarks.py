@@ -0,0 +1,63 @@
+import datetime
+import unittest
+
+from beancountimporters.Common.Watermarks import (Watermark, WatermarkFilter, account_watermark, entry_fingerprint,
+                                                  watermarks_from_entries)
+from tests.Utilities import MakeTxn
+
+
+class WatermarksTestCase(unittest.TestCase):
+
+    def test_FingerprintPrefersReferenceThenAmount(self):
+        self.assertEqual(entry_fingerprint(MakeTxn(datetime.date(2024, 1, 1), "-5.00", reference="'AT1'"),
+                                           "Liabilities:Card"), "reference:'AT1'")
+        # Trailing zeros and narration edits in the ledger do not change the fingerprint.
+        self.assertEqual(entry_fingerprint(MakeTxn(datetime.date(2024, 1, 1), "-5.00"), "Liabilities:Card"),
+                         entry_fingerprint(MakeTxn(datetime.date(2024, 1, 1), "-5", narration="Edited"),
+                                           "Liabilities:Card"))
+
+    def test_WatermarksFromEntriesKeepLatestDatePerAccount(self):
+        shopping = ("Expenses:Shopping",)
+        entries = [MakeTxn(datetime.date(2024, 1, 2), "1.00", balancing=shopping),
+                   MakeTxn(datetime.date(2024, 1, 3), "2.00", balancing=shopping),
+                   MakeTxn(datetime.date(2024, 1, 3), "3.00", balancing=shopping),
+                   MakeTxn(datetime.date(2024, 2, 1), "4.00", account="Assets:Current", balancing=shopping)]
+        watermarks = watermarks_from_entries(entries)
+        self.assertEqual(watermarks["Liabilities:Card"], Watermark(datetime.date(2024, 1, 3), ("2 GBP", "3 GBP")))
+        self.assertEqual(watermarks["Assets:Current"].date, datetime.date(2024, 2, 1))
+        self.assertNotIn("Expenses:Shopping", watermarks)
+        self.assertEqual(watermarks_from_entries(entries, anyPosting=True)["Expenses:Shopping"].date,
+                         datetime.date(2024, 2, 1))
+
+    def test_BalancingPostingDoesNotMoveWatermark(self):
+        purchases = [MakeTxn(datetime.date(2024, 10, day), "-5.00", account="Liabilities:Amex", reference=f"'AT{day}'")
+                     for day in range(1, 6)]
+        payment = MakeTxn(datetime.date(2024, 10, 20), "-100.00", account="Assets:Current", narration="AMEX PAYMENT",
+                          balancing=("Liabilities:Amex",))
+        ledger = purchases + [payment]
+        self.assertEqual(account_watermark("Liabilities:Amex", ledger), Watermark(datetime.date(2024, 10, 5),
+                                                                                 ("reference:'AT5'",)))
+        self.assertEqual(account_watermark("Assets:Current", ledger).date, datetime.date(2024, 10, 20))
+
+    def test_AccountWatermarkWithoutEntries(self):
+        self.assertIsNone(account_watermark("Liabilities:Card", None))
+        self.assertIsNone(account_watermark("Liabilities:Card", [MakeTxn(datetime.date(2024, 1, 2), "1.00")][:0]))
+
+    def test_FilterSpendsEachFingerprintOnce(self):
+        watermark = Watermark(datetime.date(2024, 1, 3), ("2 GBP",))
+        watermarkFilter = WatermarkFilter("Liabilities:Card", watermark)
+        self.assertEqual(watermarkFilter.since, datetime.date(2024, 1, 3))
+        self.assertFalse(watermarkFilter.is_new(MakeTxn(datetime.date(2024, 1, 2), "9.00")))
+        self.assertFalse(watermarkFilter.is_new(MakeTxn(datetime.date(2024, 1, 3), "2.00")))
+        # A second identical row on the watermark date was not imported yet.
+        self.assertTrue(watermarkFilter.is_new(MakeTxn(datetime.date(2024, 1, 3), "2.00")))
+        self.assertTrue(watermarkFilter.is_new(MakeTxn(datetime.date(2024, 1, 4), "2.00")))
+
+    def test_FilterWithoutWatermarkPassesEverything(self):
+        watermarkFilter = WatermarkFilter("Liabilities:Card", None)
+        self.assertIsNone(watermarkFilter.since)
+        self.assertTrue(watermarkFilter.is_new(MakeTxn(datetime.date(2000, 1, 1), "1.00")))
+
+
+if __name__ == '__main__':
+    unittest.main()